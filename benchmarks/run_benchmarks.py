@@ -0,0 +1,266 @@
+"""
+Times the hot paths of the headers, their properties and block I/O, for
+each telescope's header class, emitting the results as JSON.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+
+Each result is the best of `--repeat` timings of an automatically sized
+loop, in seconds per operation.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from importlib import metadata
+from typing import Callable, Dict, List
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw import GuppiRawProperties
+from rao_keyvalue_property_mixin_classes.guppi_raw_codec import decode_header, encode_header
+from rao_keyvalue_property_mixin_classes.guppi_raw_fits import (
+    lazy_GuppiRawHeader,
+    parse_GuppiRawHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    auto_init_GuppiRawHeader,
+    cached_header_class,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+from rao_keyvalue_property_mixin_classes.guppi_raw_unpack import unpack_block
+
+from synthetic_raw import HEADER_CLASSES, synthetic_header, write_synthetic_raw
+
+PROPERTIES = [
+    "blockshape",
+    "nof_spectra_per_block",
+    "channel_bandwidth",
+    "time_unix_epoch_seconds",
+    "rightascension_hours",
+    "declination_degrees",
+]
+ANTENNA_PROPERTIES = [
+    "antenna_names",
+    "antenna_flags",
+]
+
+
+class BenchmarkRunner:
+    def __init__(self, repeat: int = 5, min_time: float = 0.2):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.results: List[Dict] = []
+
+    def time(self, name: str, function: Callable, nof_bytes: int = 0, **tags):
+        timer = timeit.Timer(function)
+        number, elapsed = timer.autorange()
+        number = max(1, int(number*self.min_time/max(elapsed, 1e-9)))
+        seconds = min(timer.repeat(repeat=self.repeat, number=number))/number
+        result = {"name": name, **tags, "seconds": seconds, "number": number}
+        if nof_bytes > 0:
+            result["bytes_per_second"] = nof_bytes/seconds
+        self.results.append(result)
+        print(
+            f"{name:32s} {' '.join(map(str, tags.values())):36s} {seconds*1e6:12.3f} us",
+            file=sys.stderr
+        )
+
+
+def benchmark_headers(runner: BenchmarkRunner, telescope: str):
+    header = synthetic_header(telescope)
+    keyvalues = dict(header)
+
+    for name in PROPERTIES + (ANTENNA_PROPERTIES if telescope != "MeerKAT" else []):
+        getattr(header, name)
+        runner.time(
+            "property",
+            lambda: getattr(header, name),
+            telescope=telescope,
+            property=name
+        )
+
+    def advance_packet_index():
+        header.packet_index += 1
+        return header.time_unix_epoch_seconds
+    runner.time(
+        "property_after_update",
+        advance_packet_index,
+        telescope=telescope,
+        property="time_unix_epoch_seconds"
+    )
+
+    # the pattern of the readers: a header for each block, read once
+    for header_class in [type(header), cached_header_class(type(header))]:
+        def read_block_header(header_class=header_class):
+            block_header = header_class(keyvalues)
+            block_header.blockshape
+            return block_header.time_unix_epoch_seconds
+        runner.time(
+            "block_header",
+            read_block_header,
+            telescope=telescope,
+            header_class=header_class.__name__
+        )
+
+    fits_length = len(header.to_fits())
+    runner.time("to_fits", header.to_fits, nof_bytes=fits_length, telescope=telescope)
+    buffer = bytearray(header.fits_length())
+    runner.time(
+        "to_fits_into",
+        lambda: header.to_fits_into(buffer),
+        nof_bytes=fits_length,
+        telescope=telescope
+    )
+    runner.time(
+        "to_fits_into_keys",
+        lambda: header.to_fits_into(buffer, keys=["PKTIDX"]),
+        telescope=telescope
+    )
+    card_positions = header.fits_card_positions(["PKTIDX"])
+    runner.time(
+        "to_fits_into_card_positions",
+        lambda: header.to_fits_into(buffer, keys=card_positions),
+        telescope=telescope
+    )
+
+    runner.time(
+        "auto_init_GuppiRawHeader",
+        lambda: auto_init_GuppiRawHeader(keyvalues),
+        telescope=telescope
+    )
+
+    fits = header.to_fits().encode()
+    runner.time(
+        "parse_GuppiRawHeader",
+        lambda: parse_GuppiRawHeader(fits),
+        nof_bytes=len(fits),
+        telescope=telescope
+    )
+    runner.time(
+        "lazy_GuppiRawHeader_blocksize",
+        lambda: lazy_GuppiRawHeader(fits).blocksize,
+        telescope=telescope
+    )
+
+    # passing headers between processes
+    for serialization, dumps, loads in [
+        ("codec", encode_header, decode_header),
+        ("pickle", lambda header: pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    ]:
+        message = dumps(header)
+        runner.time(
+            "serialize_header",
+            lambda: dumps(header),
+            nof_bytes=len(message),
+            telescope=telescope,
+            serialization=serialization
+        )
+        runner.time(
+            "deserialize_header",
+            lambda: loads(message),
+            nof_bytes=len(message),
+            telescope=telescope,
+            serialization=serialization
+        )
+
+
+def benchmark_sexagesimal(runner: BenchmarkRunner):
+    runner.time("from_sexagesimal_str", lambda: GuppiRawProperties.from_sexagesimal_str("-12:34:56.789"))
+    runner.time("to_sexagesimal_str", lambda: GuppiRawProperties.to_sexagesimal_str(-12.582441))
+    strings = [GuppiRawProperties.to_sexagesimal_str(value) for value in numpy.linspace(-89, 89, 10000)]
+    runner.time(
+        "from_sexagesimal_str_array",
+        lambda: GuppiRawProperties.from_sexagesimal_str_array(strings),
+        size=len(strings)
+    )
+
+
+def benchmark_blocks(runner: BenchmarkRunner, directorypath: str, nbits: int, nof_blocks: int):
+    filepaths, header = write_synthetic_raw(
+        os.path.join(directorypath, f"synthetic_{nbits}bit"),
+        nof_blocks=nof_blocks,
+        nbits=nbits,
+    )
+    nof_bytes = sum(os.path.getsize(filepath) for filepath in filepaths)
+
+    def read_blocks():
+        with GuppiRawReader(filepaths[0]) as reader:
+            for _, block in reader:
+                block.reshape(-1).view(numpy.uint8).max()  # touch the block-data
+    runner.time("read_blocks", read_blocks, nof_bytes=nof_bytes, nbits=nbits)
+
+    with GuppiRawReader(filepaths[0]) as reader:
+        _, block, _ = reader.read_block(0)
+        out = numpy.empty(header.blockshape, dtype=numpy.complex64)
+        runner.time(
+            "unpack_block",
+            lambda: unpack_block(header, block, out=out),
+            nof_bytes=header.blocksize,
+            nbits=nbits
+        )
+        del block
+
+
+def compare(results: List[Dict], baseline: List[Dict]):
+    def identity(result):
+        return tuple(sorted(
+            (key, value)
+            for key, value in result.items()
+            if key not in ("seconds", "number", "bytes_per_second")
+        ))
+    baseline_seconds = {identity(result): result["seconds"] for result in baseline}
+    for result in results:
+        seconds = baseline_seconds.get(identity(result))
+        if seconds is not None:
+            print(f"{result['seconds']/seconds:8.2f}x  {dict(identity(result))}")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="The JSON file to write the results to (else stdout).")
+    parser.add_argument("--compare", help="A JSON file of previous results, to print the ratios against.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--nof-blocks", type=int, default=8)
+    args = parser.parse_args(arguments)
+
+    runner = BenchmarkRunner(repeat=args.repeat, min_time=args.min_time)
+    for telescope in HEADER_CLASSES:
+        benchmark_headers(runner, telescope)
+    benchmark_sexagesimal(runner)
+    with tempfile.TemporaryDirectory() as directorypath:
+        for nbits in [4, 8, 16]:
+            benchmark_blocks(runner, directorypath, nbits, args.nof_blocks)
+
+    try:
+        version = metadata.version("rao_keyvalue_property_mixin_classes")
+    except metadata.PackageNotFoundError:
+        version = None
+    document = {
+        "version": version,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "results": runner.results,
+    }
+    if args.output is None:
+        json.dump(document, sys.stdout, indent=1)
+    else:
+        with open(args.output, "w") as fio:
+            json.dump(document, fio, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare) as fio:
+            compare(runner.results, json.load(fio)["results"])
+
+
+if __name__ == "__main__":
+    main()
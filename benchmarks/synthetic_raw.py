@@ -0,0 +1,116 @@
+"""
+Generates synthetic GUPPI RAW recordings, as the subjects of the benchmarks.
+
+    python benchmarks/synthetic_raw.py /tmp/synthetic --telescope ATA --nants 8 --obsnchan 1024
+"""
+
+import argparse
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import guppi_raw_block_dtype
+from rao_keyvalue_property_mixin_classes.guppi_raw_writer import GuppiRawWriter
+
+HEADER_CLASSES = {
+    "ATA": GuppiRawAtaHeader,
+    "VLA": GuppiRawCosmicHeader,
+    "MeerKAT": GuppiRawMeerkatHeader,
+}
+
+
+def synthetic_header(
+    telescope: str = "ATA",
+    nants: int = 4,
+    obsnchan: int = 256,
+    npol: int = 2,
+    nbits: int = 8,
+    nof_spectra: int = 1024,
+    directio: bool = True
+):
+    """A header representative of the telescope's recordings."""
+    header = HEADER_CLASSES[telescope](
+        TELESCOP=telescope,
+        BACKEND="GUPPI",
+        SRC_NAME="SYNTHETIC",
+        NANTS=nants,
+        OBSNCHAN=obsnchan,
+        NPOL=npol,
+        NBITS=nbits,
+        BLOCSIZE=obsnchan*nof_spectra*npol*2*nbits//8,
+        DIRECTIO=int(directio),
+        OBSFREQ=1420.0,
+        OBSBW=-obsnchan*0.5,
+        CHAN_BW=-0.5,
+        TBIN=2e-6,
+        PKTIDX=0,
+        PIPERBLK=nof_spectra,
+        SYNCTIME=1700000000,
+        STT_IMJD=60000,
+        STT_SMJD=43200,
+        RA_STR="12:34:56.789",
+        DEC_STR="-01:23:45.678",
+    )
+    if telescope == "ATA":
+        header.antenna_names = [f"{enum}a" for enum in range(nants)]
+    elif telescope == "VLA":
+        header["RA_PHAS"] = header["RA_STR"]
+        header["DEC_PHAS"] = header["DEC_STR"]
+        header.antenna_names = [f"ea{enum:02d}" for enum in range(nants)]
+    if telescope in ("ATA", "VLA"):
+        header.antenna_flags = [enum % 3 == 0 for enum in range(nants)]
+    return header
+
+
+def write_synthetic_raw(stempath: str, nof_blocks: int = 8, **kwargs):
+    """Writes a recording of `nof_blocks` blocks of random block-data,
+    returning the filepaths and the header of the first block.
+    """
+    header = synthetic_header(**kwargs)
+    dtype = guppi_raw_block_dtype(header)
+    rng = numpy.random.default_rng(0)
+    block = numpy.frombuffer(
+        rng.integers(0, 256, header.blocksize, dtype=numpy.uint8).tobytes(),
+        dtype=dtype
+    )
+    with GuppiRawWriter(stempath) as writer:
+        for enum in range(nof_blocks):
+            block_header = type(header)(header)
+            block_header.packet_index = enum*header.nof_packet_indices_per_block
+            writer.write(block_header, block)
+    return writer.filepaths, header
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("stempath")
+    parser.add_argument("--telescope", choices=sorted(HEADER_CLASSES), default="ATA")
+    parser.add_argument("--nants", type=int, default=4)
+    parser.add_argument("--obsnchan", type=int, default=256)
+    parser.add_argument("--npol", type=int, default=2)
+    parser.add_argument("--nbits", type=int, choices=[4, 8, 16], default=8)
+    parser.add_argument("--nof-spectra", type=int, default=1024)
+    parser.add_argument("--nof-blocks", type=int, default=8)
+    parser.add_argument("--no-directio", dest="directio", action="store_false")
+    args = parser.parse_args(arguments)
+
+    filepaths, _ = write_synthetic_raw(
+        args.stempath,
+        nof_blocks=args.nof_blocks,
+        telescope=args.telescope,
+        nants=args.nants,
+        obsnchan=args.obsnchan,
+        npol=args.npol,
+        nbits=args.nbits,
+        nof_spectra=args.nof_spectra,
+        directio=args.directio,
+    )
+    print("\n".join(filepaths))
+
+
+if __name__ == "__main__":
+    main()
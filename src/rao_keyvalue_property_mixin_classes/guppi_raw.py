@@ -1,5 +1,7 @@
 from typing import Tuple
 from enum import Enum
+from functools import lru_cache
+from math import copysign
 
 class GuppiRawDatatype(str, Enum):
     integer = "INTEGER"
@@ -12,7 +14,9 @@ class GuppiRawProperties:
 
     @staticmethod
     def factor_division(dividend, divisor):
-        if dividend % divisor != 0:
+        remainder = dividend % divisor
+        # NumPy arrays of values are divided element-wise
+        if remainder.any() if hasattr(remainder, "any") else remainder != 0:
             raise ValueError(
                 f"Cannot cleanly divide {dividend} by non-factor {divisor}."
             )
@@ -26,7 +30,9 @@ class GuppiRawProperties:
             for part in value.split(str_delimiter):
                 value_f += float(part)/units_factor
                 if units_factor == 1:
-                    units_factor *= -1 if value_f < 0 else 1
+                    # the sign of the leading part applies to all parts,
+                    # including that of `-0`
+                    units_factor *= -1 if part.lstrip().startswith("-") else 1
                 units_factor *= unit_base
 
             return value_f
@@ -38,13 +44,91 @@ class GuppiRawProperties:
             return value
 
         value_parts = [
-            str(int(value)),
+            ("-" if value < 0 and int(value) == 0 else "") + str(int(value)),
             str(abs(int((value-int(value))*unit_base))),
             f"{abs((value*60-int(value*60))*unit_base):0.16f}"
         ]
 
         return str_delimiter.join(value_parts)
 
+    @staticmethod
+    def from_sexagesimal_str_array(values, str_delimiter=':', unit_base=60):
+        """Vectorized `from_sexagesimal_str`, returning an array of float64
+        identical to the values it would return element-wise. Requires NumPy.
+        """
+        import numpy
+        from itertools import chain
+
+        if not isinstance(values, numpy.ndarray):
+            values = numpy.asarray(values, dtype=object)
+        if values.dtype.kind not in "USO":
+            return values.astype(numpy.float64)
+
+        values_list = values.ravel().tolist()
+        is_str = numpy.fromiter(
+            (isinstance(value, str) for value in values_list),
+            dtype=bool,
+            count=len(values_list)
+        )
+        value_parts = [
+            value.split(str_delimiter) if value_is_str else (value,)
+            for value, value_is_str in zip(values_list, is_str.tolist())
+        ]
+        nof_parts = numpy.fromiter(map(len, value_parts), dtype=numpy.int64, count=len(value_parts))
+        parts_f = numpy.fromiter(
+            map(float, chain.from_iterable(value_parts)),
+            dtype=numpy.float64,
+            count=int(nof_parts.sum())
+        )
+
+        first_part_indices = numpy.cumsum(nof_parts) - nof_parts
+        leading_parts_f = parts_f[first_part_indices]
+        # the sign of the leading part applies to all parts, including -0
+        units_factor = numpy.where(numpy.signbit(leading_parts_f), -unit_base, unit_base)
+        # strings' parts are summed onto an int 0, as by `from_sexagesimal_str`,
+        # so that "-0" is 0.0, while other values are converted as they are
+        value_f = numpy.where(is_str, leading_parts_f + 0.0, leading_parts_f)
+        for part_enum in range(1, int(nof_parts.max(initial=1))):
+            has_part = nof_parts > part_enum
+            value_f[has_part] += (
+                parts_f[first_part_indices[has_part] + part_enum]
+                / units_factor[has_part]
+            )
+            units_factor = units_factor*unit_base
+
+        return value_f.reshape(values.shape)
+
+    @staticmethod
+    def to_sexagesimal_str_array(values, str_delimiter=':', unit_base=60):
+        """Vectorized `to_sexagesimal_str`, returning an array of str
+        identical to those it would return element-wise. Requires NumPy.
+        """
+        import numpy
+
+        values = numpy.asarray(values)
+        if values.dtype.kind in "US":
+            return values
+        values = values.astype(numpy.float64)
+
+        integer_part = numpy.trunc(values)
+        subunit_values = values*60
+        value_parts = zip(
+            numpy.where((values < 0) & (integer_part == 0), "-", "").ravel().tolist(),
+            integer_part.astype(numpy.int64).ravel().tolist(),
+            numpy.abs(
+                numpy.trunc((values - integer_part)*unit_base)
+            ).astype(numpy.int64).ravel().tolist(),
+            numpy.abs(
+                (subunit_values - numpy.trunc(subunit_values))*unit_base
+            ).ravel().tolist(),
+        )
+        delimiter = str_delimiter.replace("%", "%%")
+        value_format = f"%s%d{delimiter}%d{delimiter}%0.16f"
+        return numpy.array(
+            [value_format % parts for parts in value_parts],
+            dtype=str
+        ).reshape(values.shape)
+
     blocksize: int = property(
         fget=lambda self: self.__getitem__("BLOCSIZE"),
         fset=lambda self, value: self.__setitem__("BLOCSIZE", value),
@@ -270,6 +354,64 @@ class GuppiRawProperties:
         """
     )
 
+    channel_frequencies: "numpy.ndarray" = property(
+        fget=lambda self: GuppiRawProperties._channel_frequencies(
+            self.observed_frequency,
+            GuppiRawProperties._signed_channel_bandwidth(self),
+            self.observed_nof_antenna_channels
+        ),
+        fset=None,
+        doc="""The center frequency of each channel of an antenna in the
+        block-data, as a read-only float64 NumPy array. The array is shared by
+        all headers of the same frequency setup. Lacking CHAN_BW, the channels
+        run in the direction of the sign of OBSBW. Requires NumPy.
+        """
+    )
+
+    channel_indices: "numpy.ndarray" = property(
+        fget=lambda self: GuppiRawProperties._channel_indices(
+            self.observed_channels_offset,
+            self.observed_nof_antenna_channels
+        ),
+        fset=None,
+        doc="""The total-observation index of each channel of an antenna in
+        the block-data (offset by `observed_channels_offset`), as a read-only
+        int64 NumPy array. Requires NumPy.
+        """
+    )
+
+    @staticmethod
+    def _signed_channel_bandwidth(keyvalues) -> float:
+        channel_bandwidth = keyvalues.channel_bandwidth
+        if keyvalues.get("CHAN_BW") is not None:
+            return channel_bandwidth
+        return copysign(channel_bandwidth, keyvalues.get("OBSBW", channel_bandwidth))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _channel_frequencies(observed_frequency, channel_bandwidth, nof_channels):
+        import numpy
+
+        # the observed frequency is the center of the observed channels
+        frequencies = observed_frequency + (
+            numpy.arange(nof_channels, dtype=numpy.float64) - (nof_channels - 1)/2
+        )*channel_bandwidth
+        frequencies.flags.writeable = False
+        return frequencies
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _channel_indices(channels_offset, nof_channels):
+        import numpy
+
+        indices = numpy.arange(
+            channels_offset,
+            channels_offset + nof_channels,
+            dtype=numpy.int64
+        )
+        indices.flags.writeable = False
+        return indices
+
     nof_packet_indices_per_block: int = property(
         fget=lambda self: self.get("PIPERBLK", self.nof_spectra_per_block),
         fset=lambda self, value: self.__setitem__("PIPERBLK", value),
@@ -288,15 +430,82 @@ class GuppiRawProperties:
         """
     )
 
+    def time_unix_epoch_seconds_at(
+        self,
+        packet_index_offset=0,
+        spectra_index_offset=0
+    ):
+        """The unix-epoch-seconds time of samples, offset by packet-indices
+        and spectra from the first sample of the block.
+
+        The offsets may be NumPy arrays (broadcast against each other), in
+        which case the times are an array of float64.
+        """
+        return (
+            self.time_unix_offset
+            + self._time_elapsed_seconds_at(
+                packet_index_offset,
+                spectra_index_offset
+            )
+        )
+
+    def time_unix_epoch_split_seconds_at(
+        self,
+        packet_index_offset=0,
+        spectra_index_offset=0
+    ):
+        """As `time_unix_epoch_seconds_at` but split into integer seconds and
+        fractional seconds, which retains sub-microsecond precision that a
+        single float64 of unix-epoch-seconds cannot.
+        """
+        elapsed = self._time_elapsed_seconds_at(
+            packet_index_offset,
+            spectra_index_offset
+        )
+        elapsed_seconds = elapsed // 1
+        fractional_seconds = elapsed - elapsed_seconds
+        if hasattr(elapsed_seconds, "astype"):
+            elapsed_seconds = elapsed_seconds.astype("int64")
+        else:
+            elapsed_seconds = int(elapsed_seconds)
+        return self.time_unix_offset + elapsed_seconds, fractional_seconds
+
+    def _time_elapsed_seconds_at(self, packet_index_offset, spectra_index_offset):
+        return (
+            (
+                (self.packet_index + packet_index_offset)
+                / self.nof_packet_indices_per_block
+            ) * self.nof_spectra_per_block
+            + spectra_index_offset
+        ) * self.spectra_timespan
+
+    def spectra_time_unix_epoch_seconds(self, packet_indices=None):
+        """The unix-epoch-seconds time of every spectrum of the blocks starting
+        at each of `packet_indices` (defaulting to this block's), as a flat
+        float64 array in order of the given packet-indices. Requires NumPy.
+
+        For instance, a file's time-axis follows from the packet-indices of a
+        `GuppiRawBlockIndex`.
+        """
+        import numpy
+
+        if packet_indices is None:
+            packet_indices = [self.packet_index]
+        packet_index_offsets = (
+            numpy.asarray(packet_indices, dtype=numpy.int64) - self.packet_index
+        )
+        return self.time_unix_epoch_seconds_at(
+            packet_index_offsets[:, numpy.newaxis],
+            numpy.arange(self.nof_spectra_per_block)[numpy.newaxis, :]
+        ).ravel()
+
     time_unix_epoch_seconds: float = property(
-        fget=lambda self, packet_index_offset=0, spectra_index_offset=0: (
+        fget=lambda self: (
             self.time_unix_offset
             + (
-                (
-                    (self.packet_index + packet_index_offset)
-                    / self.nof_packet_indices_per_block
-                ) * self.nof_spectra_per_block
-                + spectra_index_offset
+                self.packet_index
+                / self.nof_packet_indices_per_block
+                * self.nof_spectra_per_block
             ) * self.spectra_timespan
         ),
         fset=None,
@@ -0,0 +1,231 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Sequence
+
+from .guppi_raw_fits import FitsHeaderAccumulator, MAX_FITS_HEADER_LENGTH
+from .guppi_raw_header import (
+    GUPPI_RAW_HEADER_CLASS_REGISTRY,
+    GuppiRawHeader,
+    directio_padded_length,
+)
+
+_PRODUCER_DONE = object()
+
+
+def _pread_into(fd: int, view: memoryview, offset: int) -> int:
+    if hasattr(os, "preadv"):
+        return os.preadv(fd, [view], offset)
+    data = os.pread(fd, len(view), offset)
+    view[0:len(data)] = data
+    return len(data)
+
+
+class _ProducerError:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+class BlockBufferPool:
+    """
+    A fixed number of reusable block-data buffers. Buffers are allocated on
+    first use and only reallocated to grow, so that once the largest
+    `blocksize` has been seen no buffers are allocated. Acquiring waits
+    while all buffers are in use.
+    """
+
+    def __init__(self, nof_buffers: int):
+        self.nof_buffers = nof_buffers
+        self._free_buffers: asyncio.Queue = asyncio.Queue()
+        for _ in range(nof_buffers):
+            self._free_buffers.put_nowait(None)
+
+    async def acquire(self, length: int) -> bytearray:
+        buffer = await self._free_buffers.get()
+        if buffer is None or len(buffer) < length:
+            buffer = bytearray(length)
+        return buffer
+
+    def release(self, buffer: bytearray):
+        self._free_buffers.put_nowait(buffer)
+
+
+class AsyncBlock:
+    """A block read by `GuppiRawAsyncReader`: its header and a view of its
+    block-data in a pooled buffer, valid until `release()`.
+    """
+
+    __slots__ = ("filepath", "header", "data", "_buffer", "_pool")
+
+    def __init__(
+        self,
+        filepath: str,
+        header: GuppiRawHeader,
+        data: memoryview,
+        buffer: bytearray,
+        pool: BlockBufferPool
+    ):
+        self.filepath = filepath
+        self.header = header
+        self.data = data
+        self._buffer = buffer
+        self._pool = pool
+
+    def release(self):
+        """Returns the buffer to the pool, after which `data` is invalid."""
+        if self._buffer is not None:
+            self.data = None
+            self._pool.release(self._buffer)
+            self._buffer = None
+
+
+class GuppiRawAsyncReader:
+    """
+    Reads the blocks of many GUPPI RAW files concurrently, for asyncio.
+
+    A task per file reads each header and then its block-data into a
+    buffer of a shared `BlockBufferPool`, with `pread`/`preadv` offloaded
+    to a thread pool (which release the GIL while reading), and puts the
+    `AsyncBlock` on a queue of at most `queue_length` blocks. The tasks wait
+    while the queue is full or the buffers are all in use, so that reading
+    does not outpace consumption.
+
+    Blocks of a file arrive in order, interleaved with those of the other
+    files. Iterating releases each block as the next is requested, unless
+    `auto_release` is unset, when each must be `release()`d explicitly (the
+    reading stalls while all `nof_buffers` are held).
+
+    Headers are read `header_read_length` bytes at a time. A header that
+    lacks its END card raises ValueError, unless it is cut short by the end
+    of the file, as left by an interrupted recording (see
+    `is_partial_fits_header`), or once it exceeds `max_header_length`.
+
+    There is no io_uring in the standard library: batching is left to the
+    kernel's read-ahead of the concurrent sequential reads.
+    """
+
+    def __init__(
+        self,
+        filepaths: Sequence[str],
+        queue_length: int = 8,
+        nof_buffers: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        auto_release: bool = True,
+        header_read_length: int = 1 << 13,
+        max_header_length: int = MAX_FITS_HEADER_LENGTH
+    ):
+        self.filepaths = list(filepaths)
+        self.queue_length = queue_length
+        # beyond the queued blocks, each task holds a buffer being read and
+        # the consumer holds one
+        self.nof_buffers = nof_buffers or queue_length + len(self.filepaths) + 1
+        self.max_workers = max_workers or min(32, len(self.filepaths) + 1)
+        self.auto_release = auto_release
+        self.header_read_length = header_read_length
+        self.max_header_length = max_header_length
+        self._executor = None
+        self._queue = None
+        self._pool = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="GuppiRawAsyncReader"
+        )
+        self._queue = asyncio.Queue(maxsize=self.queue_length)
+        self._pool = BlockBufferPool(self.nof_buffers)
+        self._tasks = [
+            asyncio.ensure_future(self._read_file(filepath))
+            for filepath in self.filepaths
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            function,
+            *args
+        )
+
+    async def _read_file(self, filepath: str):
+        try:
+            fd = await self._run(os.open, filepath, os.O_RDONLY)
+            try:
+                await self._read_blocks(filepath, fd)
+            finally:
+                os.close(fd)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exception:
+            await self._queue.put(_ProducerError(exception))
+        await self._queue.put(_PRODUCER_DONE)
+
+    async def _read_blocks(self, filepath: str, fd: int):
+        offset = 0
+        while True:
+            accumulator = FitsHeaderAccumulator(self.max_header_length)
+            keyvalues_length = None
+            while keyvalues_length is None:
+                chunk = await self._run(
+                    os.pread,
+                    fd,
+                    self.header_read_length,
+                    offset + len(accumulator.buffer)
+                )
+                if len(chunk) == 0:
+                    if accumulator.is_partial():
+                        # the end of the file, or a trailing partial header
+                        return
+                    raise ValueError(
+                        f"No END card in the header at offset {offset} of {filepath}."
+                    )
+                keyvalues_length = accumulator.feed(chunk)
+            keyvalues, header_length = keyvalues_length
+
+            header = GUPPI_RAW_HEADER_CLASS_REGISTRY.init(keyvalues)
+            data_offset = offset + directio_padded_length(
+                header_length,
+                header.directio
+            )
+            blocksize = header.blocksize
+            buffer = await self._pool.acquire(blocksize)
+            try:
+                data = memoryview(buffer)[0:blocksize]
+                nof_read = await self._run(_pread_into, fd, data, data_offset)
+            except BaseException:
+                self._pool.release(buffer)
+                raise
+            if nof_read < blocksize:
+                # a truncated block, as left by an interrupted recording
+                self._pool.release(buffer)
+                return
+
+            await self._queue.put(AsyncBlock(filepath, header, data, buffer, self._pool))
+            offset = data_offset + blocksize
+
+    async def __aiter__(self) -> AsyncIterator[AsyncBlock]:
+        nof_reading = len(self._tasks)
+        previous = None
+        try:
+            while nof_reading > 0:
+                if previous is not None and self.auto_release:
+                    previous.release()
+                item = await self._queue.get()
+                if item is _PRODUCER_DONE:
+                    nof_reading -= 1
+                    continue
+                if isinstance(item, _ProducerError):
+                    raise item.exception
+                previous = item
+                yield item
+        finally:
+            if previous is not None and self.auto_release:
+                previous.release()
@@ -0,0 +1,275 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .guppi_raw_fits import FitsHeaderAccumulator
+from .guppi_raw_header import GUPPI_RAW_HEADER_CLASS_REGISTRY, directio_padded_length
+
+# the first header is read in chunks of this many bytes
+_HEADER_READ_LENGTH = 1 << 13
+
+
+class GuppiRawCatalogueEntry(NamedTuple):
+    filepath: str
+    telescope: Optional[str]
+    backend: Optional[str]
+    source_name: Optional[str]
+    observed_frequency: Optional[float]
+    observed_bandwidth: Optional[float]
+    mjd: Optional[float]
+    time_unix_epoch_seconds: Optional[float]
+    packet_index: Optional[int]
+    nof_packet_indices_per_block: Optional[int]
+    header_length: Optional[int]
+    blocksize: Optional[int]
+    nof_blocks: int
+
+    def block_offset(self, block_index: int) -> int:
+        """The offset of the block's header, presuming (as for the blocks of
+        a recording) that every header spans as many bytes as the first.
+        """
+        if not 0 <= block_index < self.nof_blocks:
+            raise IndexError(block_index)
+        return block_index*(self.header_length + self.blocksize)
+
+
+_ENTRY_COLUMNS = GuppiRawCatalogueEntry._fields
+
+
+def _property_or_none(header, name: str):
+    try:
+        return getattr(header, name)
+    except (KeyError, ValueError, TypeError, ZeroDivisionError):
+        return None
+
+
+def _read_first_header(filepath: str):
+    accumulator = FitsHeaderAccumulator()
+    with open(filepath, "rb") as fio:
+        while True:
+            chunk = fio.read(_HEADER_READ_LENGTH)
+            if len(chunk) == 0:
+                raise ValueError(
+                    f"No END card within the {len(accumulator.buffer)} bytes of the file."
+                )
+            keyvalues_length = accumulator.feed(chunk)
+            if keyvalues_length is not None:
+                return keyvalues_length
+
+
+def catalogue_file(filepath: str) -> Optional[Tuple]:
+    """Catalogues the file from its first header alone, counting its blocks
+    from the file's size. Run in the worker processes of
+    `GuppiRawCatalogue.scan`.
+
+    Returns the values of the `files` table's row: the path, the file's
+    size and modification time, the other `GuppiRawCatalogueEntry` fields,
+    the first header's key-values (JSON) and the error, if it could not be
+    parsed. Returns `None` if the file no longer exists.
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    preamble = (filepath, stat.st_size, stat.st_mtime_ns)
+    try:
+        keyvalues, header_length = _read_first_header(filepath)
+        header = GUPPI_RAW_HEADER_CLASS_REGISTRY.init(keyvalues)
+        header_length = directio_padded_length(header_length, header.directio)
+        blocksize = header.blocksize
+        stt_mjd_day = _property_or_none(header, "stt_mjd_day")
+        stt_mjd_seconds = _property_or_none(header, "stt_mjd_seconds")
+        entry = GuppiRawCatalogueEntry(
+            filepath=filepath,
+            telescope=_property_or_none(header, "telescope"),
+            backend=header.get("BACKEND"),
+            source_name=_property_or_none(header, "source_name"),
+            observed_frequency=_property_or_none(header, "observed_frequency"),
+            observed_bandwidth=_property_or_none(header, "observed_bandwidth"),
+            mjd=(
+                None if stt_mjd_day is None
+                else stt_mjd_day + (stt_mjd_seconds or 0)/86400
+            ),
+            time_unix_epoch_seconds=_property_or_none(header, "time_unix_epoch_seconds"),
+            packet_index=_property_or_none(header, "packet_index"),
+            nof_packet_indices_per_block=_property_or_none(header, "nof_packet_indices_per_block"),
+            header_length=header_length,
+            blocksize=blocksize,
+            nof_blocks=stat.st_size//(header_length + blocksize),
+        )
+        return preamble + entry[1:] + (json.dumps(keyvalues), None)
+    except (OSError, ValueError, KeyError, TypeError, ZeroDivisionError) as error:
+        entry = GuppiRawCatalogueEntry(filepath, *([None]*11), nof_blocks=0)
+        return preamble + entry[1:] + (None, f"{type(error).__name__}: {error}")
+
+
+class GuppiRawCatalogue:
+    """
+    An SQLite catalogue of GUPPI RAW files, gathered from the first header
+    of each file so that files can be found by telescope, source, frequency
+    or date without opening them.
+
+    Scanning catalogues files in a pool of processes, committing their rows
+    as they arrive, and skips the files whose size and modification time
+    are unchanged since they were catalogued.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            filepath TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            telescope TEXT,
+            backend TEXT,
+            source_name TEXT,
+            observed_frequency REAL,
+            observed_bandwidth REAL,
+            mjd REAL,
+            time_unix_epoch_seconds REAL,
+            packet_index INTEGER,
+            nof_packet_indices_per_block INTEGER,
+            header_length INTEGER,
+            blocksize INTEGER,
+            nof_blocks INTEGER NOT NULL,
+            keyvalues TEXT,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS files_source_name ON files (source_name);
+        CREATE INDEX IF NOT EXISTS files_telescope ON files (telescope);
+        CREATE INDEX IF NOT EXISTS files_observed_frequency ON files (observed_frequency);
+        CREATE INDEX IF NOT EXISTS files_mjd ON files (mjd);
+    """
+
+    def __init__(self, database_filepath: str):
+        self.database_filepath = database_filepath
+        self._connection = sqlite3.connect(database_filepath)
+        self._connection.executescript(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    @staticmethod
+    def walk_filepaths(directorypaths: Iterable[str]) -> Iterator[str]:
+        """Yields the `.raw` files under the directories (such as the
+        `observation_output_directorypath` of recordings, or their roots).
+        """
+        for directorypath in directorypaths:
+            for dirpath, _, filenames in os.walk(directorypath):
+                for filename in filenames:
+                    if filename.endswith(".raw"):
+                        yield os.path.abspath(os.path.join(dirpath, filename))
+
+    def scan(
+        self,
+        directorypaths: Iterable[str],
+        max_workers: Optional[int] = None,
+        chunksize: int = 16,
+        commit_interval: int = 256,
+        prune: bool = True
+    ) -> int:
+        """Catalogues the new and changed `.raw` files under the directories,
+        returning how many were (re)catalogued. With `prune`, the rows of
+        files no longer under the directories are removed.
+        """
+        directorypaths = [os.path.abspath(path) for path in directorypaths]
+        catalogued = {
+            filepath: (size, mtime_ns)
+            for filepath, size, mtime_ns in self._connection.execute(
+                "SELECT filepath, size, mtime_ns FROM files"
+            )
+        }
+
+        present = set()
+        changed = []
+        for filepath in GuppiRawCatalogue.walk_filepaths(directorypaths):
+            present.add(filepath)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            if catalogued.get(filepath) != (stat.st_size, stat.st_mtime_ns):
+                changed.append(filepath)
+
+        insert = (
+            "INSERT OR REPLACE INTO files"
+            f" VALUES ({', '.join('?'*(len(_ENTRY_COLUMNS) + 4))})"
+        )
+        nof_catalogued = 0
+        if len(changed) > 0:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for row in executor.map(catalogue_file, changed, chunksize=chunksize):
+                    if row is None:
+                        continue
+                    self._connection.execute(insert, row)
+                    nof_catalogued += 1
+                    if nof_catalogued % commit_interval == 0:
+                        self._connection.commit()
+
+        if prune:
+            self._connection.executemany(
+                "DELETE FROM files WHERE filepath = ?",
+                [
+                    (filepath,)
+                    for filepath in catalogued
+                    if filepath not in present and any(
+                        filepath.startswith(os.path.join(directorypath, ""))
+                        for directorypath in directorypaths
+                    )
+                ]
+            )
+        self._connection.commit()
+        return nof_catalogued
+
+    def query(
+        self,
+        telescope: Optional[str] = None,
+        source_name: Optional[str] = None,
+        frequency: Optional[Tuple[float, float]] = None,
+        mjd: Optional[Tuple[float, float]] = None,
+    ) -> List[GuppiRawCatalogueEntry]:
+        """Returns the entries of the files matching all the given criteria:
+        the telescope and source name exactly, the band (`OBSFREQ` +/-
+        `OBSBW`/2) overlapping the (low, high) frequency range, and the
+        starting MJD within the (first, last) range.
+        """
+        conditions = ["error IS NULL"]
+        parameters = []
+        if telescope is not None:
+            conditions.append("telescope = ?")
+            parameters.append(telescope)
+        if source_name is not None:
+            conditions.append("source_name = ?")
+            parameters.append(source_name)
+        if frequency is not None:
+            conditions.append(
+                "observed_frequency - abs(observed_bandwidth)/2 <= ?"
+                " AND observed_frequency + abs(observed_bandwidth)/2 >= ?"
+            )
+            parameters.extend([frequency[1], frequency[0]])
+        if mjd is not None:
+            conditions.append("mjd BETWEEN ? AND ?")
+            parameters.extend(mjd)
+
+        return [
+            GuppiRawCatalogueEntry(*row)
+            for row in self._connection.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM files"
+                f" WHERE {' AND '.join(conditions)}"
+                " ORDER BY filepath",
+                parameters
+            )
+        ]
+
+    def errors(self) -> List[Tuple[str, str]]:
+        """The (filepath, error) of the files that could not be catalogued."""
+        return list(self._connection.execute(
+            "SELECT filepath, error FROM files WHERE error IS NOT NULL ORDER BY filepath"
+        ))
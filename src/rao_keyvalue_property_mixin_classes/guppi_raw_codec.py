@@ -0,0 +1,480 @@
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from .guppi_raw import GuppiRawProperties
+from .guppi_raw_header import (
+    GUPPI_RAW_HEADER_CLASS_REGISTRY,
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+    GuppiRawCachedHeader,
+    GuppiRawAtaCachedHeader,
+    GuppiRawCosmicCachedHeader,
+    GuppiRawMeerkatCachedHeader,
+)
+from .hpdaq import HpdaqProperties
+from .hpdaq_ata import HpdaqAtaProperties
+from .hpdaq_cosmic import HpdaqCosmicProperties
+from .hpdaq_meerkat import HpdaqMeerkatProperties
+
+# The keys read by the accessors of each property mixin. The schema of a
+# header class gathers those of its mixins, base-most first: encoders and
+# decoders must share this table (and `HEADER_CODEC_CLASSES`).
+CODEC_SCHEMA_KEYS = {
+    GuppiRawProperties: (
+        "BLOCSIZE", "OBSNCHAN", "NPOL", "NBITS", "NANTS", "DIRECTIO", "PKTIDX", "PIPERBLK",
+        "SCHAN", "OBSFREQ", "OBSBW", "TBIN", "SYNCTIME", "STT_IMJD", "STT_SMJD",
+        "SRC_NAME", "TELESCOP", "RA_STR", "DEC_STR",
+    ),
+    HpdaqProperties: ("DATADIR", "PROJID", "BACKEND", "PKTSTART", "PKTSTOP", "DAQPULSE"),
+    HpdaqAtaProperties: ("OBSSTEM", "NBEAM", "NCHAN", "CHAN_BW", "DATATYPE", "OBSID"),
+    HpdaqCosmicProperties: ("RA_PHAS", "DEC_PHAS"),
+    HpdaqMeerkatProperties: ("CHAN_BW",),
+}
+
+# The header classes with a compact class code, their position (see
+# `register_codec_class`). Other classes registered with
+# `GUPPI_RAW_HEADER_CLASS_REGISTRY` are identified by name.
+HEADER_CODEC_CLASSES = [
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+    GuppiRawCachedHeader,
+    GuppiRawAtaCachedHeader,
+    GuppiRawCosmicCachedHeader,
+    GuppiRawMeerkatCachedHeader,
+]
+_CLASS_CODES = {
+    header_class: class_code
+    for class_code, header_class in enumerate(HEADER_CODEC_CLASSES)
+}
+_CLASS_CODE_NAMED = 0xFF
+
+# A message is the preamble, a key byte per entry, a format byte per entry,
+# the strings (the class name if named, the names of the keys absent from
+# the schema, then the str values) joined by NULs, the struct of the int,
+# float and bool values, and the length-prefixed bytes of the escaped values.
+_MESSAGE_PREAMBLE = struct.Struct("<BBHI")
+_MESSAGE_FULL = 0
+_MESSAGE_DELTA = 1
+_STRING_SEPARATOR = "\0"
+
+# A key byte is the index of the key in the schema, or `_KEY_NAMED`. A format
+# byte is the struct format of the value, "n" for None, or that of an escaped
+# value: ints beyond int64 ("l", as two's complement) and str values
+# containing NUL ("S", as UTF-8).
+_KEY_NAMED = 0xFF
+_TYPE_FORMATS = {int: "q", float: "d", bool: "?", str: "s", type(None): "n"}
+_ESCAPED_FORMATS = {int: "l", str: "S"}
+_NUMBER_FORMATS = ("q", "d", "?")
+_LENGTH = struct.Struct("<I")
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+@lru_cache(maxsize=None)
+def _schema_key_indices(header_class: type) -> Dict[str, int]:
+    key_indices: Dict[str, int] = {}
+    for klass in reversed(header_class.__mro__):
+        for key in CODEC_SCHEMA_KEYS.get(klass, ()):
+            key_indices.setdefault(key, len(key_indices))
+    if len(key_indices) > _KEY_NAMED:
+        raise ValueError(f"The schema of {header_class.__name__} has more than {_KEY_NAMED} keys.")
+    return key_indices
+
+
+def register_codec_class(header_class: type) -> int:
+    """Assigns the header class the next compact class code (encoders and
+    decoders must register the same classes in the same order).
+    """
+    if header_class in _CLASS_CODES:
+        return _CLASS_CODES[header_class]
+    if len(HEADER_CODEC_CLASSES) >= _CLASS_CODE_NAMED:
+        raise ValueError("No class codes remain.")
+    HEADER_CODEC_CLASSES.append(header_class)
+    _CLASS_CODES[header_class] = len(HEADER_CODEC_CLASSES) - 1
+    return _CLASS_CODES[header_class]
+
+
+def _class_name(header_class: type) -> str:
+    return f"{header_class.__module__}.{header_class.__qualname__}"
+
+
+def _named_class(class_name: str) -> type:
+    for header_class in GUPPI_RAW_HEADER_CLASS_REGISTRY.registered_classes():
+        if _class_name(header_class) == class_name:
+            return header_class
+    raise ValueError(f"{class_name} is not registered with GUPPI_RAW_HEADER_CLASS_REGISTRY.")
+
+
+def _class_code(header_class: type) -> int:
+    class_code = _CLASS_CODES.get(header_class)
+    if class_code is not None:
+        return class_code
+    if header_class in GUPPI_RAW_HEADER_CLASS_REGISTRY.registered_classes():
+        return _CLASS_CODE_NAMED
+    raise ValueError(
+        f"{header_class.__name__} is neither a codec class nor registered with "
+        "GUPPI_RAW_HEADER_CLASS_REGISTRY."
+    )
+
+
+@lru_cache(maxsize=None)
+def _struct(format: str) -> struct.Struct:
+    return struct.Struct("<" + format)
+
+
+def _getter(positions: List[int]) -> Callable[[Sequence], Tuple]:
+    # `itemgetter` returning a tuple whatever the number of positions
+    if len(positions) == 0:
+        return lambda values: ()
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda values: (values[position],)
+    return itemgetter(*positions)
+
+
+class _EncodingPlan:
+    """The encoding of values of the given types for the keys of a header
+    class, escaping those at `escaped_positions`.
+    """
+
+    def __init__(
+        self,
+        header_class: type,
+        keys: Tuple[str, ...],
+        value_types: Tuple[type, ...],
+        escaped_positions: FrozenSet[int] = frozenset()
+    ):
+        key_indices = _schema_key_indices(header_class)
+        self.class_code = _class_code(header_class)
+        self.value_types = value_types
+        self.escaped_positions = escaped_positions
+        names = [_class_name(header_class)] if self.class_code == _CLASS_CODE_NAMED else []
+        key_bytes = bytearray()
+        formats = []
+        for position, (key, value_type) in enumerate(zip(keys, value_types)):
+            if value_type not in _TYPE_FORMATS:
+                raise TypeError(f"Cannot encode the {value_type.__name__} value of {key}.")
+            index = key_indices.get(key)
+            if index is None:
+                if _STRING_SEPARATOR in key:
+                    raise ValueError(f"Cannot encode the key {key!r}, containing NUL.")
+                names.append(key)
+                index = _KEY_NAMED
+            key_bytes.append(index)
+            formats.append(
+                _ESCAPED_FORMATS[value_type]
+                if position in escaped_positions
+                else _TYPE_FORMATS[value_type]
+            )
+
+        number_positions = [
+            position
+            for position, format in enumerate(formats)
+            if format in _NUMBER_FORMATS
+        ]
+        string_positions = [position for position, format in enumerate(formats) if format == "s"]
+        self.layout = bytes(key_bytes) + "".join(formats).encode("ascii")
+        self.fixed_struct = _struct("".join(formats[position] for position in number_positions))
+        self.numbers = _getter(number_positions)
+        self.strings = _getter(string_positions)
+        self.names = tuple(names)
+        self.nof_separators = max(len(names) + len(string_positions) - 1, 0)
+        self.escaped = tuple(sorted(escaped_positions))
+
+    def encode(self, message_kind: int, values: Tuple) -> Optional[bytes]:
+        """The message of the values, or None if an int value overflows int64
+        or a str value contains NUL (to be escaped).
+        """
+        try:
+            fixed = self.fixed_struct.pack(*self.numbers(values))
+        except struct.error:
+            return None
+        joined = _STRING_SEPARATOR.join(self.names + self.strings(values))
+        if joined.count(_STRING_SEPARATOR) != self.nof_separators:
+            return None
+        encoded_strings = joined.encode("utf-8")
+
+        payloads = []
+        for position in self.escaped:
+            value = values[position]
+            if type(value) is int:
+                payload = value.to_bytes(value.bit_length()//8 + 1, "little", signed=True)
+            else:
+                payload = value.encode("utf-8")
+            payloads += (_LENGTH.pack(len(payload)), payload)
+        return b"".join((
+            _MESSAGE_PREAMBLE.pack(
+                message_kind,
+                self.class_code,
+                len(self.layout)//2,
+                len(encoded_strings)
+            ),
+            self.layout,
+            encoded_strings,
+            fixed,
+            *payloads
+        ))
+
+
+# the latest encoding plan of each class and keys, checked against the
+# types of the values encoded
+_ENCODING_PLANS: Dict[Tuple[type, Tuple[str, ...]], _EncodingPlan] = {}
+_MAX_ENCODING_PLANS = 1024
+
+
+def _encode_message(
+    message_kind: int,
+    header_class: type,
+    keys: Tuple[str, ...],
+    values: Tuple
+) -> bytes:
+    value_types = tuple(map(type, values))
+    plan = _ENCODING_PLANS.get((header_class, keys))
+    if (
+        plan is not None
+        and plan.value_types == value_types
+        and plan.class_code == _class_code(header_class)
+    ):
+        message = plan.encode(message_kind, values)
+        if message is not None:
+            return message
+    else:
+        plan = _EncodingPlan(header_class, keys, value_types)
+        message = plan.encode(message_kind, values)
+
+    if message is None:
+        # the plan escapes these values, and those at the same positions in
+        # subsequent headers
+        plan = _EncodingPlan(header_class, keys, value_types, plan.escaped_positions | {
+            position
+            for position, value in enumerate(values)
+            if (
+                (type(value) is int and not _INT64_MIN <= value <= _INT64_MAX)
+                or (type(value) is str and _STRING_SEPARATOR in value)
+            )
+        })
+        message = plan.encode(message_kind, values)
+    if len(_ENCODING_PLANS) >= _MAX_ENCODING_PLANS:
+        _ENCODING_PLANS.clear()
+    _ENCODING_PLANS[(header_class, keys)] = plan
+    return message
+
+
+@lru_cache(maxsize=1024)
+def _decoding_plan(header_class: type, layout: bytes):
+    """The keys (None for those named in the message) and the positions of
+    those named, the struct of the int, float and bool values, the number
+    of strings, the formats of the escaped values, and a getter of the
+    values from the unpacked struct, the strings, the escaped values and
+    None (concatenated in that order).
+    """
+    schema_keys = tuple(_schema_key_indices(header_class))
+    nof_entries = len(layout)//2
+    keys = []
+    named_positions = []
+    number_formats = []
+    escaped_formats = []
+    # (source, index within the source) of each value
+    value_sources = []
+    nof_string_values = 0
+    for position, (index, format) in enumerate(zip(layout[:nof_entries], layout[nof_entries:])):
+        if index == _KEY_NAMED:
+            keys.append(None)
+            named_positions.append(position)
+        elif index < len(schema_keys):
+            keys.append(schema_keys[index])
+        else:
+            raise ValueError(f"Unknown key index {index}.")
+
+        format = chr(format)
+        if format in _NUMBER_FORMATS:
+            value_sources.append(("number", len(number_formats)))
+            number_formats.append(format)
+        elif format == "s":
+            value_sources.append(("string", nof_string_values))
+            nof_string_values += 1
+        elif format in _ESCAPED_FORMATS.values():
+            value_sources.append(("escaped", len(escaped_formats)))
+            escaped_formats.append(format)
+        elif format == "n":
+            value_sources.append(("none", 0))
+        else:
+            raise ValueError(f"Unknown value format {format!r}.")
+
+    # the strings begin with the names of the keys
+    nof_strings = len(named_positions) + nof_string_values
+    source_offsets = {
+        "number": 0,
+        "string": len(number_formats) + len(named_positions),
+        "escaped": len(number_formats) + nof_strings,
+        "none": len(number_formats) + nof_strings + len(escaped_formats),
+    }
+    return (
+        tuple(keys),
+        tuple(named_positions),
+        _struct("".join(number_formats)),
+        nof_strings,
+        tuple(escaped_formats),
+        _getter([source_offsets[source] + index for source, index in value_sources]),
+    )
+
+
+def _decode_message(message) -> Tuple[int, type, Iterator[Tuple[str, object]]]:
+    message_kind, class_code, nof_entries, strings_length = _MESSAGE_PREAMBLE.unpack_from(message, 0)
+    offset = _MESSAGE_PREAMBLE.size
+    layout = bytes(message[offset:offset+2*nof_entries])
+    offset += len(layout)
+    strings_end = offset + strings_length
+
+    strings = None
+    if class_code == _CLASS_CODE_NAMED:
+        strings = str(message[offset:strings_end], "utf-8").split(_STRING_SEPARATOR)
+        header_class = _named_class(strings.pop(0))
+    elif class_code < len(HEADER_CODEC_CLASSES):
+        header_class = HEADER_CODEC_CLASSES[class_code]
+    else:
+        raise ValueError(f"Unknown header class code {class_code}.")
+
+    keys, named_positions, fixed_struct, nof_strings, escaped_formats, value_getter = _decoding_plan(
+        header_class,
+        layout
+    )
+    if strings is None:
+        strings = (
+            str(message[offset:strings_end], "utf-8").split(_STRING_SEPARATOR)
+            if nof_strings > 0
+            else []
+        )
+    if len(strings) != nof_strings:
+        raise ValueError(f"The message has {len(strings)} strings rather than {nof_strings}.")
+    if named_positions:
+        keys = list(keys)
+        for position, name in zip(named_positions, strings):
+            keys[position] = name
+
+    values = fixed_struct.unpack_from(message, strings_end) + tuple(strings)
+    if escaped_formats:
+        offset = strings_end + fixed_struct.size
+        escaped_values = []
+        for format in escaped_formats:
+            length = _LENGTH.unpack_from(message, offset)[0]
+            offset += _LENGTH.size
+            payload = bytes(message[offset:offset+length])
+            offset += length
+            if len(payload) != length:
+                raise ValueError("The message is truncated.")
+            escaped_values.append(
+                int.from_bytes(payload, "little", signed=True)
+                if format == "l"
+                else str(payload, "utf-8")
+            )
+        values += tuple(escaped_values)
+    return message_kind, header_class, zip(keys, value_getter(values + (None,)))
+
+
+def encode_header(header: Mapping) -> bytes:
+    """Encodes the key-values of the header, and its class, standalone."""
+    return _encode_message(_MESSAGE_FULL, type(header), tuple(header), tuple(header.values()))
+
+
+def decode_header(message) -> GuppiRawHeader:
+    """Decodes a header encoded by `encode_header`."""
+    message_kind, header_class, items = _decode_message(message)
+    if message_kind != _MESSAGE_FULL:
+        raise ValueError("Cannot decode a delta-encoded header standalone.")
+    return header_class(items)
+
+
+class GuppiRawHeaderEncoder:
+    """
+    Encodes a stream of headers compactly, for passing between processes
+    in lieu of pickling.
+
+    Keys in the schema of the header's class are encoded by their index,
+    others by name, and int, float, bool and str values are struct-packed
+    (other types of values cannot be encoded, bar None).
+    A header with the same class and keys (in the same order) as the
+    preceding one is encoded as the values that changed, unless
+    `keyframe_interval` headers have passed since the last full encoding.
+
+    The messages must be decoded in order, by a single
+    `GuppiRawHeaderDecoder`: for headers distributed across a pool of
+    workers use the stateless `encode_header`. Only the key-values and class
+    of the headers are encoded.
+    """
+
+    def __init__(self, delta: bool = True, keyframe_interval: Optional[int] = None):
+        self.delta = delta
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        self._previous_class = None
+        self._previous_keys = None
+        self._previous_values = None
+        self._nof_since_keyframe = 0
+
+    def encode(self, header: Mapping) -> bytes:
+        header_class = type(header)
+        keys = tuple(header)
+        values = tuple(header.values())
+        if (
+            self.delta
+            and header_class is self._previous_class
+            and keys == self._previous_keys
+            and (
+                self.keyframe_interval is None
+                or self._nof_since_keyframe < self.keyframe_interval
+            )
+        ):
+            changed_positions = [
+                position
+                for position, (value, previous_value) in enumerate(zip(values, self._previous_values))
+                if not (
+                    value is previous_value
+                    or (type(value) is type(previous_value) and value == previous_value)
+                )
+            ]
+            message = _encode_message(
+                _MESSAGE_DELTA,
+                header_class,
+                tuple(keys[position] for position in changed_positions),
+                tuple(values[position] for position in changed_positions)
+            )
+            self._nof_since_keyframe += 1
+        else:
+            message = _encode_message(_MESSAGE_FULL, header_class, keys, values)
+            self._previous_class = header_class
+            self._previous_keys = keys
+            self._nof_since_keyframe = 1
+        self._previous_values = values
+        return message
+
+
+class GuppiRawHeaderDecoder:
+    """Decodes the messages of a `GuppiRawHeaderEncoder`, in order."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._previous_keyvalues = None
+
+    def decode(self, message) -> GuppiRawHeader:
+        message_kind, header_class, items = _decode_message(message)
+        if message_kind == _MESSAGE_DELTA:
+            if self._previous_keyvalues is None:
+                raise ValueError("Cannot decode a delta-encoded header without its predecessor.")
+            keyvalues = dict(self._previous_keyvalues)
+            keyvalues.update(items)
+        else:
+            keyvalues = dict(items)
+        self._previous_keyvalues = keyvalues
+        return header_class(keyvalues)
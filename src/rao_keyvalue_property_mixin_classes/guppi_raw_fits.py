@@ -0,0 +1,358 @@
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+from .guppi_raw import GuppiRawProperties
+from .guppi_raw_header import (
+    GUPPI_RAW_HEADER_CLASS_REGISTRY,
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+    auto_init_GuppiRawHeader,
+    directio_padded_length,
+    FITS_CARD_LENGTH,
+    FITS_KEY_LENGTH,
+)
+from .hpdaq_ata import HpdaqAtaProperties
+from .hpdaq_cosmic import HpdaqCosmicProperties
+from .hpdaq_meerkat import HpdaqMeerkatProperties
+
+# Cards are decoded a FITS-block (36 cards) at a time, so that locating the
+# END card costs one decode of the header bytes rather than one per card.
+_DECODE_CHUNK_LENGTH = 36*FITS_CARD_LENGTH
+_END_KEY = "END".ljust(FITS_KEY_LENGTH)
+_END_CARD_KEY = _END_KEY.encode()
+# The bytes of FITS cards, by which a header cut short by the end of a file
+# is told apart from a corrupt one followed by block-data.
+_FITS_CARD_BYTES = bytes(range(0x20, 0x7F))
+_PARTIAL_HEADER_SCAN_LENGTH = 1 << 16
+# the length beyond which a header being read without an END card is deemed
+# corrupt
+MAX_FITS_HEADER_LENGTH = 1 << 20
+
+
+def decode_fits_value(value: str):
+    """Converts the value-field of a card to bool, int, float or str.
+
+    String values are those enclosed in single-quotes and, as per the FITS
+    standard, their trailing spaces are not significant. The boolean forms
+    written by `GuppiRawFitsExportable.to_fits` (`True`/`False`) are accepted
+    alongside the FITS `T`/`F`.
+    """
+    value = value.strip()
+    if value[0:1] == "'":
+        closing = value.rfind("'")
+        return value[1:closing if closing > 0 else None].rstrip()
+
+    value = value.split("/", 1)[0].rstrip()
+    if value in ("T", "True"):
+        return True
+    if value in ("F", "False"):
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_fits_keyvalues(buffer, offset: int = 0) -> Tuple[Dict, int]:
+    """Parses the 80-byte cards of `buffer`, from `offset` up to the END card.
+
+    The buffer may be any object supporting the buffer protocol (`bytes`,
+    `bytearray`, `memoryview`, `mmap.mmap`...); it is not copied card by card.
+    Keys are interned, so that the keys of many parsed headers share storage.
+    Cards without a value indicator (`COMMENT`, `HISTORY`, blank) are skipped.
+
+    Returns the key-values and the number of bytes spanned by the header,
+    including the END card (but excluding any DIRECTIO padding).
+    """
+    view = memoryview(buffer).cast("B")
+    keyvalues = {}
+    position = offset
+    while True:
+        chunk_length = min(
+            _DECODE_CHUNK_LENGTH,
+            (len(view) - position)//FITS_CARD_LENGTH*FITS_CARD_LENGTH
+        )
+        if chunk_length <= 0:
+            raise ValueError(
+                f"No END card found in the buffer after offset {offset}."
+            )
+        cards = str(view[position:position+chunk_length], "latin-1")
+
+        for card_start in range(0, chunk_length, FITS_CARD_LENGTH):
+            value_start = card_start + FITS_KEY_LENGTH
+            key = cards[card_start:value_start]
+            if key == _END_KEY:
+                return keyvalues, position + card_start + FITS_CARD_LENGTH - offset
+            if cards[value_start] != "=":
+                continue
+            keyvalues[sys.intern(key.rstrip())] = decode_fits_value(
+                cards[value_start+1:card_start+FITS_CARD_LENGTH]
+            )
+
+        position += chunk_length
+
+
+def find_fits_end_card(buffer, offset: int = 0, start: Optional[int] = None) -> int:
+    """The position in `buffer` of the END card of the header at `offset`,
+    searching the cards from `start` (a card boundary, by default `offset`),
+    or -1 if `buffer` holds no complete END card.
+
+    The buffer must support `find` (`bytes`, `bytearray`, `mmap.mmap`).
+    """
+    position = offset if start is None else start
+    while True:
+        # searching for the padded END key is slowed by the abundance of
+        # spaces, so find "END" and check the rest
+        position = buffer.find(b"END", position)
+        if position < 0:
+            return -1
+        if (
+            (position - offset) % FITS_CARD_LENGTH == 0
+            and buffer[position:position+FITS_KEY_LENGTH] == _END_CARD_KEY
+        ):
+            return position if position + FITS_CARD_LENGTH <= len(buffer) else -1
+        position += 1
+
+
+def is_partial_fits_header(buffer, offset: int = 0) -> bool:
+    """Whether the bytes of `buffer` from `offset` are no more than the start
+    of a header: FITS cards, optionally followed by NUL padding (as of a file
+    cut short by an interrupted recording). Anything else, such as the
+    block-data following a header that lacks its END card, is not.
+    """
+    padded = False
+    for start in range(offset, len(buffer), _PARTIAL_HEADER_SCAN_LENGTH):
+        chunk = bytes(buffer[start:start+_PARTIAL_HEADER_SCAN_LENGTH])
+        if padded:
+            if chunk.strip(b"\0"):
+                return False
+            continue
+        cards = chunk.rstrip(b"\0")
+        if cards.translate(None, _FITS_CARD_BYTES):
+            return False
+        padded = len(cards) < len(chunk)
+    return True
+
+
+class FitsHeaderAccumulator:
+    """
+    Gathers the bytes of a header read in chunks (from a file or a socket),
+    until they hold its END card. Each chunk's cards alone are searched for
+    the END card, so that reading is linear in the header's length.
+    """
+
+    def __init__(self, max_length: int = MAX_FITS_HEADER_LENGTH):
+        self.max_length = max_length
+        self.buffer = bytearray()
+        self._searched_length = 0
+
+    def feed(self, chunk) -> Optional[Tuple[Dict, int]]:
+        """Appends the chunk, returning the key-values and length of the
+        header (as per `parse_fits_keyvalues`) once its END card is held,
+        else None. Raises ValueError once `max_length` bytes are held
+        without an END card.
+        """
+        self.buffer += chunk
+        if find_fits_end_card(self.buffer, 0, self._searched_length) >= 0:
+            return parse_fits_keyvalues(self.buffer)
+        if len(self.buffer) >= self.max_length:
+            raise ValueError(f"No END card within the first {self.max_length} bytes.")
+        # resume from the last whole card, which may be a partial END card
+        self._searched_length = len(self.buffer) - len(self.buffer) % FITS_CARD_LENGTH
+        return None
+
+    def is_partial(self) -> bool:
+        """Whether the bytes gathered are no more than the start of a header
+        (see `is_partial_fits_header`).
+        """
+        return is_partial_fits_header(self.buffer)
+
+
+def parse_GuppiRawHeader(buffer, offset: int = 0) -> Tuple[GuppiRawHeader, int]:
+    """Parses the header at `offset` of `buffer` into the GuppiRawHeader class
+    appropriate to its key-values (see `auto_init_GuppiRawHeader`).
+
+    Returns the header and the number of bytes it spans, including the END
+    card (but excluding any DIRECTIO padding).
+    """
+    keyvalues, header_length = parse_fits_keyvalues(buffer, offset)
+    return auto_init_GuppiRawHeader(keyvalues), header_length
+
+
+class GuppiRawFitsView(Mapping):
+    """
+    A read-only mapping over the FITS cards of a header held in `buffer`
+    (such as an `mmap.mmap` of a file), decoding only the values read.
+
+    Where the buffer supports `find`/`rfind` (`bytes`, `bytearray`,
+    `mmap.mmap`), each key read is located by searching for its card, and
+    its offset memoized. Otherwise, and for iteration, a key-to-offset table
+    of all the cards is built on first touch. As with `parse_fits_keyvalues`
+    the last card of a repeated key prevails.
+    """
+
+    def __init__(self, buffer, offset: int = 0):
+        self._buffer = buffer
+        self._offset = offset
+        self._searchable = hasattr(buffer, "rfind")
+        self._end_card_offset: Optional[int] = None
+        self._card_offsets: Dict[str, int] = {}
+        self._card_table_complete = False
+        self._values: Dict[str, object] = {}
+
+    @classmethod
+    def from_view(cls, view: "GuppiRawFitsView"):
+        """A view of the same header as `view` as an instance of `cls`, keeping
+        the cards that `view` has already located and decoded.
+        """
+        copy = cls(view._buffer, view._offset)
+        copy._end_card_offset = view._end_card_offset
+        copy._card_offsets = dict(view._card_offsets)
+        copy._card_table_complete = view._card_table_complete
+        copy._values = dict(view._values)
+        return copy
+
+    @property
+    def header_length(self) -> int:
+        """The number of bytes spanned by the header, including the END card
+        (but excluding any DIRECTIO padding).
+        """
+        return self._end_offset() + FITS_CARD_LENGTH - self._offset
+
+    @property
+    def data_offset(self) -> int:
+        """The offset in the buffer of the block-data following the header."""
+        return self._offset + directio_padded_length(
+            self.header_length,
+            self.get("DIRECTIO", False)
+        )
+
+    def _end_offset(self) -> int:
+        if self._end_card_offset is None:
+            if self._searchable:
+                position = find_fits_end_card(self._buffer, self._offset)
+                if position < 0:
+                    raise ValueError(
+                        f"No END card found in the buffer after offset {self._offset}."
+                    )
+                self._end_card_offset = position
+            else:
+                self._build_card_table()
+        return self._end_card_offset
+
+    def _build_card_table(self):
+        card_offsets = {}
+        position = self._offset
+        while True:
+            if position + FITS_CARD_LENGTH > len(self._buffer):
+                raise ValueError(
+                    f"No END card found in the buffer after offset {self._offset}."
+                )
+            key = str(self._buffer[position:position+FITS_KEY_LENGTH+1], "latin-1")
+            if key[0:FITS_KEY_LENGTH] == _END_KEY:
+                break
+            if key[FITS_KEY_LENGTH] == "=":
+                card_offsets[sys.intern(key[0:FITS_KEY_LENGTH].rstrip())] = position
+            position += FITS_CARD_LENGTH
+
+        self._end_card_offset = position
+        self._card_offsets = card_offsets
+        self._card_table_complete = True
+
+    def _card_offset(self, key) -> int:
+        if key in self._card_offsets:
+            return self._card_offsets[key]
+        if self._card_table_complete or not isinstance(key, str):
+            raise KeyError(key)
+        if not self._searchable:
+            self._build_card_table()
+            return self._card_offset(key)
+
+        card_key = f"{key[:FITS_KEY_LENGTH]:{FITS_KEY_LENGTH}s}=".encode("latin-1")
+        start = self._offset
+        position = self._end_offset()
+        while True:
+            position = self._buffer.rfind(card_key, start, position + len(card_key) - 1)
+            if position < 0:
+                raise KeyError(key)
+            if (position - self._offset) % FITS_CARD_LENGTH == 0:
+                self._card_offsets[key] = position
+                return position
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        position = self._card_offset(key)
+        value = decode_fits_value(str(
+            self._buffer[position+FITS_KEY_LENGTH+1:position+FITS_CARD_LENGTH],
+            "latin-1"
+        ))
+        self._values[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._card_table_complete:
+            self._build_card_table()
+        return iter(self._card_offsets)
+
+    def __len__(self) -> int:
+        if not self._card_table_complete:
+            self._build_card_table()
+        return len(self._card_offsets)
+
+    def to_header(self) -> GuppiRawHeader:
+        """Decodes all of the cards into the appropriate GuppiRawHeader."""
+        return auto_init_GuppiRawHeader(dict(self.items()))
+
+
+class GuppiRawLazyHeader(GuppiRawFitsView, GuppiRawProperties):
+    pass
+
+
+class GuppiRawAtaLazyHeader(HpdaqAtaProperties, GuppiRawLazyHeader):
+    pass
+
+
+class GuppiRawCosmicLazyHeader(HpdaqCosmicProperties, GuppiRawLazyHeader):
+    pass
+
+
+class GuppiRawMeerkatLazyHeader(HpdaqMeerkatProperties, GuppiRawLazyHeader):
+    pass
+
+
+LAZY_HEADER_CLASS_MAP = {
+    GuppiRawHeader: GuppiRawLazyHeader,
+    GuppiRawAtaHeader: GuppiRawAtaLazyHeader,
+    GuppiRawCosmicHeader: GuppiRawCosmicLazyHeader,
+    GuppiRawMeerkatHeader: GuppiRawMeerkatLazyHeader,
+}
+
+
+def lazy_header_class(header_class: type) -> type:
+    """The lazy header class corresponding to the GuppiRawHeader class, or
+    to the nearest of its bases that has one (see `LAZY_HEADER_CLASS_MAP`).
+    """
+    for klass in header_class.__mro__:
+        if klass in LAZY_HEADER_CLASS_MAP:
+            return LAZY_HEADER_CLASS_MAP[klass]
+    return GuppiRawLazyHeader
+
+
+def lazy_GuppiRawHeader(buffer, offset: int = 0) -> GuppiRawLazyHeader:
+    """Presents the header at `offset` of `buffer` as the lazy header class
+    corresponding to the GuppiRawHeader class its key-values resolve to.
+    """
+    view = GuppiRawFitsView(buffer, offset)
+    header_class = GUPPI_RAW_HEADER_CLASS_REGISTRY.resolve(view)
+    # keep the cards that resolution already located and decoded
+    return lazy_header_class(header_class).from_view(view)
@@ -1,53 +1,293 @@
+import warnings
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
 from .guppi_raw import GuppiRawProperties, GuppiRawDatatype
 from .hpdaq_ata import HpdaqAtaProperties
 from .hpdaq_cosmic import HpdaqCosmicProperties
 from .hpdaq_meerkat import HpdaqMeerkatProperties
+from .property_cache import KeyValuePropertyCache
+
+FITS_CARD_LENGTH = 80
+FITS_KEY_LENGTH = 8
+DIRECTIO_ALIGNMENT = 512
+
+
+def directio_padded_length(header_length: int, directio: bool) -> int:
+    """The number of bytes between the start of a header and its block-data,
+    when the header is padded to align the block-data for direct-IO.
+    """
+    if not directio:
+        return header_length
+    return -(-header_length//DIRECTIO_ALIGNMENT)*DIRECTIO_ALIGNMENT
 
 
 class GuppiRawFitsExportable:
+    _END_CARD = "END                                                                             "
+
     @staticmethod
     def _keyvalue_to_fits(key: str, value) -> str:
         v = str(value) if not isinstance(value, str) else f"\'{value[:69]}\'"
         return f"{key[:8]:8s}={v[:71]:71s}"
 
     def to_fits(self) -> str:
-        return "".join(
+        return "".join([
             GuppiRawFitsExportable._keyvalue_to_fits(key, value)
             for key, value in self.items()
-        ) + "END                                                                             "
+        ]) + GuppiRawFitsExportable._END_CARD
+
+    def fits_length(self) -> int:
+        """The number of bytes of the FITS serialization, including the END
+        card and, if `directio` is set, the padding thereafter.
+        """
+        return directio_padded_length(
+            (len(self) + 1)*FITS_CARD_LENGTH,
+            self.get("DIRECTIO", False)
+        )
+
+    def fits_card_positions(self, keys=None) -> Dict[str, int]:
+        """The byte position of the card of each of `keys` (by default all)
+        within the FITS serialization. Computed once, it can be passed as the
+        `keys` of `to_fits_into` for as long as the keys are unchanged.
+        """
+        positions = {
+            key: enum*FITS_CARD_LENGTH
+            for enum, key in enumerate(self)
+        }
+        if keys is None:
+            return positions
+        return {key: positions[key] for key in keys}
+
+    def to_fits_into(self, buffer, offset: int = 0, keys=None) -> int:
+        """Writes the FITS serialization into the writable `buffer` (such as
+        a `bytearray` or an `mmap.mmap` of an output file) at `offset`,
+        padded with spaces if `directio` is set.
+
+        Given `keys`, only the cards of those keys are rewritten, presuming
+        that the buffer holds a serialization of the same keys in the same
+        order (for instance to advance `PKTIDX` for the next block). Passing
+        the `fits_card_positions` of the keys spares locating their cards.
+
+        Returns the number of bytes spanned (see `fits_length`).
+        """
+        view = memoryview(buffer).cast("B")
+        length = self.fits_length()
+        if offset + length > len(view):
+            raise ValueError(
+                f"Buffer of {len(view)} bytes cannot hold {length} bytes at offset {offset}."
+            )
+
+        if keys is not None:
+            if not isinstance(keys, Mapping):
+                keys = self.fits_card_positions(keys)
+            for key, position in keys.items():
+                position += offset
+                view[position:position+FITS_CARD_LENGTH] = GuppiRawFitsExportable._keyvalue_to_fits(
+                    key,
+                    self[key]
+                ).encode("latin-1")
+            return length
+
+        # a single encode and copy of the whole serialization, padding included
+        view[offset:offset+length] = self.to_fits().ljust(length).encode("latin-1")
+        return length
+
+
+class GuppiRawHeaderClassRegistry:
+    """
+    Resolves the GuppiRawHeader class for key-values, from the classes
+    registered on the values of one or more keys (`TELESCOP`, `BACKEND`...).
+    Where several registrations match, that on the most keys prevails, then
+    the latest registered.
+
+    Resolutions are memoized against the values of all the registered keys,
+    so dispatch costs a single hash lookup once a combination has been seen.
+    """
+
+    def __init__(self, default_class):
+        self.default_class = default_class
+        self._registrations: List[Tuple[Dict[str, Any], type]] = []
+        self._dispatch_keys: Tuple[str, ...] = ()
+        self._dispatch_class_map: Dict[Tuple, type] = {}
+
+    def register(self, header_class, **keyvalues):
+        if len(keyvalues) == 0:
+            raise ValueError("A class must be registered on at least one key.")
+        self._registrations.append((keyvalues, header_class))
+        self._compile()
+
+    def unregister(self, header_class):
+        self._registrations = [
+            registration
+            for registration in self._registrations
+            if registration[1] is not header_class
+        ]
+        self._compile()
+
+    def _compile(self):
+        self._dispatch_keys = tuple(sorted({
+            key
+            for registered_keyvalues, _ in self._registrations
+            for key in registered_keyvalues
+        }))
+        self._dispatch_class_map.clear()
+
+    def _resolve_dispatch_values(self, dispatch_values: Tuple) -> type:
+        keyvalues = dict(zip(self._dispatch_keys, dispatch_values))
+        matches = [
+            (len(registered_keyvalues), enum, header_class)
+            for enum, (registered_keyvalues, header_class) in enumerate(self._registrations)
+            if all(
+                keyvalues[key] == value
+                for key, value in registered_keyvalues.items()
+            )
+        ]
+        if len(matches) == 0:
+            return self.default_class
+        return max(matches, key=lambda match: match[0:2])[2]
+
+    def resolve(self, keyvalues: Mapping) -> type:
+        dispatch_values = tuple(keyvalues.get(key) for key in self._dispatch_keys)
+        try:
+            return self._dispatch_class_map[dispatch_values]
+        except KeyError:
+            header_class = self._resolve_dispatch_values(dispatch_values)
+            self._dispatch_class_map[dispatch_values] = header_class
+            return header_class
+
+    def registered_classes(self) -> List[type]:
+        """The default class then the registered classes, in order."""
+        classes = [self.default_class]
+        for _, header_class in self._registrations:
+            if header_class not in classes:
+                classes.append(header_class)
+        return classes
+
+    def init(self, keyvalues: Mapping):
+        return self.resolve(keyvalues)(keyvalues)
+
+    def init_batch(self, keyvalues_iterable: Iterable[Mapping]) -> Iterator:
+        """Initializes a header for each of the key-values of a stream, all
+        of the class resolved for the first (the blocks of a stream share
+        their telescope and backend).
+        """
+        header_class = None
+        for keyvalues in keyvalues_iterable:
+            if header_class is None:
+                header_class = self.resolve(keyvalues)
+            yield header_class(keyvalues)
 
 
 class GuppiRawHeader(dict, GuppiRawProperties, GuppiRawFitsExportable):
-    pass
+    # subclasses declaring these key-values are registered with
+    # `GUPPI_RAW_HEADER_CLASS_REGISTRY` for `auto_init_GuppiRawHeader`
+    DISPATCH_KEYVALUES: Dict[str, Any] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "DISPATCH_KEYVALUES" in cls.__dict__:
+            GUPPI_RAW_HEADER_CLASS_REGISTRY.register(cls, **cls.DISPATCH_KEYVALUES)
+
+
+GUPPI_RAW_HEADER_CLASS_REGISTRY = GuppiRawHeaderClassRegistry(GuppiRawHeader)
 
 
 class GuppiRawAtaHeader(HpdaqAtaProperties, GuppiRawHeader):
-    pass
+    DISPATCH_KEYVALUES = {"TELESCOP": "ATA"}
 
 
 class GuppiRawCosmicHeader(HpdaqCosmicProperties, GuppiRawHeader):
-    pass
+    DISPATCH_KEYVALUES = {"TELESCOP": "VLA"}
 
 
 class GuppiRawMeerkatHeader(HpdaqMeerkatProperties, GuppiRawHeader):
-    pass
+    DISPATCH_KEYVALUES = {"TELESCOP": "MeerKAT"}
 
 
-PROPERTY_FGET_CLASS_MAP = {
-    GuppiRawProperties.telescope.fget: {
-        cls.telescope.fget(): cls
-        for cls in [
-            GuppiRawAtaHeader,
-            GuppiRawCosmicHeader,
-            GuppiRawMeerkatHeader
-        ]
-    }
+CACHED_PROPERTIES = (
+    "nof_spectra_per_block",
+    "blockshape",
+    "observed_nof_antenna_channels",
+    "channel_bandwidth",
+    "nof_packet_indices_per_block",
+    "time_unix_epoch_seconds",
+    "channel_frequencies",
+    "channel_indices",
+)
+
+ANTENNA_CACHED_PROPERTIES = (
+    "antenna_names",
+    "antenna_flags",
+    "antenna_index_map",
+    "antenna_flag_mask",
+    "unflagged_antenna_indices",
+)
+
+
+# The cached header classes memoize the derived properties (see
+# `KeyValuePropertyCache`), which suits headers whose properties are read
+# repeatedly. Tracing the keys read costs every key access, so the headers
+# of a stream of blocks, each read once, are better left uncached.
+class GuppiRawCachedHeader(KeyValuePropertyCache, GuppiRawHeader):
+    CACHED_PROPERTIES = CACHED_PROPERTIES
+
+
+class GuppiRawAtaCachedHeader(KeyValuePropertyCache, GuppiRawAtaHeader):
+    CACHED_PROPERTIES = CACHED_PROPERTIES + ANTENNA_CACHED_PROPERTIES
+
+
+class GuppiRawCosmicCachedHeader(KeyValuePropertyCache, GuppiRawCosmicHeader):
+    CACHED_PROPERTIES = CACHED_PROPERTIES + ANTENNA_CACHED_PROPERTIES
+
+
+class GuppiRawMeerkatCachedHeader(KeyValuePropertyCache, GuppiRawMeerkatHeader):
+    CACHED_PROPERTIES = CACHED_PROPERTIES
+
+
+CACHED_HEADER_CLASS_MAP = {
+    GuppiRawHeader: GuppiRawCachedHeader,
+    GuppiRawAtaHeader: GuppiRawAtaCachedHeader,
+    GuppiRawCosmicHeader: GuppiRawCosmicCachedHeader,
+    GuppiRawMeerkatHeader: GuppiRawMeerkatCachedHeader,
 }
 
 
+def cached_header_class(header_class: type) -> type:
+    """The cached header class corresponding to the GuppiRawHeader class, or
+    to the nearest of its bases that has one (see `CACHED_HEADER_CLASS_MAP`).
+    """
+    if issubclass(header_class, KeyValuePropertyCache):
+        return header_class
+    for klass in header_class.__mro__:
+        if klass in CACHED_HEADER_CLASS_MAP:
+            return CACHED_HEADER_CLASS_MAP[klass]
+    return GuppiRawCachedHeader
+
+
+def _property_fget_class_map() -> Mapping:
+    # the TELESCOP registrations, in the form of the former map
+    return MappingProxyType({
+        GuppiRawProperties.telescope.fget: MappingProxyType({
+            registered_keyvalues["TELESCOP"]: header_class
+            for registered_keyvalues, header_class in GUPPI_RAW_HEADER_CLASS_REGISTRY._registrations
+            if set(registered_keyvalues) == {"TELESCOP"}
+        })
+    })
+
+
+def __getattr__(name: str):
+    if name == "PROPERTY_FGET_CLASS_MAP":
+        warnings.warn(
+            "PROPERTY_FGET_CLASS_MAP is deprecated and read-only: header classes "
+            "are registered with GUPPI_RAW_HEADER_CLASS_REGISTRY (see "
+            "GuppiRawHeader.DISPATCH_KEYVALUES).",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        return _property_fget_class_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def auto_init_GuppiRawHeader(keyvalues: dict):
-    for property_fget, value_class_map in PROPERTY_FGET_CLASS_MAP.items():
-        property_value = property_fget(keyvalues)
-        if property_value in value_class_map:
-            return value_class_map[property_value](**keyvalues)
-    return GuppiRawHeader(**keyvalues)
+    return GUPPI_RAW_HEADER_CLASS_REGISTRY.init(keyvalues)
@@ -0,0 +1,408 @@
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy
+
+from .guppi_raw import GuppiRawProperties
+from .guppi_raw_header import (
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+)
+from .hpdaq import HpdaqProperties
+from .hpdaq_ata import HpdaqAtaProperties
+from .hpdaq_cosmic import HpdaqCosmicProperties
+from .hpdaq_meerkat import HpdaqMeerkatProperties
+
+
+class HeaderTableRow(Mapping):
+    """
+    A read-only view of a row of a `HeaderTable`, presenting the key-values
+    of a single header without copying them out of the columns.
+    """
+
+    def __init__(self, table, index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.table._row_value(key, self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return (
+            key
+            for key in self.table.keys()
+            if self.table._row_has_key(key, self.index)
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_header(self) -> GuppiRawHeader:
+        """Materializes the row as an instance of the table's header class."""
+        return self.table.HEADER_CLASS(self)
+
+
+class HeaderTable:
+    """
+    Struct-of-arrays storage of the key-values of many headers: each key is
+    a NumPy column, typed by its values (bool, int64, float64, or object).
+    String columns are stored as codes into their distinct values, so that
+    the values constant across headers are stored once.
+
+    `__getitem__`/`get` return whole columns, so the property mixins of the
+    subclasses evaluate column-wise (`table.time_unix_epoch_seconds` is an
+    array). A key missing from some rows raises KeyError via `__getitem__`
+    and is filled with the default via `get`.
+    """
+
+    HEADER_CLASS = GuppiRawHeader
+    ROW_CLASS = HeaderTableRow
+
+    def __init__(
+        self,
+        nof_rows: int,
+        columns: Dict[str, numpy.ndarray],
+        column_values: Optional[Dict[str, numpy.ndarray]] = None,
+        column_missing: Optional[Dict[str, numpy.ndarray]] = None
+    ):
+        self.nof_rows = nof_rows
+        # the codes of categorical columns index into their `column_values`
+        self._columns = columns
+        self._column_values = column_values or {}
+        self._column_missing = column_missing or {}
+
+    @classmethod
+    def from_headers(cls, headers: Iterable[Mapping]):
+        """Gathers the key-values of the headers into columns.
+
+        Called on `HeaderTable`, the table class is chosen to suit the class
+        of the first header (see `HEADER_TABLE_CLASS_MAP`).
+        """
+        table_class = cls
+        column_lists: Dict[str, List] = {}
+        nof_rows = 0
+        for header in headers:
+            if nof_rows == 0 and cls is HeaderTable:
+                table_class = HEADER_TABLE_CLASS_MAP.get(type(header), GuppiRawHeaderTable)
+            for key, value in header.items():
+                column = column_lists.get(key)
+                if column is None:
+                    column = column_lists[key] = [None]*nof_rows
+                column.append(value)
+            nof_rows += 1
+            for column in column_lists.values():
+                if len(column) < nof_rows:
+                    column.append(None)
+
+        columns = {}
+        column_values = {}
+        column_missing = {}
+        for key, values in column_lists.items():
+            missing = [value is None for value in values]
+            if any(missing):
+                column_missing[key] = numpy.array(missing, dtype=bool)
+            present_types = {type(value) for value in values if value is not None}
+
+            if present_types == {str}:
+                codes = {}
+                columns[key] = numpy.fromiter(
+                    (
+                        0 if value is None else codes.setdefault(value, len(codes))
+                        for value in values
+                    ),
+                    dtype=numpy.uint32,
+                    count=len(values)
+                )
+                column_values[key] = numpy.array(list(codes), dtype=object)
+                continue
+
+            if present_types == {bool}:
+                dtype, fill = bool, False
+            elif present_types <= {int}:
+                dtype, fill = numpy.int64, 0
+            elif present_types <= {int, float}:
+                dtype, fill = numpy.float64, 0.0
+            else:
+                dtype, fill = object, None
+            try:
+                columns[key] = numpy.array(
+                    [fill if value is None else value for value in values],
+                    dtype=dtype
+                )
+            except OverflowError:
+                columns[key] = numpy.array(values, dtype=object)
+
+        return table_class(nof_rows, columns, column_values, column_missing)
+
+    def __len__(self) -> int:
+        return self.nof_rows
+
+    def __contains__(self, key) -> bool:
+        return key in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def keys(self):
+        return self._columns.keys()
+
+    def column(self, key) -> numpy.ndarray:
+        if key in self._column_values:
+            return self._column_values[key][self._columns[key]]
+        return self._columns[key]
+
+    def __getitem__(self, key) -> numpy.ndarray:
+        if key in self._column_missing:
+            raise KeyError(key)
+        return self.column(key)
+
+    def get(self, key, default=None):
+        if key not in self._columns:
+            if isinstance(default, numpy.ndarray):
+                return default
+            return numpy.full(self.nof_rows, default)
+        column = self.column(key)
+        if key in self._column_missing:
+            column = numpy.where(self._column_missing[key], default, column)
+        return column
+
+    def row(self, index: int) -> HeaderTableRow:
+        if not -self.nof_rows <= index < self.nof_rows:
+            raise IndexError(index)
+        return self.ROW_CLASS(self, index % self.nof_rows)
+
+    def rows(self) -> Iterator[HeaderTableRow]:
+        return (self.ROW_CLASS(self, index) for index in range(self.nof_rows))
+
+    def subset(self, indices):
+        """A table of the rows at `indices` (or of a boolean mask), dropping
+        the columns that none of them have.
+        """
+        indices = numpy.arange(self.nof_rows)[indices]
+        columns = {}
+        column_missing = {}
+        for key, column in self._columns.items():
+            if key in self._column_missing:
+                missing = self._column_missing[key][indices]
+                if missing.all() and len(indices) > 0:
+                    continue
+                if missing.any():
+                    column_missing[key] = missing
+            columns[key] = column[indices]
+        return type(self)(
+            len(indices),
+            columns,
+            {key: values for key, values in self._column_values.items() if key in columns},
+            column_missing
+        )
+
+    def _row_has_key(self, key, index: int) -> bool:
+        return key in self._columns and not (
+            key in self._column_missing and self._column_missing[key][index]
+        )
+
+    def _row_value(self, key, index: int):
+        if not self._row_has_key(key, index):
+            raise KeyError(key)
+        value = self._columns[key][index]
+        if key in self._column_values:
+            return self._column_values[key][value]
+        return value.item() if isinstance(value, numpy.generic) else value
+
+
+class GuppiRawHeaderTableRow(HeaderTableRow, GuppiRawProperties):
+    pass
+
+
+class GuppiRawAtaHeaderTableRow(HpdaqAtaProperties, GuppiRawHeaderTableRow):
+    pass
+
+
+class GuppiRawCosmicHeaderTableRow(HpdaqCosmicProperties, GuppiRawHeaderTableRow):
+    pass
+
+
+class GuppiRawMeerkatHeaderTableRow(HpdaqMeerkatProperties, GuppiRawHeaderTableRow):
+    pass
+
+
+class GuppiRawHeaderTable(HeaderTable, GuppiRawProperties):
+    HEADER_CLASS = GuppiRawHeader
+    ROW_CLASS = GuppiRawHeaderTableRow
+
+    rightascension_hours: numpy.ndarray = property(
+        fget=lambda self: GuppiRawProperties.from_sexagesimal_str_array(
+            self.rightascension_string
+        ),
+        fset=None,
+        doc="""The right-ascension coordinate of the telescope for each block.
+        """
+    )
+
+    declination_degrees: numpy.ndarray = property(
+        fget=lambda self: GuppiRawProperties.from_sexagesimal_str_array(
+            self.declination_string
+        ),
+        fset=None,
+        doc="""The declination coordinate of the telescope for each block.
+        """
+    )
+
+    channel_frequencies: numpy.ndarray = property(
+        fget=lambda self: (
+            self.observed_frequency[:, None]
+            + numpy.outer(
+                self._signed_channel_bandwidths(),
+                GuppiRawProperties._channel_frequencies(0.0, 1.0, self._nof_antenna_channels())
+            )
+        ),
+        fset=None,
+        doc="""The center frequency of each channel of an antenna, for each
+        block: of shape [rows, channels].
+        """
+    )
+
+    channel_indices: numpy.ndarray = property(
+        fget=lambda self: (
+            self.observed_channels_offset[:, None]
+            + numpy.arange(self._nof_antenna_channels())
+        ),
+        fset=None,
+        doc="""The total-observation index of each channel of an antenna, for
+        each block: of shape [rows, channels].
+        """
+    )
+
+    def _nof_antenna_channels(self) -> int:
+        nof_channels = numpy.unique(self.observed_nof_antenna_channels)
+        if len(nof_channels) > 1:
+            raise ValueError("The rows differ in their number of channels per antenna.")
+        return int(nof_channels[0]) if len(nof_channels) > 0 else 0
+
+    def _signed_channel_bandwidths(self) -> numpy.ndarray:
+        # as `GuppiRawProperties._signed_channel_bandwidth`, per row
+        channel_bandwidth = numpy.asarray(self.channel_bandwidth, dtype=numpy.float64)
+        has_channel_bandwidth = numpy.zeros(self.nof_rows, dtype=bool)
+        if "CHAN_BW" in self._columns:
+            has_channel_bandwidth = ~self._column_missing.get("CHAN_BW", has_channel_bandwidth)
+        return numpy.where(
+            has_channel_bandwidth,
+            channel_bandwidth,
+            numpy.copysign(channel_bandwidth, self.get("OBSBW", channel_bandwidth))
+        )
+
+
+# the string manipulations of the hpdaq properties, applied to each value of
+# a column (as object arrays) rather than to the column itself
+_truncated_directory_names = numpy.frompyfunc(lambda value: value[0:23], 1, 1)
+_joined_paths = numpy.frompyfunc(os.path.join, 2, 1)
+
+
+class HpdaqHeaderTableProperties(HpdaqProperties):
+    """
+    The `HpdaqProperties` that manipulate string values, evaluated per row
+    of a `HeaderTable`'s columns.
+    """
+
+    project_id: numpy.ndarray = property(
+        fget=lambda self: _truncated_directory_names(self.get("PROJID", ".")),
+        fset=None,
+        doc="""The `project_id` of each block.
+        """
+    )
+
+    backend: numpy.ndarray = property(
+        fget=lambda self: _truncated_directory_names(self.get("BACKEND", ".")),
+        fset=None,
+        doc="""The `backend` of each block.
+        """
+    )
+
+    observation_output_directorypath: numpy.ndarray = property(
+        fget=lambda self: _joined_paths(
+            _joined_paths(self.data_directory, self.project_id),
+            self.backend
+        ),
+        fset=None,
+        doc="""The `observation_output_directorypath` of each block.
+        """
+    )
+
+
+class HpdaqAtaHeaderTableProperties(HpdaqHeaderTableProperties, HpdaqAtaProperties):
+    observation_stempath: numpy.ndarray = property(
+        fget=lambda self: _joined_paths(
+            self.observation_output_directorypath,
+            self.observation_stem
+        ),
+        fset=None,
+        doc="""The `observation_stempath` of each block.
+        """
+    )
+
+
+class GuppiRawAtaHeaderTable(HpdaqAtaHeaderTableProperties, GuppiRawHeaderTable):
+    HEADER_CLASS = GuppiRawAtaHeader
+    ROW_CLASS = GuppiRawAtaHeaderTableRow
+
+
+class GuppiRawCosmicHeaderTable(
+    HpdaqAtaHeaderTableProperties,
+    HpdaqCosmicProperties,
+    GuppiRawHeaderTable
+):
+    HEADER_CLASS = GuppiRawCosmicHeader
+    ROW_CLASS = GuppiRawCosmicHeaderTableRow
+
+    phasecenter_rightascension_hours: numpy.ndarray = property(
+        fget=lambda self: GuppiRawProperties.from_sexagesimal_str_array(
+            self.__getitem__("RA_PHAS")
+        ),
+        fset=None,
+        doc="""The right-ascension phase-center coordinate of each block.
+        """
+    )
+
+    phasecenter_declination_degrees: numpy.ndarray = property(
+        fget=lambda self: GuppiRawProperties.from_sexagesimal_str_array(
+            self.__getitem__("DEC_PHAS")
+        ),
+        fset=None,
+        doc="""The declination phase-center coordinate of each block.
+        """
+    )
+
+
+class GuppiRawMeerkatHeaderTable(
+    HpdaqHeaderTableProperties,
+    HpdaqMeerkatProperties,
+    GuppiRawHeaderTable
+):
+    HEADER_CLASS = GuppiRawMeerkatHeader
+    ROW_CLASS = GuppiRawMeerkatHeaderTableRow
+
+    nof_polarizations: numpy.ndarray = property(
+        fget=lambda self: numpy.where(
+            self.__getitem__("NPOL") == 4,
+            2,
+            self.__getitem__("NPOL")
+        ),
+        fset=None,
+        doc="""Number of polarizations in the data of each block, with a value
+        of 4 reinterpreted as 2 (see `HpdaqMeerkatProperties`).
+        """
+    )
+
+
+HEADER_TABLE_CLASS_MAP = {
+    table_class.HEADER_CLASS: table_class
+    for table_class in [
+        GuppiRawHeaderTable,
+        GuppiRawAtaHeaderTable,
+        GuppiRawCosmicHeaderTable,
+        GuppiRawMeerkatHeaderTable,
+    ]
+}
@@ -0,0 +1,185 @@
+import os
+import struct
+
+import numpy
+
+from .guppi_raw_reader import GuppiRawReader
+
+
+class GuppiRawBlockIndex:
+    """
+    The offsets and timing of each block in a GUPPI RAW file, gathered in a
+    single pass over its headers and persisted to a sidecar file
+    (`<filepath>.blkidx`) which is trusted while the file's size and
+    modification time are unchanged.
+    """
+
+    SIDECAR_SUFFIX = ".blkidx"
+    SIDECAR_MAGIC = b"GRAWIDX1"
+    # magic, file size, file modification time (ns), number of blocks
+    SIDECAR_PREAMBLE = struct.Struct("<8sQqQ")
+
+    RECORD_DTYPE = numpy.dtype([
+        ("header_offset", "<u8"),
+        ("data_offset", "<u8"),
+        ("packet_index", "<i8"),
+        ("nof_packet_indices", "<i8"),
+        ("blocksize", "<u8"),
+        ("time_unix_epoch_seconds", "<f8"),
+    ])
+
+    def __init__(self, filepath: str, records: numpy.ndarray):
+        self.filepath = filepath
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def sidecar_filepath(cls, filepath: str) -> str:
+        return filepath + cls.SIDECAR_SUFFIX
+
+    @classmethod
+    def build(cls, filepath: str):
+        """Scans the headers of the file, skipping over the block-data."""
+        records = []
+        with GuppiRawReader(filepath) as reader:
+            offset = 0
+            while offset < len(reader):
+                try:
+                    header, data_offset = reader.read_header(offset)
+                except EOFError:
+                    break
+                blocksize = header.blocksize
+                if data_offset + blocksize > len(reader):
+                    break
+                try:
+                    time_unix = header.time_unix_epoch_seconds
+                    nof_packet_indices = header.nof_packet_indices_per_block
+                except (KeyError, ValueError, ZeroDivisionError):
+                    time_unix = numpy.nan
+                    nof_packet_indices = header.get("PIPERBLK", 0)
+                records.append((
+                    offset,
+                    data_offset,
+                    header.packet_index,
+                    nof_packet_indices,
+                    blocksize,
+                    time_unix,
+                ))
+                offset = data_offset + blocksize
+
+        return cls(filepath, numpy.array(records, dtype=cls.RECORD_DTYPE))
+
+    @classmethod
+    def load(cls, filepath: str):
+        """Returns the index persisted for the file, or `None` if there is
+        no such sidecar or it is stale.
+        """
+        try:
+            stat = os.stat(filepath)
+            with open(cls.sidecar_filepath(filepath), "rb") as fio:
+                magic, size, mtime_ns, nof_blocks = cls.SIDECAR_PREAMBLE.unpack(
+                    fio.read(cls.SIDECAR_PREAMBLE.size)
+                )
+                if (
+                    magic != cls.SIDECAR_MAGIC
+                    or size != stat.st_size
+                    or mtime_ns != stat.st_mtime_ns
+                ):
+                    return None
+                records = numpy.fromfile(fio, dtype=cls.RECORD_DTYPE, count=nof_blocks)
+        except (OSError, struct.error):
+            return None
+
+        if len(records) != nof_blocks:
+            return None
+        return cls(filepath, records)
+
+    @classmethod
+    def open(cls, filepath: str, rebuild: bool = False):
+        """Loads the persisted index of the file, building (and persisting)
+        it if it is missing, stale or `rebuild` is set.
+        """
+        index = None if rebuild else cls.load(filepath)
+        if index is None:
+            index = cls.build(filepath)
+            try:
+                index.save()
+            except OSError:
+                # the index remains usable, it just isn't persisted
+                pass
+        return index
+
+    def save(self):
+        stat = os.stat(self.filepath)
+        sidecar_filepath = self.sidecar_filepath(self.filepath)
+        with open(sidecar_filepath + ".tmp", "wb") as fio:
+            fio.write(self.SIDECAR_PREAMBLE.pack(
+                self.SIDECAR_MAGIC,
+                stat.st_size,
+                stat.st_mtime_ns,
+                len(self.records),
+            ))
+            self.records.tofile(fio)
+        os.replace(sidecar_filepath + ".tmp", sidecar_filepath)
+
+    def header_offset(self, block_index: int) -> int:
+        return int(self.records["header_offset"][block_index])
+
+    def data_offset(self, block_index: int) -> int:
+        return int(self.records["data_offset"][block_index])
+
+    def block_index_of_packet_index(self, packet_index: int) -> int:
+        """The index of the block spanning `packet_index`.
+
+        Raises KeyError if no block spans the packet-index (it precedes the
+        file, follows it, or falls in a gap of dropped blocks).
+        """
+        packet_indices = self.records["packet_index"]
+        if len(packet_indices) == 0:
+            raise KeyError(packet_index)
+
+        # blocks are nominally contiguous, so try the arithmetic position
+        # before resorting to a binary search
+        step = int(self.records["nof_packet_indices"][0])
+        block_index = (packet_index - int(packet_indices[0]))//step if step > 0 else -1
+        if not (
+            0 <= block_index < len(packet_indices)
+            and packet_indices[block_index] <= packet_index
+            and (
+                block_index + 1 == len(packet_indices)
+                or packet_index < packet_indices[block_index+1]
+            )
+        ):
+            block_index = int(numpy.searchsorted(packet_indices, packet_index, side="right")) - 1
+
+        if (
+            block_index < 0
+            or packet_index >= (
+                packet_indices[block_index]
+                + self.records["nof_packet_indices"][block_index]
+            )
+        ):
+            raise KeyError(packet_index)
+        return block_index
+
+    def block_index_of_time(self, time_unix_epoch_seconds: float) -> int:
+        """The index of the last block starting at or before the unix-time.
+
+        Raises KeyError if the time precedes the first block.
+        """
+        block_index = int(numpy.searchsorted(
+            self.records["time_unix_epoch_seconds"],
+            time_unix_epoch_seconds,
+            side="right"
+        )) - 1
+        if block_index < 0:
+            raise KeyError(time_unix_epoch_seconds)
+        return block_index
+
+    def header_offset_of_packet_index(self, packet_index: int) -> int:
+        return self.header_offset(self.block_index_of_packet_index(packet_index))
+
+    def header_offset_of_time(self, time_unix_epoch_seconds: float) -> int:
+        return self.header_offset(self.block_index_of_time(time_unix_epoch_seconds))
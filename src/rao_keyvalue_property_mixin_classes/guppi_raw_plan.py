@@ -0,0 +1,232 @@
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy
+
+from .guppi_raw_header import GuppiRawHeader
+from .guppi_raw_index import GuppiRawBlockIndex
+from .guppi_raw_reader import GuppiRawReader, guppi_raw_block_dtype
+from .hpdaq import HpdaqProperties
+
+
+class GuppiRawReadOperation(NamedTuple):
+    filepath: str
+    byte_offset: int
+    length: int
+    # the spectra of the window that the read provides
+    spectra_slice: slice
+    # the offset of each block-data within the read, and the spectra kept
+    block_reads: Tuple[Tuple[int, slice], ...]
+
+
+class GuppiRawReadPlan:
+    """
+    The reads that gather the spectra of a packet-index window
+    [start, stop) from the blocks of GUPPI RAW files, as planned from their
+    block indices (see `GuppiRawBlockIndex`) without reading block-data.
+
+    Consecutive blocks of a file are merged into a single sequential read
+    (spanning the headers between them) up to `max_read_length` bytes.
+    Block-data is ordered [antenna, channel, spectra, polarization], so a
+    block's spectra span all of its bytes: the partial first and last
+    blocks are trimmed by their `spectra_slice`, not their byte-range.
+    """
+
+    def __init__(
+        self,
+        header: GuppiRawHeader,
+        start_packet_index: int,
+        stop_packet_index: int,
+        operations: List[GuppiRawReadOperation]
+    ):
+        self.header = header
+        self.start_packet_index = start_packet_index
+        self.stop_packet_index = stop_packet_index
+        self.operations = operations
+
+    @staticmethod
+    def _spectra_of_packet_indices(
+        packet_index_span: int,
+        nof_spectra: int,
+        nof_packet_indices: int
+    ) -> int:
+        return packet_index_span*nof_spectra//nof_packet_indices
+
+    @classmethod
+    def from_window(
+        cls,
+        filepaths: Iterable[str],
+        start_packet_index: int,
+        stop_packet_index: int,
+        max_read_length: int = 1 << 28,
+        use_sidecar: bool = True
+    ):
+        """Plans the reads of the window from the files (in any order), with
+        their block indices loaded from (or persisted to) sidecar files if
+        `use_sidecar` is set.
+        """
+        if start_packet_index >= stop_packet_index:
+            raise ValueError(
+                f"The window [{start_packet_index}, {stop_packet_index}) is empty."
+            )
+        indices = [
+            GuppiRawBlockIndex.open(filepath) if use_sidecar else GuppiRawBlockIndex.build(filepath)
+            for filepath in filepaths
+        ]
+        indices = sorted(
+            (index for index in indices if len(index) > 0),
+            key=lambda index: int(index.records["packet_index"][0])
+        )
+        if len(indices) == 0:
+            raise ValueError("No blocks in the files.")
+        for index in indices:
+            if numpy.any(index.records["nof_packet_indices"] <= 0):
+                raise ValueError(
+                    f"Blocks of {index.filepath} do not specify the packet-indices they span (PIPERBLK)."
+                )
+
+        with GuppiRawReader(indices[0].filepath) as reader:
+            header, _ = reader.read_header(indices[0].header_offset(0))
+        nof_spectra = header.nof_spectra_per_block
+
+        operations = []
+        for index in indices:
+            records = index.records
+            packet_indices = records["packet_index"]
+            first = int(numpy.searchsorted(
+                packet_indices + records["nof_packet_indices"],
+                start_packet_index,
+                side="right"
+            ))
+            last = int(numpy.searchsorted(packet_indices, stop_packet_index, side="left"))
+
+            operation = None
+            for record in records[first:last]:
+                packet_index = int(record["packet_index"])
+                nof_packet_indices = int(record["nof_packet_indices"])
+                data_offset = int(record["data_offset"])
+                blocksize = int(record["blocksize"])
+                block_spectra = slice(
+                    cls._spectra_of_packet_indices(
+                        max(0, start_packet_index - packet_index),
+                        nof_spectra,
+                        nof_packet_indices
+                    ),
+                    cls._spectra_of_packet_indices(
+                        min(nof_packet_indices, stop_packet_index - packet_index),
+                        nof_spectra,
+                        nof_packet_indices
+                    )
+                )
+                window_start = cls._spectra_of_packet_indices(
+                    max(0, packet_index - start_packet_index),
+                    nof_spectra,
+                    nof_packet_indices
+                )
+                window_stop = window_start + block_spectra.stop - block_spectra.start
+
+                if (
+                    operation is not None
+                    and operation.spectra_slice.stop == window_start
+                    and data_offset + blocksize - operation.byte_offset <= max_read_length
+                ):
+                    operation = operation._replace(
+                        length=data_offset + blocksize - operation.byte_offset,
+                        spectra_slice=slice(operation.spectra_slice.start, window_stop),
+                        block_reads=operation.block_reads + (
+                            (data_offset - operation.byte_offset, block_spectra),
+                        )
+                    )
+                    operations[-1] = operation
+                    continue
+
+                operation = GuppiRawReadOperation(
+                    filepath=index.filepath,
+                    byte_offset=data_offset,
+                    length=blocksize,
+                    spectra_slice=slice(window_start, window_stop),
+                    block_reads=((0, block_spectra),)
+                )
+                operations.append(operation)
+
+        return cls(header, start_packet_index, stop_packet_index, operations)
+
+    @classmethod
+    def from_header(cls, header: HpdaqProperties, filepaths: Iterable[str], **kwargs):
+        """Plans the reads of the window of the header's PKTSTART/PKTSTOP."""
+        return cls.from_window(
+            filepaths,
+            header.start_packet_index,
+            header.stop_packet_index,
+            **kwargs
+        )
+
+    @property
+    def nof_bytes(self) -> int:
+        return sum(operation.length for operation in self.operations)
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int]:
+        nof_antennas, nof_channels, nof_spectra, nof_polarizations = self.header.blockshape
+        return (
+            nof_antennas,
+            nof_channels,
+            self._spectra_of_packet_indices(
+                self.stop_packet_index - self.start_packet_index,
+                nof_spectra,
+                self.header.nof_packet_indices_per_block
+            ),
+            nof_polarizations
+        )
+
+    def read(self, out: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Executes the reads into `out` (or a new zeroed array) of `shape`
+        and the block-data's dtype. The spectra of dropped blocks are left
+        untouched.
+        """
+        dtype = guppi_raw_block_dtype(self.header)
+        blockshape = self.header.blockshape
+        shape = self.shape
+        if out is None:
+            out = numpy.zeros(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype:
+            raise ValueError(f"The output array must be of shape {shape} and dtype {dtype}.")
+
+        buffer = bytearray()
+        fileno, filepath = None, None
+        try:
+            for operation in self.operations:
+                if operation.filepath != filepath:
+                    if fileno is not None:
+                        os.close(fileno)
+                        fileno = None
+                    fileno, filepath = os.open(operation.filepath, os.O_RDONLY), operation.filepath
+                if len(buffer) < operation.length:
+                    buffer = bytearray(operation.length)
+                view = memoryview(buffer)[0:operation.length]
+                if hasattr(os, "preadv"):
+                    read = os.preadv(fileno, [view], operation.byte_offset)
+                else:
+                    data = os.pread(fileno, operation.length, operation.byte_offset)
+                    read = len(data)
+                    view[0:read] = data
+                if read != operation.length:
+                    raise EOFError(
+                        f"Short read at offset {operation.byte_offset} of {operation.filepath}."
+                    )
+
+                window_start = operation.spectra_slice.start
+                for block_offset, block_spectra in operation.block_reads:
+                    block = numpy.frombuffer(
+                        buffer,
+                        dtype=dtype,
+                        count=numpy.prod(blockshape),
+                        offset=block_offset
+                    ).reshape(blockshape)
+                    window_stop = window_start + block_spectra.stop - block_spectra.start
+                    out[:, :, window_start:window_stop] = block[:, :, block_spectra]
+                    window_start = window_stop
+        finally:
+            if fileno is not None:
+                os.close(fileno)
+        return out
@@ -0,0 +1,261 @@
+import mmap
+import os
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from .guppi_raw import GuppiRawProperties, GuppiRawDatatype
+from .guppi_raw_header import GuppiRawHeader
+from .guppi_raw_fits import (
+    GuppiRawLazyHeader,
+    directio_padded_length,
+    is_partial_fits_header,
+    lazy_GuppiRawHeader,
+    parse_GuppiRawHeader,
+)
+
+
+def _complex_dtype(component_dtype: str) -> numpy.dtype:
+    return numpy.dtype([("re", component_dtype), ("im", component_dtype)])
+
+
+GUPPI_RAW_BLOCK_DTYPES = {
+    (GuppiRawDatatype.integer, 4): numpy.dtype(numpy.uint8),
+    (GuppiRawDatatype.integer, 8): _complex_dtype("i1"),
+    (GuppiRawDatatype.integer, 16): _complex_dtype("<i2"),
+    (GuppiRawDatatype.floating_point, 16): _complex_dtype("<f2"),
+    (GuppiRawDatatype.floating_point, 32): numpy.dtype(numpy.complex64),
+    (GuppiRawDatatype.floating_point, 64): numpy.dtype(numpy.complex128),
+}
+
+
+def guppi_raw_block_dtype(header: GuppiRawProperties) -> numpy.dtype:
+    """The dtype of a complex sample of the block-data described by `header`.
+
+    Complex integers are structured (`re`, `im`) pairs, as NumPy has no such
+    native type. 4-bit samples pack both components into a single byte and
+    are presented as `uint8`.
+    """
+    key = (GuppiRawDatatype(header.sample_datatype), header.nof_bits)
+    if key not in GUPPI_RAW_BLOCK_DTYPES:
+        raise ValueError(
+            f"Unsupported block-data encoding: {key[1]}-bit {key[0].value}."
+        )
+    return GUPPI_RAW_BLOCK_DTYPES[key]
+
+
+class GuppiRawReader:
+    """
+    Memory-maps a GUPPI RAW file, presenting each block-data as a NumPy view
+    of the mapping, shaped by `GuppiRawProperties.blockshape`. No block-data
+    is copied: views are only valid while they are referenced, and keep the
+    mapping alive beyond `close()`.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._file = open(filepath, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._mmap)
+
+    def __iter__(self) -> Iterator[Tuple[GuppiRawHeader, numpy.ndarray]]:
+        offset = 0
+        while offset < len(self._mmap):
+            try:
+                header, block, offset = self.read_block(offset)
+            except EOFError:
+                # a trailing partial block, as left by an interrupted recording
+                return
+            yield header, block
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # block views are still referenced: the mapping is released
+            # with the last of them
+            pass
+        self._file.close()
+
+    def prefetch(self, offset: int, length: int):
+        """Hints to the kernel that the byte-range will soon be read, so that
+        it is read ahead asynchronously.
+        """
+        length = min(length, len(self._mmap) - offset)
+        if offset < 0 or length <= 0:
+            return
+        if hasattr(mmap, "MADV_WILLNEED"):
+            start = offset - offset % mmap.PAGESIZE
+            self._mmap.madvise(mmap.MADV_WILLNEED, start, length + offset - start)
+        elif hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(self._file.fileno(), offset, length, os.POSIX_FADV_WILLNEED)
+
+    def lazy_headers(self) -> Iterator[Tuple[GuppiRawLazyHeader, int]]:
+        """Yields each header as a lazy view of the mapping, with its offset.
+        Only the cards read are decoded, which suits sweeps reading a few
+        keys of each header.
+        """
+        offset = 0
+        while offset < len(self._mmap):
+            try:
+                header = lazy_GuppiRawHeader(self._mmap, offset)
+                next_offset = header.data_offset + header.blocksize
+            except ValueError:
+                if is_partial_fits_header(self._mmap, offset):
+                    # a trailing partial header, as left by an interrupted recording
+                    return
+                raise
+            if next_offset > len(self._mmap):
+                return
+            yield header, offset
+            offset = next_offset
+
+    def read_header(self, offset: int) -> Tuple[GuppiRawHeader, int]:
+        """Returns the header at `offset` and the offset of its block-data."""
+        try:
+            header, header_length = parse_GuppiRawHeader(self._mmap, offset)
+        except ValueError:
+            if not is_partial_fits_header(self._mmap, offset):
+                raise
+            raise EOFError(
+                f"Truncated header at offset {offset} of {self.filepath}."
+            ) from None
+        return header, offset + directio_padded_length(header_length, header.directio)
+
+    def read_block(self, offset: int) -> Tuple[GuppiRawHeader, numpy.ndarray, int]:
+        """Returns the header at `offset`, a view of its block-data and the
+        offset of the subsequent header.
+        """
+        header, data_offset = self.read_header(offset)
+        blocksize = header.blocksize
+        next_offset = data_offset + blocksize
+        if next_offset > len(self._mmap):
+            raise EOFError(f"Truncated block at offset {offset} of {self.filepath}.")
+
+        dtype = guppi_raw_block_dtype(header)
+        block = numpy.frombuffer(
+            self._mmap,
+            dtype=dtype,
+            count=blocksize//dtype.itemsize,
+            offset=data_offset
+        ).reshape(header.blockshape)
+        return header, block, next_offset
+
+    @staticmethod
+    def _selection_slice(selection, length: int, name: str) -> slice:
+        if selection is None:
+            selection = slice(0, length)
+        elif isinstance(selection, range):
+            selection = slice(selection.start, selection.stop, selection.step)
+        elif isinstance(selection, tuple):
+            selection = slice(*selection)
+        if not isinstance(selection, slice):
+            raise TypeError(f"The {name} selection must be a slice, range or (start, stop).")
+        start, stop, step = selection.indices(length)
+        return slice(start, max(start, stop), step)
+
+    def read_block_selection(
+        self,
+        offset: int,
+        antennas: Optional[Sequence[Union[int, str]]] = None,
+        channels=None,
+        spectra=None,
+        out: Optional[numpy.ndarray] = None,
+        use_mmap: bool = True
+    ) -> Tuple[GuppiRawHeader, numpy.ndarray, int]:
+        """Reads the selected region of the block at `offset` into `out` (or
+        a new array), of shape `[antennas, channels, spectra, polarizations]`.
+
+        Antennas are indices or names (per `antenna_names`), channels are a
+        slice/range/(start, stop) of each antenna's channels and spectra a
+        contiguous slice/range/(start, stop). Each (antenna, channel) pair is
+        a contiguous run of the file, so only those runs are read: by copying
+        from the mapping (touching only their pages), or with `use_mmap=False`
+        by reading each run straight into `out` (`preadv`).
+
+        Returns the header, the selection and the offset of the subsequent
+        header.
+        """
+        header, data_offset = self.read_header(offset)
+        next_offset = data_offset + header.blocksize
+        if next_offset > len(self._mmap):
+            raise EOFError(f"Truncated block at offset {offset} of {self.filepath}.")
+
+        nof_antennas, nof_channels, nof_spectra, nof_polarizations = header.blockshape
+        if antennas is None:
+            antenna_indices = list(range(nof_antennas))
+        else:
+            antenna_indices = [
+                header.antenna_index_map[antenna] if isinstance(antenna, str) else antenna
+                for antenna in antennas
+            ]
+            for antenna_index in antenna_indices:
+                if not 0 <= antenna_index < nof_antennas:
+                    raise IndexError(f"Antenna index {antenna_index} out of range.")
+        channel_slice = GuppiRawReader._selection_slice(channels, nof_channels, "channels")
+        spectra_slice = GuppiRawReader._selection_slice(spectra, nof_spectra, "spectra")
+        if spectra_slice.step != 1:
+            raise ValueError("The spectra selection must be contiguous.")
+        channel_indices = range(channel_slice.start, channel_slice.stop, channel_slice.step)
+
+        dtype = guppi_raw_block_dtype(header)
+        shape = (
+            len(antenna_indices),
+            len(channel_indices),
+            spectra_slice.stop - spectra_slice.start,
+            nof_polarizations
+        )
+        if out is None:
+            out = numpy.empty(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+            raise ValueError(
+                f"The output array must be C-contiguous, of shape {shape} and dtype {dtype}."
+            )
+
+        if use_mmap:
+            block = numpy.frombuffer(
+                self._mmap,
+                dtype=dtype,
+                count=header.blocksize//dtype.itemsize,
+                offset=data_offset
+            ).reshape(header.blockshape)
+            for out_antenna, antenna_index in enumerate(antenna_indices):
+                out[out_antenna] = block[antenna_index, channel_slice, spectra_slice]
+            return header, out, next_offset
+
+        spectrum_length = nof_polarizations*dtype.itemsize
+        run_length = shape[2]*spectrum_length
+        out_bytes = out.reshape(-1).view(numpy.uint8)
+        fileno = self._file.fileno()
+        run_start = 0
+        for antenna_index in antenna_indices:
+            for channel_index in channel_indices:
+                file_offset = data_offset + (
+                    (antenna_index*nof_channels + channel_index)*nof_spectra
+                    + spectra_slice.start
+                )*spectrum_length
+                run = out_bytes[run_start:run_start+run_length]
+                if hasattr(os, "preadv"):
+                    read = os.preadv(fileno, [run], file_offset)
+                else:
+                    data = os.pread(fileno, run_length, file_offset)
+                    read = len(data)
+                    run[0:read] = numpy.frombuffer(data, dtype=numpy.uint8)
+                if read != run_length:
+                    raise EOFError(f"Short read at offset {file_offset} of {self.filepath}.")
+                run_start += run_length
+        return header, out, next_offset
@@ -0,0 +1,159 @@
+from collections import deque
+from itertools import groupby
+from typing import Deque, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+import numpy
+
+from .guppi_raw_header import GUPPI_RAW_HEADER_CLASS_REGISTRY, GuppiRawHeader
+
+
+class PacketIndexDiscontinuity(NamedTuple):
+    # "gap" or "overlap"
+    kind: str
+    # the position in the input of the block following the discontinuity
+    block_enum: int
+    expected_packet_index: int
+    packet_index: int
+    # the number of placeholder blocks yielded in lieu of the gap
+    nof_placeholder_blocks: int = 0
+
+    @property
+    def nof_packet_indices(self) -> int:
+        return abs(self.packet_index - self.expected_packet_index)
+
+
+class SegmentedBlock(NamedTuple):
+    header: GuppiRawHeader
+    block: numpy.ndarray
+    segment_index: int
+    is_placeholder: bool = False
+
+
+class GuppiRawSegmenter:
+    """
+    A streaming stage over (header, block) pairs (as from `GuppiRawReader`
+    or `GuppiRawSequenceReader`) detecting discontinuities of `packet_index`
+    against the preceding block's `nof_packet_indices_per_block`.
+
+    Blocks are yielded with the index of the contiguous segment they belong
+    to, which increments after each gap or overlap. With `fill_gaps`, a gap
+    spanning whole blocks (up to `max_fill_blocks`) is filled with
+    placeholder blocks instead: copies of the preceding header (as the
+    registered GuppiRawHeader class for its key-values) advanced to the
+    missing packet-indices and a single read-only zeroed block, reused for
+    every placeholder. With `skip_overlaps`, blocks that overlap the
+    preceding packet-indices are dropped rather than starting a segment.
+
+    Discontinuities are counted in `nof_gaps` and `nof_overlaps`, and the
+    latest `max_discontinuities` of them (all, if None) are kept in
+    `discontinuities`, so that memory is constant however long the stream.
+    """
+
+    def __init__(
+        self,
+        blocks: Iterable[Tuple[GuppiRawHeader, numpy.ndarray]],
+        fill_gaps: bool = False,
+        max_fill_blocks: int = 64,
+        skip_overlaps: bool = False,
+        max_discontinuities: Optional[int] = 1024
+    ):
+        self.blocks = blocks
+        self.fill_gaps = fill_gaps
+        self.max_fill_blocks = max_fill_blocks
+        self.skip_overlaps = skip_overlaps
+        self.discontinuities: Deque[PacketIndexDiscontinuity] = deque(
+            maxlen=max_discontinuities
+        )
+        self.nof_gaps = 0
+        self.nof_overlaps = 0
+        self.nof_blocks = 0
+        self.nof_placeholder_blocks = 0
+        self._placeholder_block: Optional[numpy.ndarray] = None
+
+    def _placeholder(self, shape: Tuple[int, ...], dtype: numpy.dtype) -> numpy.ndarray:
+        placeholder = self._placeholder_block
+        if (
+            placeholder is None
+            or placeholder.shape != shape
+            or placeholder.dtype != dtype
+        ):
+            placeholder = numpy.zeros(shape, dtype=dtype)
+            placeholder.flags.writeable = False
+            self._placeholder_block = placeholder
+        return placeholder
+
+    def __iter__(self) -> Iterator[SegmentedBlock]:
+        segment_index = 0
+        previous_header = None
+        # the layout of the preceding block, without referencing its data
+        previous_block_layout = None
+        expected_packet_index = None
+        for block_enum, (header, block) in enumerate(self.blocks):
+            packet_index = header.packet_index
+            if expected_packet_index is not None and packet_index != expected_packet_index:
+                if packet_index < expected_packet_index:
+                    self.nof_overlaps += 1
+                    self.discontinuities.append(PacketIndexDiscontinuity(
+                        "overlap",
+                        block_enum,
+                        expected_packet_index,
+                        packet_index
+                    ))
+                    if self.skip_overlaps:
+                        continue
+                    segment_index += 1
+                else:
+                    step = previous_header.nof_packet_indices_per_block
+                    nof_missing_blocks, remainder = divmod(
+                        packet_index - expected_packet_index,
+                        step
+                    )
+                    fill = (
+                        self.fill_gaps
+                        and remainder == 0
+                        and nof_missing_blocks <= self.max_fill_blocks
+                    )
+                    self.nof_gaps += 1
+                    self.discontinuities.append(PacketIndexDiscontinuity(
+                        "gap",
+                        block_enum,
+                        expected_packet_index,
+                        packet_index,
+                        nof_missing_blocks if fill else 0
+                    ))
+                    if fill:
+                        placeholder = self._placeholder(*previous_block_layout)
+                        # the preceding header may be a read-only view (a
+                        # lazy header or a table row), so copy its key-values
+                        keyvalues = dict(previous_header)
+                        header_class = GUPPI_RAW_HEADER_CLASS_REGISTRY.resolve(keyvalues)
+                        for missing_enum in range(nof_missing_blocks):
+                            placeholder_header = header_class(keyvalues)
+                            placeholder_header.packet_index = (
+                                expected_packet_index + missing_enum*step
+                            )
+                            self.nof_placeholder_blocks += 1
+                            yield SegmentedBlock(
+                                placeholder_header,
+                                placeholder,
+                                segment_index,
+                                is_placeholder=True
+                            )
+                    else:
+                        segment_index += 1
+
+            self.nof_blocks += 1
+            previous_header = header
+            previous_block_layout = (block.shape, block.dtype)
+            expected_packet_index = packet_index + header.nof_packet_indices_per_block
+            yield SegmentedBlock(header, block, segment_index)
+
+    def segments(self) -> Iterator[Tuple[int, Iterator[SegmentedBlock]]]:
+        """Yields each contiguous segment as its index and an iterator of its
+        blocks, which (as per `itertools.groupby`) is only valid until the
+        next segment is requested.
+        """
+        return groupby(
+            iter(self),
+            key=lambda segmented_block: segmented_block.segment_index
+        )
@@ -0,0 +1,127 @@
+import glob
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterator, List, Tuple
+
+import numpy
+
+from .guppi_raw_header import GuppiRawHeader
+from .guppi_raw_reader import GuppiRawReader
+from .hpdaq_ata import HpdaqAtaProperties
+
+
+class GuppiRawSequenceReader:
+    """
+    Presents the files of a recording (`<stempath>.0000.raw`,
+    `<stempath>.0001.raw`...) as a single stream of blocks.
+
+    While a block is being consumed, the subsequent `nof_prefetch_blocks`
+    blocks are hinted to the kernel for read-ahead and, approaching the end
+    of a file, the next file is opened, all on a bounded pool of threads.
+    """
+
+    def __init__(
+        self,
+        stempath: str,
+        nof_prefetch_blocks: int = 4,
+        max_workers: int = 2
+    ):
+        self.stempath = stempath
+        self.filepaths = GuppiRawSequenceReader.sequence_filepaths(stempath)
+        if len(self.filepaths) == 0:
+            raise FileNotFoundError(f"No GUPPI RAW files of stem {stempath}.")
+        self.nof_prefetch_blocks = nof_prefetch_blocks
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="GuppiRawSequencePrefetch"
+        )
+        self.current_filepath = None
+
+    @classmethod
+    def from_header(cls, header: HpdaqAtaProperties, **kwargs):
+        return cls(header.observation_stempath, **kwargs)
+
+    @staticmethod
+    def sequence_filepaths(stempath: str) -> List[str]:
+        return sorted(
+            glob.glob(f"{glob.escape(stempath)}.[0-9][0-9][0-9][0-9].raw")
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _open(self, file_enum: int, prefetch_length: int) -> GuppiRawReader:
+        reader = GuppiRawReader(self.filepaths[file_enum])
+        reader.prefetch(0, prefetch_length)
+        return reader
+
+    @staticmethod
+    def _settle_prefetches(prefetches: List[Future]):
+        # cancels the pending prefetches of a reader, or waits for those
+        # running, so that none runs after the reader is closed
+        for prefetch in prefetches:
+            if not prefetch.cancel():
+                prefetch.result()
+        prefetches.clear()
+
+    def __iter__(self) -> Iterator[Tuple[GuppiRawHeader, numpy.ndarray]]:
+        next_reader = self._executor.submit(self._open, 0, 0)
+        reader = None
+        prefetches: List[Future] = []
+        try:
+            for file_enum in range(len(self.filepaths)):
+                reader = next_reader.result()
+                next_reader = None
+                self.current_filepath = reader.filepath
+                has_next_file = file_enum + 1 < len(self.filepaths)
+
+                offset = 0
+                prefetched_until = 0
+                while offset < len(reader):
+                    try:
+                        header, block, next_offset = reader.read_block(offset)
+                    except EOFError:
+                        break
+
+                    prefetch_until = next_offset + self.nof_prefetch_blocks*(next_offset - offset)
+                    if prefetch_until > prefetched_until:
+                        for prefetch in [prefetch for prefetch in prefetches if prefetch.done()]:
+                            prefetch.result()
+                            prefetches.remove(prefetch)
+                        prefetches.append(self._executor.submit(
+                            reader.prefetch,
+                            max(next_offset, prefetched_until),
+                            prefetch_until - max(next_offset, prefetched_until)
+                        ))
+                        prefetched_until = prefetch_until
+                    if has_next_file and next_reader is None and prefetch_until > len(reader):
+                        next_reader = self._executor.submit(
+                            self._open,
+                            file_enum + 1,
+                            prefetch_until - len(reader)
+                        )
+
+                    yield header, block
+                    offset = next_offset
+
+                GuppiRawSequenceReader._settle_prefetches(prefetches)
+                reader.close()
+                reader = None
+                if has_next_file and next_reader is None:
+                    next_reader = self._executor.submit(self._open, file_enum + 1, 0)
+        finally:
+            if reader is not None:
+                for prefetch in prefetches:
+                    prefetch.cancel()
+                wait(prefetches)
+                reader.close()
+            if next_reader is not None and not next_reader.cancel():
+                try:
+                    next_reader.result().close()
+                except Exception:
+                    pass
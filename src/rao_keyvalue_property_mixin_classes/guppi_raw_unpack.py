@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy
+
+from .guppi_raw import GuppiRawProperties
+from .guppi_raw_reader import guppi_raw_block_dtype
+
+# blocks are unpacked in chunks of at least this many samples per thread,
+# below which threading costs more than it saves
+MIN_SAMPLES_PER_THREAD = 1 << 18
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="GuppiRawUnpack"
+        )
+    return _executor
+
+
+def _nibble_lut(dtype) -> numpy.ndarray:
+    # the real component is the upper nibble, the imaginary the lower, each
+    # a two's-complement 4-bit integer
+    byte_values = numpy.arange(256, dtype=numpy.uint8)
+    upper = (byte_values.astype(numpy.int8) >> 4).astype(numpy.float64)
+    lower = ((byte_values << 4).astype(numpy.int8) >> 4).astype(numpy.float64)
+    lut = (upper + 1j*lower).astype(dtype)
+    lut.flags.writeable = False
+    return lut
+
+
+NIBBLE_LUTS = {
+    numpy.dtype(numpy.complex64): _nibble_lut(numpy.complex64),
+    numpy.dtype(numpy.complex128): _nibble_lut(numpy.complex128),
+}
+
+
+def _unpack_samples(samples: numpy.ndarray, out: numpy.ndarray):
+    if samples.dtype.names is not None:
+        out.real[...] = samples["re"]
+        out.imag[...] = samples["im"]
+    elif samples.dtype == numpy.uint8:
+        # byte indices cannot exceed the table, and "clip" spares the
+        # intermediate buffer that the default "raise" mode uses with `out`
+        numpy.take(NIBBLE_LUTS[out.dtype], samples, out=out, mode="clip")
+    else:
+        out[...] = samples
+
+
+def unpack_block(
+    header: GuppiRawProperties,
+    block,
+    out: Optional[numpy.ndarray] = None,
+    dtype=numpy.complex64,
+    nof_threads: int = 1
+) -> numpy.ndarray:
+    """Decodes the block-data described by `header` to complex samples of
+    shape `blockshape`, in `out` (or a new array of `dtype`).
+
+    The block may be a NumPy view as from `GuppiRawReader`, or any buffer of
+    the block's bytes. 4-bit samples are decoded via a lookup table of all
+    256 byte values. With `nof_threads` above 1, large blocks are split
+    across a shared thread pool (NumPy releases the GIL while unpacking).
+    """
+    blockshape = header.blockshape
+    samples = numpy.asarray(block) if isinstance(block, numpy.ndarray) else None
+    if samples is None or samples.dtype != guppi_raw_block_dtype(header):
+        samples = numpy.frombuffer(block, dtype=guppi_raw_block_dtype(header))
+    samples = samples.reshape(blockshape)
+
+    if out is None:
+        out = numpy.empty(blockshape, dtype=dtype)
+    elif out.shape != tuple(blockshape) or not out.flags.c_contiguous:
+        raise ValueError(f"The output array must be C-contiguous, of shape {blockshape}.")
+    if out.dtype not in NIBBLE_LUTS:
+        raise ValueError(f"The output array must be complex64 or complex128, not {out.dtype}.")
+
+    nof_chunks = min(nof_threads, max(1, samples.size//MIN_SAMPLES_PER_THREAD))
+    if nof_chunks <= 1 or not samples.flags.c_contiguous:
+        _unpack_samples(samples, out)
+        return out
+
+    flat_samples = samples.reshape(-1)
+    flat_out = out.reshape(-1)
+    bounds = numpy.linspace(0, samples.size, nof_chunks + 1, dtype=numpy.int64)
+    futures = [
+        _shared_executor().submit(
+            _unpack_samples,
+            flat_samples[start:stop],
+            flat_out[start:stop]
+        )
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    for future in futures:
+        future.result()
+    return out
@@ -0,0 +1,380 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy
+
+from .guppi_raw import GuppiRawProperties
+from .guppi_raw_header import GUPPI_RAW_HEADER_CLASS_REGISTRY
+from .guppi_raw_header_table import (
+    HEADER_TABLE_CLASS_MAP,
+    GuppiRawHeaderTable,
+    HeaderTable,
+)
+from .hpdaq_ata import HpdaqAtaProperties
+from .hpdaq_meerkat import HpdaqMeerkatProperties
+
+_NUMBER = (int, float)
+
+
+class KeyRule(NamedTuple):
+    key: str
+    types: Tuple[type, ...]
+    required: bool = False
+    values: Optional[Tuple] = None
+
+
+class DivisibilityRule(NamedTuple):
+    name: str
+    # functions of a header (or column-wise, of a HeaderTable)
+    dividend: Callable
+    divisor: Callable
+
+
+# The rules of each property mixin, which apply to the classes deriving
+# from it (its overrides replacing the rules of the same key or name).
+VALIDATION_RULES = {
+    GuppiRawProperties: (
+        KeyRule("BLOCSIZE", (int,), required=True),
+        KeyRule("OBSNCHAN", (int,), required=True),
+        KeyRule("NPOL", (int,), required=True),
+        KeyRule("NBITS", (int,), values=(4, 8, 16, 32, 64)),
+        KeyRule("NANTS", (int,)),
+        KeyRule("DIRECTIO", (bool, int)),
+        KeyRule("PKTIDX", (int,)),
+        KeyRule("PIPERBLK", (int,)),
+        KeyRule("OBSFREQ", _NUMBER),
+        KeyRule("OBSBW", _NUMBER),
+        KeyRule("TBIN", _NUMBER),
+        KeyRule("SYNCTIME", _NUMBER),
+        KeyRule("STT_IMJD", (int,)),
+        KeyRule("STT_SMJD", _NUMBER),
+        KeyRule("SRC_NAME", (str,)),
+        KeyRule("TELESCOP", (str,)),
+        KeyRule("RA_STR", (str,)),
+        KeyRule("DEC_STR", (str,)),
+        DivisibilityRule(
+            "channels per antenna",
+            lambda header: header.observed_nof_channels,
+            lambda header: header.nof_antennas,
+        ),
+        DivisibilityRule(
+            "spectra per block",
+            lambda header: header.blocksize*8,
+            lambda header: (
+                header.observed_nof_channels
+                * header.nof_polarizations
+                * 2
+                * header.nof_bits
+            ),
+        ),
+    ),
+    HpdaqAtaProperties: (
+        KeyRule("NCHAN", (int,)),
+        KeyRule("CHAN_BW", _NUMBER),
+        KeyRule("DATATYPE", (str,), values=("INTEGER", "FLOAT")),
+    ),
+    HpdaqMeerkatProperties: (
+        KeyRule("CHAN_BW", _NUMBER, required=True),
+        KeyRule("NPOL", (int,), required=True, values=(1, 2, 4)),
+    ),
+}
+
+
+class ValidationIssue(NamedTuple):
+    index: int
+    rule: str
+    key: Optional[str]
+    message: str
+
+
+class ValidationReport:
+    """The issues found validating a sequence of headers, in order of their
+    index (up to `max_issues`, after which validation stops early).
+    """
+
+    def __init__(self, header_class: type):
+        self.header_class = header_class
+        self.nof_headers = 0
+        self.issues: List[ValidationIssue] = []
+        self.truncated = False
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self.issues) == 0
+
+    def invalid_indices(self) -> List[int]:
+        return sorted({issue.index for issue in self.issues})
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for issue in self.issues:
+            counts[issue.rule] = counts.get(issue.rule, 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict:
+        return {
+            "header_class": self.header_class.__name__,
+            "nof_headers": self.nof_headers,
+            "truncated": self.truncated,
+            "counts": self.counts(),
+            "issues": [issue._asdict() for issue in self.issues],
+        }
+
+
+class GuppiRawValidationPlan:
+    """
+    The key rules and divisibility constraints of a header class, gathered
+    from `VALIDATION_RULES` along its MRO (see `plan_for_class`).
+
+    Key rules are checked per header; divisibility constraints are checked
+    column-wise over chunks of headers gathered into a `HeaderTable`, for
+    the headers that satisfy the required keys.
+    """
+
+    def __init__(
+        self,
+        header_class: type,
+        key_rules: List[KeyRule],
+        divisibility_rules: List[DivisibilityRule]
+    ):
+        self.header_class = header_class
+        self.key_rules = key_rules
+        self.divisibility_rules = divisibility_rules
+        self.required_keys = tuple(rule.key for rule in key_rules if rule.required)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def plan_for_class(header_class: type):
+        key_rules = {}
+        divisibility_rules = {}
+        for klass in reversed(header_class.__mro__):
+            for rule in VALIDATION_RULES.get(klass, ()):
+                if isinstance(rule, KeyRule):
+                    key_rules[rule.key] = rule
+                else:
+                    divisibility_rules[rule.name] = rule
+        return GuppiRawValidationPlan(
+            header_class,
+            list(key_rules.values()),
+            list(divisibility_rules.values())
+        )
+
+    @staticmethod
+    def _is_type(value, types: Tuple[type, ...]) -> bool:
+        # bool is an int, but not a valid value of an integer key
+        if isinstance(value, bool):
+            return bool in types
+        return isinstance(value, types)
+
+    @staticmethod
+    def _missing_issue(index: int, key: str) -> ValidationIssue:
+        return ValidationIssue(index, "required", key, f"Missing required key {key}.")
+
+    @staticmethod
+    def _type_issue(
+        index: int,
+        rule: KeyRule,
+        value_type: Optional[type] = None
+    ) -> ValidationIssue:
+        expected = "/".join(klass.__name__ for klass in rule.types)
+        if value_type is None:
+            return ValidationIssue(index, "type", rule.key, f"{rule.key} is not {expected}.")
+        return ValidationIssue(
+            index,
+            "type",
+            rule.key,
+            f"{rule.key} is {value_type.__name__}, not {expected}."
+        )
+
+    def _check_keys(self, index: int, keyvalues: Mapping, issues: List[ValidationIssue]) -> bool:
+        valid = True
+        for rule in self.key_rules:
+            if rule.key not in keyvalues:
+                if rule.required:
+                    issues.append(GuppiRawValidationPlan._missing_issue(index, rule.key))
+                    valid = False
+                continue
+            value = keyvalues[rule.key]
+            if not GuppiRawValidationPlan._is_type(value, rule.types):
+                issues.append(GuppiRawValidationPlan._type_issue(index, rule, type(value)))
+                valid = False
+            elif rule.values is not None and value not in rule.values:
+                issues.append(ValidationIssue(
+                    index,
+                    "value",
+                    rule.key,
+                    f"{rule.key} of {value!r} is not one of {rule.values}."
+                ))
+                valid = False
+        return valid
+
+    def _check_divisibility(
+        self,
+        table: HeaderTable,
+        indices: numpy.ndarray,
+        issues: List[ValidationIssue]
+    ):
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            for rule in self.divisibility_rules:
+                dividend = numpy.broadcast_to(rule.dividend(table), indices.shape)
+                divisor = numpy.broadcast_to(rule.divisor(table), indices.shape)
+                remainder = dividend % numpy.where(divisor == 0, 1, divisor)
+                invalid = (divisor == 0) | (remainder != 0)
+                for enum in numpy.flatnonzero(invalid):
+                    issues.append(ValidationIssue(
+                        int(indices[enum]),
+                        "divisibility",
+                        None,
+                        f"The {rule.name}: {dividend[enum]} is not divisible by {divisor[enum]}."
+                    ))
+
+    def _validate_chunk(self, keyvalues_chunk: List[Mapping], start: int) -> List[ValidationIssue]:
+        issues = []
+        valid_indices = [
+            start + enum
+            for enum, keyvalues in enumerate(keyvalues_chunk)
+            if self._check_keys(start + enum, keyvalues, issues)
+        ]
+        if len(valid_indices) > 0 and len(self.divisibility_rules) > 0:
+            table_class = HEADER_TABLE_CLASS_MAP.get(self.header_class, GuppiRawHeaderTable)
+            table = table_class.from_headers(
+                keyvalues_chunk[index - start] for index in valid_indices
+            )
+            self._check_divisibility(table, numpy.array(valid_indices), issues)
+        issues.sort(key=lambda issue: issue.index)
+        return issues
+
+    def validate(
+        self,
+        headers: Iterable[Mapping],
+        max_issues: Optional[int] = None,
+        chunk_length: int = 4096
+    ) -> ValidationReport:
+        """Validates a stream of headers, in chunks of `chunk_length`."""
+        report = ValidationReport(self.header_class)
+        iterator = iter(headers)
+        while True:
+            chunk = list(islice(iterator, chunk_length))
+            if len(chunk) == 0:
+                break
+            report.issues.extend(self._validate_chunk(chunk, report.nof_headers))
+            report.nof_headers += len(chunk)
+            if max_issues is not None and len(report.issues) >= max_issues:
+                report.truncated = (
+                    len(report.issues) > max_issues
+                    or next(iterator, None) is not None
+                )
+                del report.issues[max_issues:]
+                break
+        return report
+
+    def validate_table(
+        self,
+        table: HeaderTable,
+        max_issues: Optional[int] = None
+    ) -> ValidationReport:
+        """Validates the rows of the table column-wise.
+
+        Columns gather values of a key by type (see `HeaderTable`), so an
+        integral float among the integers of a column is not distinguished.
+        """
+        report = ValidationReport(self.header_class)
+        report.nof_headers = len(table)
+        issues = report.issues
+        valid = numpy.ones(len(table), dtype=bool)
+        for rule in self.key_rules:
+            if rule.key not in table:
+                if rule.required:
+                    valid[:] = False
+                    issues.extend(
+                        GuppiRawValidationPlan._missing_issue(index, rule.key)
+                        for index in range(len(table))
+                    )
+                continue
+            present = ~table._column_missing.get(
+                rule.key,
+                numpy.zeros(len(table), dtype=bool)
+            )
+            if rule.required:
+                valid &= present
+                issues.extend(
+                    GuppiRawValidationPlan._missing_issue(int(index), rule.key)
+                    for index in numpy.flatnonzero(~present)
+                )
+
+            column = table.column(rule.key)
+            if column.dtype.kind in "biuf":
+                kind_type = {"b": bool, "i": int, "u": int, "f": float}[column.dtype.kind]
+                if GuppiRawValidationPlan._is_type(kind_type(0), rule.types):
+                    mistyped = numpy.zeros(len(table), dtype=bool)
+                elif column.dtype.kind == "f" and int in rule.types:
+                    mistyped = column != numpy.floor(column)
+                else:
+                    mistyped = numpy.ones(len(table), dtype=bool)
+            else:
+                mistyped = numpy.fromiter(
+                    (
+                        not GuppiRawValidationPlan._is_type(value, rule.types)
+                        for value in column
+                    ),
+                    dtype=bool,
+                    count=len(column)
+                )
+            mistyped &= present
+            issues.extend(
+                GuppiRawValidationPlan._type_issue(int(index), rule)
+                for index in numpy.flatnonzero(mistyped)
+            )
+            if rule.values is not None:
+                unexpected = present & ~mistyped & ~numpy.isin(
+                    column,
+                    numpy.array(rule.values, dtype=object)
+                )
+                issues.extend(
+                    ValidationIssue(
+                        int(index),
+                        "value",
+                        rule.key,
+                        f"{rule.key} of {column[index]!r} is not one of {rule.values}."
+                    )
+                    for index in numpy.flatnonzero(unexpected)
+                )
+                mistyped |= unexpected
+            valid &= ~mistyped
+
+        valid_indices = numpy.flatnonzero(valid)
+        if len(valid_indices) > 0 and len(self.divisibility_rules) > 0:
+            self._check_divisibility(table.subset(valid_indices), valid_indices, issues)
+
+        issues.sort(key=lambda issue: issue.index)
+        if max_issues is not None and len(issues) > max_issues:
+            report.truncated = True
+            del issues[max_issues:]
+        return report
+
+
+def validate_headers(headers: Iterable[Mapping], **kwargs) -> ValidationReport:
+    """Validates a stream of headers against the plan of the class of the
+    first (or for plain mappings, the class resolved for it).
+    """
+    iterator = iter(headers)
+    first = next(iterator, None)
+    if first is None:
+        return ValidationReport(GUPPI_RAW_HEADER_CLASS_REGISTRY.default_class)
+    header_class = (
+        type(first) if isinstance(first, GuppiRawProperties)
+        else GUPPI_RAW_HEADER_CLASS_REGISTRY.resolve(first)
+    )
+
+    def chained():
+        yield first
+        yield from iterator
+    return GuppiRawValidationPlan.plan_for_class(header_class).validate(chained(), **kwargs)
+
+
+def validate_table(table: HeaderTable, **kwargs) -> ValidationReport:
+    """Validates the rows of the table against the plan of its header class."""
+    plan = GuppiRawValidationPlan.plan_for_class(table.HEADER_CLASS)
+    return plan.validate_table(table, **kwargs)
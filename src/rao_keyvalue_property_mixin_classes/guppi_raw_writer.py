@@ -0,0 +1,182 @@
+import errno
+import mmap
+import os
+import queue
+import threading
+from typing import List, Optional
+
+import numpy
+
+from .guppi_raw_header import GuppiRawHeader, DIRECTIO_ALIGNMENT
+from .hpdaq_ata import HpdaqAtaProperties
+
+
+class GuppiRawWriter:
+    """
+    Writes (header, block-data) pairs to the files of a recording
+    (`<stempath>.0000.raw`, `<stempath>.0001.raw`...), starting a new file
+    when the next write would exceed `max_file_size` bytes.
+
+    Each write is serialized into one of `nof_buffers` page-aligned buffers
+    which a background thread writes out (with `O_DIRECT` if the header sets
+    `directio`), so that the caller fills one buffer while another is being
+    flushed. A write only blocks while all buffers are pending.
+    """
+
+    def __init__(
+        self,
+        stempath: str,
+        max_file_size: Optional[int] = None,
+        nof_buffers: int = 2
+    ):
+        self.stempath = stempath
+        self.max_file_size = max_file_size
+        self.filepaths: List[str] = []
+
+        self._directio = None
+        self._fd = None
+        self._file_size = 0
+        self._exception = None
+        self._closed = False
+
+        self._free_buffers = queue.Queue()
+        for _ in range(nof_buffers):
+            self._free_buffers.put(None)
+        self._pending_buffers = queue.Queue()
+        self._flush_thread = threading.Thread(
+            target=self._flush,
+            name="GuppiRawWriterFlush",
+            daemon=True
+        )
+        self._flush_thread.start()
+
+    @classmethod
+    def from_header(cls, header: HpdaqAtaProperties, **kwargs):
+        return cls(header.observation_stempath, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, header: GuppiRawHeader, block: numpy.ndarray):
+        if self._closed:
+            raise ValueError("write to closed GuppiRawWriter")
+        self._raise_flush_exception()
+
+        blocksize = header.blocksize
+        if block.nbytes != blocksize:
+            raise ValueError(
+                f"Block of {block.nbytes} bytes does not match BLOCSIZE {blocksize}."
+            )
+        blockshape = header.blockshape
+        if block.size != numpy.prod(blockshape):
+            raise ValueError(
+                f"Block of shape {block.shape} does not match blockshape {blockshape}."
+            )
+        directio = bool(header.directio)
+        if self._directio is None:
+            self._directio = directio
+        elif directio != self._directio:
+            raise ValueError("DIRECTIO cannot change within a recording.")
+        if directio and blocksize % DIRECTIO_ALIGNMENT != 0:
+            raise ValueError(
+                f"BLOCSIZE {blocksize} is not a multiple of {DIRECTIO_ALIGNMENT}, as DIRECTIO requires."
+            )
+
+        header_length = header.fits_length()
+        length = header_length + blocksize
+
+        buffer = self._free_buffers.get()
+        if buffer is None or len(buffer) < length:
+            if buffer is not None:
+                buffer.close()
+            # anonymous mappings are page-aligned, as O_DIRECT requires
+            buffer = mmap.mmap(-1, length)
+
+        try:
+            header.to_fits_into(buffer)
+            numpy.frombuffer(
+                buffer,
+                dtype=block.dtype,
+                count=block.size,
+                offset=header_length
+            ).reshape(block.shape)[...] = block
+        except BaseException:
+            self._free_buffers.put(buffer)
+            raise
+        self._pending_buffers.put((buffer, length))
+
+    def close(self):
+        self._closed = True
+        if self._flush_thread.is_alive():
+            self._pending_buffers.put(None)
+            self._flush_thread.join()
+            while not self._free_buffers.empty():
+                buffer = self._free_buffers.get()
+                if buffer is not None:
+                    buffer.close()
+            self._close_file()
+        self._raise_flush_exception()
+
+    def _raise_flush_exception(self):
+        if self._exception is not None:
+            exception, self._exception = self._exception, None
+            raise exception
+
+    def _open_file(self):
+        filepath = f"{self.stempath}.{len(self.filepaths):04d}.raw"
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if self._directio and hasattr(os, "O_DIRECT"):
+            try:
+                self._fd = os.open(filepath, flags | os.O_DIRECT, 0o644)
+            except OSError as error:
+                # filesystems such as tmpfs do not support direct-IO
+                if error.errno != errno.EINVAL:
+                    raise
+        if self._fd is None:
+            self._fd = os.open(filepath, flags, 0o644)
+        self.filepaths.append(filepath)
+        self._file_size = 0
+
+    def _close_file(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _write_file(self, buffer: mmap.mmap, length: int):
+        if (
+            self._fd is not None
+            and self.max_file_size is not None
+            and self._file_size > 0
+            and self._file_size + length > self.max_file_size
+        ):
+            self._close_file()
+        if self._fd is None:
+            self._open_file()
+
+        with memoryview(buffer) as view:
+            written = 0
+            while written < length:
+                written += os.write(self._fd, view[written:length])
+        self._file_size += length
+
+    def _flush(self):
+        while True:
+            pending = self._pending_buffers.get()
+            if pending is None:
+                return
+            buffer, length = pending
+            try:
+                if self._exception is None:
+                    self._write_file(buffer, length)
+            except BaseException as exception:
+                self._exception = exception
+            finally:
+                self._free_buffers.put(buffer)
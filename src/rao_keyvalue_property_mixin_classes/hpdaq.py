@@ -1,5 +1,6 @@
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from .guppi_raw import GuppiRawProperties
 
@@ -70,10 +71,16 @@ class HpdaqProperties(GuppiRawProperties):
         """
     )
 
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _parse_pulse(value: str) -> datetime:
+        # the pulse of a status-buffer ticks once a second, so successive
+        # reads usually parse the same value
+        return datetime.strptime(value, "%a %b %d %H:%M:%S %Y")
+
     pulse: datetime = property(
-        fget=lambda self: datetime.strptime(
-            self.get("DAQPULSE", "Thu Jan 01 00:00:00 1970"),
-            "%a %b %d %H:%M:%S %Y"
+        fget=lambda self: HpdaqProperties._parse_pulse(
+            self.get("DAQPULSE", "Thu Jan 01 00:00:00 1970")
         ),
         fset=None
     )
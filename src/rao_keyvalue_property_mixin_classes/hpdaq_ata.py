@@ -1,5 +1,6 @@
-from typing import List
+from typing import Mapping, Tuple
 from enum import Enum
+from types import MappingProxyType
 import os
 
 from .hpdaq import HpdaqProperties
@@ -65,36 +66,86 @@ class HpdaqAtaProperties(HpdaqProperties):
         fset=lambda self, value: self.__setitem__("OBSID", value)
     )
 
-    antenna_names: List[str] = property(
-        fget=lambda self: HpdaqAtaProperties._gather_antennaCsvEntries(
+    antenna_names: Tuple[str, ...] = property(
+        fget=lambda self: tuple(HpdaqAtaProperties._gather_antennaCsvEntries(
             "ANTNMS",
             self
-        ),
+        )),
         fset=lambda self, value: [
             self.__setitem__(key, value)
             for key, value in HpdaqAtaProperties._generate_antennaCsvEntries(
                 "ANTNMS",
-                self,
                 value
-            )
+            ).items()
         ]
     )
 
-    antenna_flags: List[bool] = property(
-        fget=lambda self: HpdaqAtaProperties._gather_antennaCsvEntries(
-            "ANTFLG",
-            self
+    antenna_flags: Tuple[bool, ...] = property(
+        fget=lambda self: tuple(
+            HpdaqAtaProperties._parse_antenna_flag(flag)
+            for flag in HpdaqAtaProperties._gather_antennaCsvEntries(
+                "ANTFLG",
+                self
+            )
         ),
         fset=lambda self, value: [
             self.__setitem__(key, value)
             for key, value in HpdaqAtaProperties._generate_antennaCsvEntries(
                 "ANTFLG",
-                self,
-                value
-            )
+                [int(bool(flag)) for flag in value]
+            ).items()
         ]
     )
 
+    antenna_index_map: Mapping[str, int] = property(
+        fget=lambda self: MappingProxyType({
+            name: index
+            for index, name in enumerate(self.antenna_names)
+        }),
+        fset=None,
+        doc="""The index of each antenna, by name, in the aspects of the
+        block-data, as a read-only mapping.
+        """
+    )
+
+    antenna_flag_mask: "numpy.ndarray" = property(
+        fget=lambda self: HpdaqAtaProperties._readonly_array(
+            self.antenna_flags,
+            bool
+        ),
+        fset=None,
+        doc="""The `antenna_flags` as a read-only NumPy boolean array.
+        Requires NumPy.
+        """
+    )
+
+    unflagged_antenna_indices: "numpy.ndarray" = property(
+        fget=lambda self: HpdaqAtaProperties._readonly_array(
+            [index for index, flag in enumerate(self.antenna_flag_mask) if not flag],
+            "int64"
+        ),
+        fset=None,
+        doc="""The indices of the antennas that are not flagged, as a read-only
+        NumPy array. Requires NumPy.
+        """
+    )
+
+    @staticmethod
+    def _parse_antenna_flag(flag) -> bool:
+        flag = str(flag).strip()
+        try:
+            return int(flag) != 0
+        except ValueError:
+            return flag.upper() in ("T", "TRUE")
+
+    @staticmethod
+    def _readonly_array(values, dtype):
+        import numpy
+
+        array = numpy.array(values, dtype=dtype)
+        array.flags.writeable = False
+        return array
+
     @staticmethod
     def _gather_antennaCsvEntries(key_prefix, kvp, separator: str = ","):
         # manage limited entry length
@@ -123,7 +174,7 @@ class HpdaqAtaProperties(HpdaqProperties):
             return keyvalues
 
         key_enum = 0
-        current_str = ant_values[0]
+        current_str = str(ant_values[0])
 
         for ant in ant_values[1:]:
             addition = f"{separator}{ant}"
@@ -0,0 +1,205 @@
+import asyncio
+import ctypes
+import ctypes.util
+import mmap
+import os
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from .guppi_raw_header import FITS_CARD_LENGTH, FITS_KEY_LENGTH
+from .guppi_raw_fits import decode_fits_value, find_fits_end_card, parse_fits_keyvalues
+from .hpdaq import HpdaqProperties
+
+# the size of a hashpipe status-buffer's shared-memory segment
+HASHPIPE_STATUS_TOTAL_SIZE = 2880*64
+
+_SHM_RDONLY = 0o10000
+# cards are compared a FITS-block at a time, then singly within differing
+# blocks
+_COMPARISON_CARDS = 36
+
+
+def _libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.ftok.argtypes = [ctypes.c_char_p, ctypes.c_int]
+    return libc
+
+
+class HpdaqStatusBuffer:
+    """
+    Presents a hashpipe status-buffer (80-byte FITS cards in shared-memory,
+    or a file standing in for it) through `get`/`__getitem__`, from a local
+    snapshot taken by `refresh()`.
+
+    Refreshing is cheap when nothing has changed (a single comparison of
+    the snapshots) and otherwise decodes only the cards that differ.
+    The buffer is read without hashpipe's semaphore, so a snapshot taken
+    mid-update may be torn, until the next refresh.
+    """
+
+    def __init__(self, buffer, release=None):
+        self._buffer = buffer
+        self._release = release
+        self._cards = b""
+        self._card_keys = []
+        self._keyvalues = {}
+        self.refresh()
+
+    @classmethod
+    def from_file(cls, filepath: str):
+        """A file-backed stand-in for a status-buffer, as for testing."""
+        with open(filepath, "rb") as fio:
+            buffer = mmap.mmap(fio.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, release=buffer.close)
+
+    @classmethod
+    def from_sysv_key(cls, key: int, size: int = HASHPIPE_STATUS_TOTAL_SIZE):
+        """Attaches (read-only) to the System V shared-memory segment of the
+        key, as hashpipe creates for its status-buffers.
+        """
+        libc = _libc()
+        shmid = libc.shmget(key, 0, 0)
+        if shmid < 0:
+            raise OSError(ctypes.get_errno(), f"No shared-memory segment of key {key:#x}.")
+        address = libc.shmat(shmid, None, _SHM_RDONLY)
+        if address is None or address == ctypes.c_void_p(-1).value:
+            raise OSError(ctypes.get_errno(), f"Cannot attach shared-memory segment of key {key:#x}.")
+        buffer = (ctypes.c_char*size).from_address(address)
+        return cls(buffer, release=lambda: libc.shmdt(address))
+
+    @classmethod
+    def from_hashpipe_instance(cls, instance_id: int = 0, **kwargs):
+        """Attaches to the status-buffer of the hashpipe instance, keyed as
+        per `hashpipe_status_key` (via `$HASHPIPE_KEYFILE`, else `$HOME`,
+        else `/tmp`).
+        """
+        keyfile = os.environ.get("HASHPIPE_KEYFILE", os.environ.get("HOME", "/tmp"))
+        key = _libc().ftok(keyfile.encode(), (instance_id & 0x3f) | 0x40)
+        if key == -1:
+            raise OSError(ctypes.get_errno(), f"Cannot key status-buffer via {keyfile}.")
+        return cls.from_sysv_key(key, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+        self._buffer = None
+
+    def _snapshot(self) -> bytes:
+        cards = bytes(memoryview(self._buffer))
+        position = find_fits_end_card(cards)
+        if position < 0:
+            raise ValueError("No END card found in the status-buffer.")
+        return cards[0:position + FITS_CARD_LENGTH]
+
+    def refresh(self) -> Set[str]:
+        """Updates the snapshot of the status-buffer, returning the keys whose
+        cards changed.
+        """
+        cards = self._snapshot()
+        previous_cards = self._cards
+        if cards == previous_cards:
+            return set()
+
+        self._cards = cards
+        if len(cards) != len(previous_cards):
+            return self._reparse()
+
+        changed_keys = set()
+        current, previous = memoryview(cards), memoryview(previous_cards)
+        span = _COMPARISON_CARDS*FITS_CARD_LENGTH
+        for span_start in range(0, len(cards), span):
+            if current[span_start:span_start+span] == previous[span_start:span_start+span]:
+                continue
+            for card_start in range(span_start, min(span_start + span, len(cards)), FITS_CARD_LENGTH):
+                card_end = card_start + FITS_CARD_LENGTH
+                if current[card_start:card_end] == previous[card_start:card_end]:
+                    continue
+                card = str(current[card_start:card_end], "latin-1")
+                key = card[0:FITS_KEY_LENGTH].rstrip() if card[FITS_KEY_LENGTH] == "=" else None
+                if key != self._card_keys[card_start//FITS_CARD_LENGTH]:
+                    # a card has been inserted or removed
+                    return self._reparse()
+                if key is not None:
+                    self._keyvalues[key] = decode_fits_value(card[FITS_KEY_LENGTH+1:])
+                    changed_keys.add(key)
+        return changed_keys
+
+    def _reparse(self) -> Set[str]:
+        previous_keyvalues = self._keyvalues
+        self._keyvalues, _ = parse_fits_keyvalues(self._cards)
+        self._card_keys = []
+        for card_start in range(0, len(self._cards), FITS_CARD_LENGTH):
+            key = str(self._cards[card_start:card_start+FITS_KEY_LENGTH+1], "latin-1")
+            self._card_keys.append(
+                key[0:FITS_KEY_LENGTH].rstrip() if key[FITS_KEY_LENGTH:] == "=" else None
+            )
+
+        missing = object()
+        return {
+            key
+            for key in previous_keyvalues.keys() | self._keyvalues.keys()
+            if previous_keyvalues.get(key, missing) != self._keyvalues.get(key, missing)
+        }
+
+    def __getitem__(self, key):
+        return self._keyvalues[key]
+
+    def get(self, key, default=None):
+        return self._keyvalues.get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keyvalues
+
+    def keys(self):
+        return self._keyvalues.keys()
+
+    def items(self):
+        return self._keyvalues.items()
+
+
+class HpdaqStatus(HpdaqStatusBuffer, HpdaqProperties):
+    pass
+
+
+class HpdaqLivenessMonitor:
+    """
+    Polls the `DAQPULSE` of many hpdaq status-buffers from a single asyncio
+    task, reporting transitions of their liveness.
+    """
+
+    def __init__(self, statuses: Dict[str, HpdaqStatus], interval: float = 1.0):
+        self.statuses = statuses
+        self.interval = interval
+        self.alive: Dict[str, Optional[bool]] = {name: None for name in statuses}
+
+    def poll(self) -> Dict[str, bool]:
+        """Refreshes each status, returning the liveness of those changed."""
+        transitions = {}
+        for name, status in self.statuses.items():
+            try:
+                status.refresh()
+                is_alive = status.is_alive
+            except (OSError, ValueError):
+                is_alive = False
+            if self.alive.get(name) != is_alive:
+                self.alive[name] = is_alive
+                transitions[name] = is_alive
+        return transitions
+
+    async def watch(self) -> AsyncIterator[Tuple[str, bool]]:
+        """Yields (name, is_alive) as each status' liveness changes,
+        initially for all of them.
+        """
+        while True:
+            for name, is_alive in self.poll().items():
+                yield name, is_alive
+            await asyncio.sleep(self.interval)
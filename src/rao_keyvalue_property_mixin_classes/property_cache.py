@@ -0,0 +1,157 @@
+from typing import Tuple
+
+_CACHE_ATTRIBUTES = (
+    "_property_cache",
+    "_property_dependencies",
+    "_key_dependents",
+    "_property_traces",
+)
+
+
+class CachedProperty(property):
+    """
+    A property whose value is memoized by the `KeyValuePropertyCache` of the
+    instance, until a key read while computing it is changed.
+    """
+
+    def __init__(self, name: str, uncached: property):
+        super().__init__(
+            fget=uncached.fget,
+            fset=uncached.fset,
+            fdel=uncached.fdel,
+            doc=uncached.__doc__
+        )
+        self.name = name
+        self.uncached = uncached
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            value = obj._property_cache[self.name]
+        except KeyError:
+            return obj._compute_cached_property(self)
+        if obj._property_traces:
+            obj._property_traces[-1].update(obj._property_dependencies[self.name])
+        return value
+
+
+class KeyValuePropertyCache:
+    """
+    Memoizes the properties named in `CACHED_PROPERTIES`, for key-value
+    classes following the `dict` interface (to which it must be a preceding
+    base).
+
+    The keys each property reads (via `get`/`__getitem__`, directly or
+    through other cached properties) are traced as its value is computed,
+    so that changing a key invalidates only the values that depend on it.
+    """
+
+    CACHED_PROPERTIES: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.CACHED_PROPERTIES:
+            for klass in cls.__mro__:
+                if name in klass.__dict__:
+                    prop = klass.__dict__[name]
+                    break
+            else:
+                raise AttributeError(
+                    f"{cls.__name__} has no property '{name}' to cache."
+                )
+            if isinstance(prop, CachedProperty):
+                prop = prop.uncached
+            setattr(cls, name, CachedProperty(name, prop))
+
+    def __init__(self, *args, **kwargs):
+        self._property_cache = {}
+        self._property_dependencies = {}
+        self._key_dependents = {}
+        self._property_traces = []
+        super().__init__(*args, **kwargs)
+
+    def __reduce__(self):
+        # copies and unpickled instances start with an empty cache
+        state = {
+            attribute: value
+            for attribute, value in self.__dict__.items()
+            if attribute not in _CACHE_ATTRIBUTES
+        }
+        return (self.__class__, (dict(self),), state or None)
+
+    def _compute_cached_property(self, prop: CachedProperty):
+        keys = set()
+        self._property_traces.append(keys)
+        try:
+            value = prop.fget(self)
+        finally:
+            self._property_traces.pop()
+
+        if self._property_traces:
+            self._property_traces[-1].update(keys)
+        self._property_cache[prop.name] = value
+        self._property_dependencies[prop.name] = keys
+        for key in keys:
+            self._key_dependents.setdefault(key, set()).add(prop.name)
+        return value
+
+    def _invalidate_key(self, key):
+        dependents = self._key_dependents.pop(key, None)
+        if dependents:
+            for name in dependents:
+                self._property_cache.pop(name, None)
+
+    def clear_property_cache(self):
+        self._property_cache.clear()
+        self._property_dependencies.clear()
+        self._key_dependents.clear()
+
+    def __getitem__(self, key):
+        if self._property_traces:
+            self._property_traces[-1].add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if self._property_traces:
+            self._property_traces[-1].add(key)
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate_key(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate_key(key)
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._invalidate_key(key)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._invalidate_key(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._invalidate_key(key)
+        return value
+
+    def update(self, *args, **kwargs):
+        if not self._key_dependents:
+            return super().update(*args, **kwargs)
+        keyvalues = dict(*args, **kwargs)
+        super().update(keyvalues)
+        for key in keyvalues:
+            self._invalidate_key(key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.clear_property_cache()
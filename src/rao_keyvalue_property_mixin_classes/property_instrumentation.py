@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .guppi_raw import GuppiRawProperties
+
+_KEY_ACCESS_METHODS = ("get", "__getitem__")
+
+
+class PropertyStatistics:
+    __slots__ = ("reads", "seconds", "getitem_calls", "get_calls", "default_fallbacks")
+
+    def __init__(self):
+        self.reads = 0
+        self.seconds = 0.0
+        self.getitem_calls = 0
+        self.get_calls = 0
+        self.default_fallbacks = 0
+
+    def to_dict(self) -> Dict:
+        return {attribute: getattr(self, attribute) for attribute in self.__slots__}
+
+
+class _InstrumentationLocal(threading.local):
+    def __init__(self):
+        # the statistics of the properties being read, innermost last
+        self.frames: List[PropertyStatistics] = []
+        self.in_key_access = False
+
+
+class PropertyInstrumentation:
+    """
+    Counts, per class and property, the reads of each property, the
+    `__getitem__`/`get` calls made directly by it, the `get` calls that
+    fell back to their default (with the keys missed), and the cumulative
+    time spent reading it (inclusive of the properties it reads).
+
+    Enabling replaces the properties and key-access methods of the classes
+    (by default every subclass of `GuppiRawProperties`) with instrumented
+    wrappers, and disabling restores the originals: the instrumentation
+    costs nothing while disabled. Only one instrumentation may be enabled
+    at a time.
+    """
+
+    _enabled_instrumentation = None
+
+    def __init__(self, classes: Optional[Iterable[type]] = None):
+        self.classes = None if classes is None else list(classes)
+        self._statistics: Dict[Tuple[str, str], PropertyStatistics] = {}
+        self._default_fallback_keys: Dict[Tuple[str, str], int] = {}
+        self._originals: List[Tuple[type, str, object]] = []
+        self._local = _InstrumentationLocal()
+
+    @property
+    def enabled(self) -> bool:
+        return PropertyInstrumentation._enabled_instrumentation is self
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    @staticmethod
+    def _subclasses(cls) -> List[type]:
+        subclasses = [cls]
+        for subclass in cls.__subclasses__():
+            subclasses.extend(
+                klass
+                for klass in PropertyInstrumentation._subclasses(subclass)
+                if klass not in subclasses
+            )
+        return subclasses
+
+    def enable(self):
+        if PropertyInstrumentation._enabled_instrumentation is not None:
+            raise RuntimeError("Another PropertyInstrumentation is enabled.")
+        PropertyInstrumentation._enabled_instrumentation = self
+
+        classes = self.classes
+        if classes is None:
+            classes = PropertyInstrumentation._subclasses(GuppiRawProperties)
+        for cls in classes:
+            for name, attribute in list(cls.__dict__.items()):
+                if isinstance(attribute, property):
+                    self._replace(cls, name, self._instrument_property(name, attribute))
+            for name in _KEY_ACCESS_METHODS:
+                if hasattr(cls, name):
+                    self._replace(cls, name, self._instrument_key_access(cls, name))
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for cls, name, original in reversed(self._originals):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._originals.clear()
+        PropertyInstrumentation._enabled_instrumentation = None
+
+    def _replace(self, cls, name: str, replacement):
+        self._originals.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, replacement)
+
+    def _property_statistics(self, obj, name: str) -> PropertyStatistics:
+        identifier = (type(obj).__qualname__, name)
+        statistics = self._statistics.get(identifier)
+        if statistics is None:
+            statistics = self._statistics[identifier] = PropertyStatistics()
+        return statistics
+
+    def _instrument_property(self, name: str, original: property) -> property:
+        def fget(obj):
+            if not self.enabled:
+                return original.__get__(obj, type(obj))
+            statistics = self._property_statistics(obj, name)
+            statistics.reads += 1
+            frames = self._local.frames
+            frames.append(statistics)
+            start = time.perf_counter()
+            try:
+                return original.__get__(obj, type(obj))
+            finally:
+                statistics.seconds += time.perf_counter() - start
+                frames.pop()
+
+        return property(
+            fget=fget,
+            fset=original.fset,
+            fdel=original.fdel,
+            doc=original.__doc__
+        )
+
+    def _instrument_key_access(self, cls, name: str):
+        own_method = cls.__dict__.get(name)
+
+        def original_method(obj, *args):
+            if own_method is not None:
+                return own_method(obj, *args)
+            return getattr(super(cls, obj), name)(*args)
+
+        def method(obj, key, *args):
+            local = self._local
+            if local.in_key_access or not local.frames or not self.enabled:
+                # nested within another instrumented key access, or not
+                # read by a property
+                return original_method(obj, key, *args)
+
+            statistics = local.frames[-1]
+            local.in_key_access = True
+            try:
+                if name == "get":
+                    statistics.get_calls += 1
+                    value = original_method(obj, key, *args)
+                    if key not in obj:
+                        statistics.default_fallbacks += 1
+                        identifier = (type(obj).__qualname__, key)
+                        self._default_fallback_keys[identifier] = (
+                            self._default_fallback_keys.get(identifier, 0) + 1
+                        )
+                    return value
+                statistics.getitem_calls += 1
+                return original_method(obj, key, *args)
+            finally:
+                local.in_key_access = False
+
+        method.__name__ = name
+        method.__doc__ = getattr(cls, name).__doc__
+        return method
+
+    def reset(self):
+        self._statistics.clear()
+        self._default_fallback_keys.clear()
+
+    def snapshot(self) -> Dict:
+        """The statistics as plain data: per class, the statistics of each
+        property read and the number of default fallbacks of each key.
+        """
+        snapshot = {}
+        for (class_name, name), statistics in sorted(self._statistics.items()):
+            snapshot.setdefault(class_name, {"properties": {}, "default_fallback_keys": {}})
+            snapshot[class_name]["properties"][name] = statistics.to_dict()
+        for (class_name, key), count in sorted(self._default_fallback_keys.items()):
+            snapshot.setdefault(class_name, {"properties": {}, "default_fallback_keys": {}})
+            snapshot[class_name]["default_fallback_keys"][key] = count
+        return snapshot
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
@@ -57,6 +57,109 @@ class TestGuppiRaw(unittest.TestCase):
             grh.rightascension_hours = ra
             grh.declination_degrees = dec
 
+    def test_time_unix_epoch_seconds_at(self):
+        import numpy
+
+        grh = GuppiRawHeader(
+            NANTS=16,
+            OBSNCHAN=16*32,
+            NPOL=2,
+            NBITS=8,
+            BLOCSIZE=16*32*1024*2*2*8//8,
+            PIPERBLK=1024,
+            PKTIDX=4096,
+            TBIN=1e-6,
+            SYNCTIME=1700000000,
+        )
+        assert grh.time_unix_epoch_seconds == 1700000000 + 4096e-6
+        assert grh.time_unix_epoch_seconds_at(1024, 3) == 1700000000 + (4096+1024+3)*1e-6
+
+        times = grh.time_unix_epoch_seconds_at(numpy.array([0, 1024]), numpy.array([[0], [1]]))
+        assert times.shape == (2, 2)
+        assert times[1, 1] == grh.time_unix_epoch_seconds_at(1024, 1)
+
+        seconds, fractional_seconds = grh.time_unix_epoch_split_seconds_at(numpy.array([0, 10**9]))
+        assert list(seconds) == [1700000000, 1700001000]
+        assert numpy.allclose(fractional_seconds, [4096e-6, 4096e-6], rtol=0, atol=1e-12)
+
+        time_axis = grh.spectra_time_unix_epoch_seconds([4096, 5120, 8192])
+        assert time_axis.shape == (3*1024,)
+        assert time_axis[1024+5] == grh.time_unix_epoch_seconds_at(1024, 5)
+        assert time_axis[-1] == grh.time_unix_epoch_seconds_at(4096, 1023)
+
+    def test_negative_zero_sexagesimal(self):
+        assert GuppiRawProperties.from_sexagesimal_str("-0:30:00") == -0.5
+        assert GuppiRawProperties.to_sexagesimal_str(-0.5).startswith("-0:30:")
+        assert GuppiRawProperties.from_sexagesimal_str(
+            GuppiRawProperties.to_sexagesimal_str(-0.25)
+        ) == -0.25
+
+    def test_sexagesimal_arrays(self):
+        import numpy
+
+        values = numpy.concatenate([
+            numpy.random.default_rng(0).uniform(-90, 90, 1000),
+            [-0.5, -0.0, 0.0, -1e-4, 23.9999999]
+        ])
+        strs = GuppiRawProperties.to_sexagesimal_str_array(values)
+        assert list(strs) == [
+            GuppiRawProperties.to_sexagesimal_str(value)
+            for value in values.tolist()
+        ]
+
+        strs = list(strs) + ["-0:30:00", " -0:1", "12", "1:2:3:4", 2.5, "-0", "-0:0:0", -0.0]
+        # bit for bit, as -0.0 == 0.0
+        assert list(map(repr, GuppiRawProperties.from_sexagesimal_str_array(strs).tolist())) == [
+            repr(GuppiRawProperties.from_sexagesimal_str(value))
+            for value in strs
+        ]
+
+    def test_channel_frequencies(self):
+        from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+            GuppiRawAtaHeader,
+            GuppiRawMeerkatHeader,
+        )
+        from rao_keyvalue_property_mixin_classes.guppi_raw_header_table import HeaderTable
+
+        keyvalues = dict(
+            NANTS=2,
+            OBSNCHAN=2*4,
+            NPOL=2,
+            BLOCSIZE=2*4*16*2*2,
+            OBSFREQ=1000.0,
+            OBSBW=-4.0,
+            SCHAN=100,
+        )
+        grh = GuppiRawHeader(keyvalues)
+        assert grh.channel_frequencies.tolist() == [1001.5, 1000.5, 999.5, 998.5]
+        assert grh.channel_indices.tolist() == [100, 101, 102, 103]
+        assert not grh.channel_frequencies.flags.writeable
+
+        # ATA channels are 1/TBIN wide lacking CHAN_BW, in the direction of OBSBW
+        ata = GuppiRawAtaHeader(keyvalues, TBIN=0.5)
+        assert ata.channel_frequencies.tolist() == [1003.0, 1001.0, 999.0, 997.0]
+        ata = GuppiRawAtaHeader(keyvalues, TBIN=0.5, CHAN_BW=2.0)
+        assert ata.channel_frequencies.tolist() == [997.0, 999.0, 1001.0, 1003.0]
+        meerkat = GuppiRawMeerkatHeader(keyvalues, CHAN_BW=-1.0)
+        assert meerkat.channel_frequencies is grh.channel_frequencies
+
+        # shared by headers of the same setup, and recomputed on changes
+        other = GuppiRawHeader(keyvalues, PKTIDX=1024)
+        assert other.channel_frequencies is grh.channel_frequencies
+        other.observed_frequency = 2000.0
+        assert other.channel_frequencies[0] == 2001.5
+
+        # column-wise over a table
+        table = HeaderTable.from_headers([
+            GuppiRawAtaHeader(keyvalues, TBIN=0.5),
+            GuppiRawAtaHeader(keyvalues, TBIN=0.5, CHAN_BW=2.0, SCHAN=0),
+        ])
+        assert table.channel_frequencies.tolist() == [
+            [1003.0, 1001.0, 999.0, 997.0],
+            [997.0, 999.0, 1001.0, 1003.0],
+        ]
+        assert table.channel_indices.tolist() == [[100, 101, 102, 103], [0, 1, 2, 3]]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_async import GuppiRawAsyncReader
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawAsyncReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepaths = [
+            os.path.join(self.tmpdir.name, f"test{enum}.0000.raw")
+            for enum in range(3)
+        ]
+        for enum, filepath in enumerate(self.filepaths):
+            write_raw(filepath, 4 + enum, directio=enum == 1, truncate=enum)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_read(self):
+        async def read():
+            blocks = {filepath: [] for filepath in self.filepaths}
+            buffers = set()
+            async with GuppiRawAsyncReader(self.filepaths, queue_length=2) as reader:
+                async for item in reader:
+                    assert len(item.data) == item.header.blocksize
+                    blocks[item.filepath].append((item.header.packet_index, item.data[0]))
+                    buffers.add(id(item._buffer))
+            return blocks, buffers, reader.nof_buffers
+
+        blocks, buffers, nof_buffers = asyncio.run(read())
+        # truncated files end with their last complete block
+        assert blocks == {
+            filepath: [(enum*16, enum) for enum in range(4 + file_enum - (file_enum > 0))]
+            for file_enum, filepath in enumerate(self.filepaths)
+        }
+        assert len(buffers) <= nof_buffers
+
+    def test_manual_release_and_errors(self):
+        async def read(filepaths):
+            items = []
+            async with GuppiRawAsyncReader(filepaths, auto_release=False) as reader:
+                async for item in reader:
+                    items.append(item)
+            for item in items:
+                item.release()
+                assert item.data is None
+            return len(items)
+
+        assert asyncio.run(read(self.filepaths[0:1])) == 4
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(read([os.path.join(self.tmpdir.name, "missing.raw")]))
+
+    def test_corrupt_header(self):
+        async def read(filepath):
+            packet_indices = []
+            async with GuppiRawAsyncReader([filepath], header_read_length=256) as reader:
+                async for item in reader:
+                    packet_indices.append(item.header.packet_index)
+            return packet_indices
+
+        filepath = os.path.join(self.tmpdir.name, "corrupt.0000.raw")
+        header = write_raw(filepath, 4)
+        block_length = len(header.to_fits()) + header.blocksize
+        with open(filepath, "ab") as fio:
+            fio.write(header.to_fits().encode()[0:200])
+        # a partial trailing header ends the file
+        assert asyncio.run(read(filepath)) == [0, 16, 32, 48]
+
+        with open(filepath, "r+b") as fio:
+            # lose the END card of the third header
+            fio.seek(3*block_length - header.blocksize - 80)
+            fio.write(b"XND".ljust(80))
+        with self.assertRaises(ValueError):
+            asyncio.run(read(filepath))
+
+
+if __name__ == '__main__':
+    unittest.main()
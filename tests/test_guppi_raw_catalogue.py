@@ -0,0 +1,81 @@
+import os
+import tempfile
+import time
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_catalogue import (
+    GuppiRawCatalogue,
+    catalogue_file,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.datadir = os.path.join(self.tmpdir.name, "data", "PROJ", "BACKEND")
+        os.makedirs(self.datadir)
+        self.database_filepath = os.path.join(self.tmpdir.name, "catalogue.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_scan_and_query(self):
+        for enum, (source_name, frequency) in enumerate([("A", 1400.0), ("B", 3000.0)]):
+            write_raw(
+                os.path.join(self.datadir, f"obs{enum}.0000.raw"),
+                3,
+                directio=True,
+                TELESCOP="ATA",
+                SRC_NAME=source_name,
+                OBSFREQ=frequency,
+                OBSBW=-100.0,
+                STT_IMJD=60000 + enum,
+                STT_SMJD=43200,
+            )
+        with open(os.path.join(self.datadir, "broken.0000.raw"), "wb") as fio:
+            fio.write(b"not a header")
+
+        with GuppiRawCatalogue(self.database_filepath) as catalogue:
+            assert catalogue.scan([self.tmpdir.name], max_workers=2) == 3
+            assert catalogue.scan([self.tmpdir.name], max_workers=2) == 0
+            assert len(catalogue.errors()) == 1
+
+            entries = catalogue.query(telescope="ATA", frequency=(1300.0, 1360.0))
+            assert [entry.source_name for entry in entries] == ["A"]
+            assert entries[0].mjd == 60000.5
+            assert entries[0].nof_blocks == 3
+            assert [entry.source_name for entry in catalogue.query(mjd=(60000.6, 60002))] == ["B"]
+
+            with GuppiRawReader(entries[0].filepath) as reader:
+                header, _, _ = reader.read_block(entries[0].block_offset(2))
+                assert header.packet_index == 2*16
+
+            filepath = os.path.join(self.datadir, "obs1.0000.raw")
+            write_raw(filepath, 1, TELESCOP="ATA", SRC_NAME="B")
+            os.utime(filepath, ns=(time.time_ns(), time.time_ns() + 10**9))
+            os.remove(os.path.join(self.datadir, "obs0.0000.raw"))
+            assert catalogue.scan([self.tmpdir.name], max_workers=1) == 1
+            entries = catalogue.query()
+            assert [entry.nof_blocks for entry in entries] == [1]
+
+    def test_long_header(self):
+        # a header spanning several of the chunks that it is read in
+        filepath = os.path.join(self.datadir, "long.0000.raw")
+        header = write_raw(filepath, 2, **{f"EXTRA{i:03d}": i for i in range(300)})
+        row = catalogue_file(filepath)
+        assert row[-1] is None
+        header_length = len(header.to_fits())
+        assert header_length > 3*8192
+        assert row[-3] == 2
+
+        with open(filepath, "r+b") as fio:
+            fio.truncate(header_length - 80)
+        row = catalogue_file(filepath)
+        assert row[-1].startswith("ValueError")
+
+
+if __name__ == '__main__':
+    unittest.main()
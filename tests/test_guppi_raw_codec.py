@@ -0,0 +1,157 @@
+import pickle
+import unittest
+
+from rao_keyvalue_property_mixin_classes import guppi_raw_codec
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GUPPI_RAW_HEADER_CLASS_REGISTRY,
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+    GuppiRawAtaCachedHeader,
+    GuppiRawMeerkatCachedHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_codec import (
+    HEADER_CODEC_CLASSES,
+    GuppiRawHeaderDecoder,
+    GuppiRawHeaderEncoder,
+    decode_header,
+    encode_header,
+    register_codec_class,
+)
+
+
+def keyvalues(**kwargs):
+    keyvalues = dict(
+        BLOCSIZE=2*4*16*2*2,
+        NANTS=2,
+        OBSNCHAN=2*4,
+        NPOL=2,
+        NBITS=8,
+        PKTIDX=0,
+        PIPERBLK=16,
+        OBSFREQ=1400,
+        OBSBW=-12.5,
+        TBIN=1e-6,
+        SRC_NAME="Önämé",
+        DIRECTIO=True,
+        ANTNMS00="1c,1e",
+        ANTFLG00=False,
+        LARGEINT=1 << 70,
+        NOTHING=None,
+    )
+    keyvalues.update(kwargs)
+    return keyvalues
+
+
+class TestGuppiRawHeaderCodec(unittest.TestCase):
+    def assert_identical(self, header, decoded):
+        assert type(decoded) is type(header)
+        assert list(decoded.items()) == list(header.items())
+        assert [type(value) for value in decoded.values()] == [
+            type(value) for value in header.values()
+        ]
+
+    def test_round_trip(self):
+        for header_class in [
+            GuppiRawHeader,
+            GuppiRawAtaHeader,
+            GuppiRawCosmicHeader,
+            GuppiRawMeerkatHeader,
+            GuppiRawAtaCachedHeader,
+            GuppiRawMeerkatCachedHeader,
+        ]:
+            header = header_class(keyvalues(RA_PHAS="1:2:3", CHAN_BW=0.5))
+            message = encode_header(header)
+            self.assert_identical(header, decode_header(message))
+            assert len(message) < len(pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL))
+
+        # ints overflowing int64, and strs holding the string separator,
+        # are escaped
+        header = GuppiRawHeader(keyvalues(
+            PKTIDX=1 << 64,
+            SRC_NAME="x"*(1 << 16),
+            NBITS=8.0,
+            OBSID="a\0b",
+            EMPTY="",
+            NEGATIVE=-(1 << 64),
+        ))
+        message = encode_header(header)
+        self.assert_identical(header, decode_header(message))
+        with self.assertRaises(ValueError):
+            decode_header(message[:-1])
+
+        with self.assertRaises(ValueError):
+            encode_header(dict(keyvalues()))
+        with self.assertRaises(TypeError):
+            encode_header(GuppiRawHeader(keyvalues(PKTIDX=b"0")))
+
+    def test_escaped_plans(self):
+        header = GuppiRawHeader(keyvalues(PKTIDX=1 << 64, OBSID="a\0b"))
+        encode_header(header)
+        plan = guppi_raw_codec._ENCODING_PLANS[(GuppiRawHeader, tuple(header))]
+        assert plan.escaped_positions == {
+            list(header).index("PKTIDX"),
+            list(header).index("OBSID"),
+            list(header).index("LARGEINT"),
+        }
+
+        # subsequent headers reuse the plan, escaping the same positions
+        for packet_index in [1 << 65, 0]:
+            header["PKTIDX"] = packet_index
+            message = encode_header(header)
+            assert guppi_raw_codec._ENCODING_PLANS[(GuppiRawHeader, tuple(header))] is plan
+            self.assert_identical(header, decode_header(message))
+
+    def test_registered_classes(self):
+        class GuppiRawGbtHeader(GuppiRawHeader):
+            DISPATCH_KEYVALUES = {"TELESCOP": "GBT"}
+
+        try:
+            header = GuppiRawGbtHeader(keyvalues(TELESCOP="GBT"))
+            # identified by name, lacking a class code
+            message = encode_header(header)
+            self.assert_identical(header, decode_header(message))
+
+            class_code = register_codec_class(GuppiRawGbtHeader)
+            assert class_code == len(HEADER_CODEC_CLASSES) - 1
+            compact_message = encode_header(header)
+            assert len(compact_message) < len(message)
+            self.assert_identical(header, decode_header(compact_message))
+        finally:
+            GUPPI_RAW_HEADER_CLASS_REGISTRY.unregister(GuppiRawGbtHeader)
+            if GuppiRawGbtHeader in HEADER_CODEC_CLASSES:
+                HEADER_CODEC_CLASSES.remove(GuppiRawGbtHeader)
+                guppi_raw_codec._CLASS_CODES.pop(GuppiRawGbtHeader)
+
+        with self.assertRaises(ValueError):
+            encode_header(header)
+
+    def test_delta_stream(self):
+        headers = [
+            GuppiRawAtaHeader(keyvalues(PKTIDX=16*i, STT_SMJD=i//2))
+            for i in range(6)
+        ]
+        # a change of keys or class is encoded in full
+        headers.append(GuppiRawAtaHeader(keyvalues(PKTIDX=16*6, EXTRA="x")))
+        headers.append(GuppiRawMeerkatHeader(keyvalues(PKTIDX=16*7, EXTRA="x")))
+
+        encoder = GuppiRawHeaderEncoder(keyframe_interval=4)
+        decoder = GuppiRawHeaderDecoder()
+        messages = [encoder.encode(header) for header in headers]
+        for header, message in zip(headers, messages):
+            self.assert_identical(header, decoder.decode(message))
+
+        full_length = len(messages[0])
+        assert [len(message) < full_length for message in messages] == [
+            False, True, True, True, False, True, False, False
+        ]
+
+        with self.assertRaises(ValueError):
+            decode_header(messages[1])
+        with self.assertRaises(ValueError):
+            GuppiRawHeaderDecoder().decode(messages[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
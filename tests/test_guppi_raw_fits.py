@@ -0,0 +1,147 @@
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_fits import (
+    FitsHeaderAccumulator,
+    GuppiRawAtaLazyHeader,
+    GuppiRawFitsView,
+    GuppiRawLazyHeader,
+    find_fits_end_card,
+    is_partial_fits_header,
+    lazy_GuppiRawHeader,
+    lazy_header_class,
+    parse_fits_keyvalues,
+    parse_GuppiRawHeader,
+)
+
+
+class TestGuppiRawFits(unittest.TestCase):
+    def test_round_trip(self):
+        grh = GuppiRawAtaHeader(
+            TELESCOP="ATA",
+            BLOCSIZE=16*32*1024*2*2*8//8,
+            OBSNCHAN=16*32,
+            NANTS=16,
+            OBSFREQ=1420.405751768,
+            TBIN=1e-06,
+            DIRECTIO=True,
+            SRC_NAME="3C286",
+            RA_STR="13:31:08.288",
+        )
+        fits = grh.to_fits()
+
+        parsed, header_length = parse_GuppiRawHeader(fits.encode())
+        assert header_length == len(fits)
+        assert isinstance(parsed, GuppiRawAtaHeader)
+        assert parsed == grh
+        assert parsed.to_fits() == fits
+
+    def test_offset_and_trailing_data(self):
+        grh = GuppiRawHeader(PKTIDX=1024, OBSBW=-187.5)
+        fits = grh.to_fits().encode()
+        buffer = bytearray(b"\0"*160 + fits + b"\xff"*1000)
+
+        keyvalues, header_length = parse_fits_keyvalues(memoryview(buffer), 160)
+        assert header_length == len(fits)
+        assert keyvalues == grh
+
+    def test_fits_standard_cards(self):
+        cards = [
+            "SIMPLE  =                    T / conforms to FITS",
+            "TELESCOP= 'MeerKAT '",
+            "COMMENT   not a key-value",
+            "NBITS   =                    4 / bits per sample",
+            "END",
+        ]
+        keyvalues, _ = parse_fits_keyvalues(
+            "".join(card.ljust(80) for card in cards).encode()
+        )
+        assert keyvalues == {"SIMPLE": True, "TELESCOP": "MeerKAT", "NBITS": 4}
+
+    def test_to_fits_into(self):
+        grh = GuppiRawHeader(PKTIDX=0, DIRECTIO=1, SRC_NAME="3C286")
+        buffer = bytearray(b"\0"*2048)
+
+        length = grh.to_fits_into(buffer, 512)
+        assert length == grh.fits_length() == 512
+        assert buffer[512:512+4*80] == grh.to_fits().encode()
+        assert buffer[512+4*80:1024] == b" "*(512-4*80)
+        assert buffer[:512] + buffer[1024:] == b"\0"*1536
+
+        grh.packet_index = 16384
+        assert grh.to_fits_into(buffer, 512, keys=["PKTIDX"]) == 512
+        assert buffer[512:512+4*80] == grh.to_fits().encode()
+
+        positions = grh.fits_card_positions(["PKTIDX"])
+        assert positions == {"PKTIDX": 0}
+        grh.packet_index = 32768
+        grh.to_fits_into(buffer, 512, keys=positions)
+        assert buffer[512:512+4*80] == grh.to_fits().encode()
+
+        with self.assertRaises(ValueError):
+            grh.to_fits_into(buffer, 1537)
+
+    def test_lazy_header(self):
+        grh = GuppiRawAtaHeader(
+            TELESCOP="ATA",
+            NANTS=2,
+            OBSNCHAN=8,
+            NPOL=2,
+            BLOCSIZE=2*4*16*2*2,
+            PKTIDX=16,
+            DIRECTIO=1,
+            SRC_NAME="END     = 'misaligned'",
+        )
+        fits = b"\0"*80 + grh.to_fits().encode() + b"\0"*1024
+        for buffer in [fits, memoryview(fits)]:
+            lazy = lazy_GuppiRawHeader(buffer, 80)
+            assert isinstance(lazy, GuppiRawAtaLazyHeader)
+            assert lazy.packet_index == 16
+            assert lazy.blockshape == grh.blockshape
+            assert lazy.get("OBSFREQ", 1.5) == 1.5
+            assert lazy.header_length == len(grh.to_fits())
+            assert lazy.data_offset == 80 + 512*2
+            assert dict(lazy) == grh
+            assert lazy.to_header() == grh
+
+        with self.assertRaises(ValueError):
+            GuppiRawFitsView(b" "*800).header_length
+
+        # classes without a lazy counterpart fall back to that of their bases
+        assert lazy_header_class(type("Unmapped", (GuppiRawAtaHeader,), {})) is GuppiRawAtaLazyHeader
+        assert lazy_header_class(dict) is GuppiRawLazyHeader
+
+    def test_missing_end(self):
+        with self.assertRaises(ValueError):
+            parse_fits_keyvalues(b"NBITS   = 8".ljust(80))
+
+    def test_end_card_search(self):
+        fits = GuppiRawHeader(SRC_NAME="END", NBITS=8).to_fits().encode()
+        assert find_fits_end_card(fits) == len(fits) - 80
+        assert find_fits_end_card(b" "*3 + fits, 3) == len(fits) - 77
+        assert find_fits_end_card(fits[:-1]) == -1
+
+        assert is_partial_fits_header(fits[:-100])
+        assert is_partial_fits_header(fits[:-100] + b"\0"*100)
+        assert is_partial_fits_header(b"")
+        assert not is_partial_fits_header(fits[:-100] + b"\1")
+        assert not is_partial_fits_header(fits[:-100] + b"\0" + fits[:80])
+
+        # chunks that split the END card
+        accumulator = FitsHeaderAccumulator()
+        chunks = [fits[i:i+50] for i in range(0, len(fits), 50)]
+        assert [accumulator.feed(chunk) for chunk in chunks[:-1]] == [None]*(len(chunks) - 1)
+        assert accumulator.is_partial()
+        assert accumulator.feed(chunks[-1] + b"\1"*100) == parse_fits_keyvalues(fits)
+
+        accumulator = FitsHeaderAccumulator(max_length=2*80)
+        assert accumulator.feed(fits[0:80]) is None
+        with self.assertRaises(ValueError):
+            accumulator.feed(fits[80:160])
+
+
+if __name__ == '__main__':
+    unittest.main()
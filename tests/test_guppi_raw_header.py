@@ -0,0 +1,69 @@
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GUPPI_RAW_HEADER_CLASS_REGISTRY,
+    GuppiRawHeader,
+    GuppiRawHeaderClassRegistry,
+    GuppiRawAtaHeader,
+    GuppiRawCosmicHeader,
+    GuppiRawMeerkatHeader,
+    auto_init_GuppiRawHeader,
+)
+
+
+class TestGuppiRawHeaderClassRegistry(unittest.TestCase):
+    def test_telescope_dispatch(self):
+        for telescope, header_class in [
+            ("ATA", GuppiRawAtaHeader),
+            ("VLA", GuppiRawCosmicHeader),
+            ("MeerKAT", GuppiRawMeerkatHeader),
+            ("GBT", GuppiRawHeader),
+        ]:
+            header = auto_init_GuppiRawHeader({"TELESCOP": telescope, "NBITS": 4})
+            assert type(header) is header_class
+            assert header == {"TELESCOP": telescope, "NBITS": 4}
+        assert type(auto_init_GuppiRawHeader({})) is GuppiRawHeader
+
+    def test_deprecated_property_fget_class_map(self):
+        from rao_keyvalue_property_mixin_classes import guppi_raw_header
+
+        with self.assertWarns(DeprecationWarning):
+            property_fget_class_map = guppi_raw_header.PROPERTY_FGET_CLASS_MAP
+        telescope_class_map = property_fget_class_map[GuppiRawHeader.telescope.fget]
+        assert telescope_class_map["ATA"] is GuppiRawAtaHeader
+        assert telescope_class_map["MeerKAT"] is GuppiRawMeerkatHeader
+        with self.assertRaises(TypeError):
+            telescope_class_map["GBT"] = GuppiRawHeader
+
+    def test_multiple_keys(self):
+        registry = GuppiRawHeaderClassRegistry(GuppiRawHeader)
+        registry.register(GuppiRawAtaHeader, TELESCOP="ATA")
+        registry.register(GuppiRawCosmicHeader, TELESCOP="ATA", BACKEND="COSMIC")
+        registry.register(GuppiRawMeerkatHeader, BACKEND="COSMIC")
+
+        assert registry.resolve({"TELESCOP": "ATA"}) is GuppiRawAtaHeader
+        assert registry.resolve({"TELESCOP": "ATA", "BACKEND": "GUPPI"}) is GuppiRawAtaHeader
+        assert registry.resolve({"TELESCOP": "ATA", "BACKEND": "COSMIC"}) is GuppiRawCosmicHeader
+        assert registry.resolve({"TELESCOP": "VLA", "BACKEND": "COSMIC"}) is GuppiRawMeerkatHeader
+        assert registry.resolve({"TELESCOP": "VLA"}) is GuppiRawHeader
+
+        headers = list(registry.init_batch(
+            {"TELESCOP": "ATA", "PKTIDX": i} for i in range(3)
+        ))
+        assert [type(header) for header in headers] == [GuppiRawAtaHeader]*3
+        assert [header.packet_index for header in headers] == [0, 1, 2]
+
+    def test_subclass_registration(self):
+        class GuppiRawTestHeader(GuppiRawAtaHeader):
+            DISPATCH_KEYVALUES = {"TELESCOP": "ATA", "BACKEND": "TEST"}
+
+        try:
+            assert type(auto_init_GuppiRawHeader({"TELESCOP": "ATA", "BACKEND": "TEST"})) is GuppiRawTestHeader
+            assert type(auto_init_GuppiRawHeader({"TELESCOP": "ATA"})) is GuppiRawAtaHeader
+        finally:
+            GUPPI_RAW_HEADER_CLASS_REGISTRY.unregister(GuppiRawTestHeader)
+        assert type(auto_init_GuppiRawHeader({"TELESCOP": "ATA", "BACKEND": "TEST"})) is GuppiRawAtaHeader
+
+
+if __name__ == '__main__':
+    unittest.main()
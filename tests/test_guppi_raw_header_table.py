@@ -0,0 +1,106 @@
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawAtaHeader,
+    GuppiRawMeerkatHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_header_table import (
+    HeaderTable,
+    GuppiRawAtaHeaderTable,
+    GuppiRawMeerkatHeaderTable,
+)
+
+
+def ata_headers(nof_blocks):
+    for i in range(nof_blocks):
+        yield GuppiRawAtaHeader(
+            NANTS=16,
+            OBSNCHAN=16*32,
+            NPOL=2,
+            BLOCSIZE=16*32*1024*2*2,
+            PKTIDX=i*1024,
+            TBIN=1e-6,
+            SYNCTIME=1700000000,
+            OBSFREQ=1420.0 + i,
+            SRC_NAME="3C286",
+            RA_STR="13:31:08.288",
+            DEC_STR="-0:30:00",
+            **({"CHAN_BW": 0.5} if i == 1 else {}),
+        )
+
+
+class TestHeaderTable(unittest.TestCase):
+    def test_column_properties(self):
+        headers = list(ata_headers(4))
+        table = HeaderTable.from_headers(ata_headers(4))
+        assert isinstance(table, GuppiRawAtaHeaderTable)
+        assert len(table) == 4
+        assert table["PKTIDX"].dtype == numpy.int64
+        assert table["OBSFREQ"].dtype == numpy.float64
+        assert list(table["SRC_NAME"]) == ["3C286"]*4
+
+        assert table.time_unix_epoch_seconds.tolist() == [
+            header.time_unix_epoch_seconds for header in headers
+        ]
+        assert table.channel_bandwidth.tolist() == [
+            header.channel_bandwidth for header in headers
+        ]
+        assert table.declination_degrees.tolist() == [-0.5]*4
+        assert table.nof_bits.tolist() == [8]*4
+        with self.assertRaises(KeyError):
+            table["CHAN_BW"]
+
+    def test_rows(self):
+        headers = list(ata_headers(3))
+        table = HeaderTable.from_headers(headers)
+        row = table.row(1)
+        assert row == headers[1]
+        assert row.blockshape == headers[1].blockshape
+        assert row.channel_bandwidth == 0.5
+        assert "CHAN_BW" not in table.row(-1)
+        header = table.row(2).to_header()
+        assert type(header) is GuppiRawAtaHeader and header == headers[2]
+
+    def test_path_properties(self):
+        # more rows than the length the directory names are truncated to
+        headers = [
+            GuppiRawAtaHeader(
+                header,
+                DATADIR="/mnt/buf0",
+                PROJID="p"*30 if i % 2 else "proj",
+                OBSSTEM=f"stem{i}",
+                **({"BACKEND": "GUPPI"} if i % 3 else {}),
+            )
+            for i, header in enumerate(ata_headers(30))
+        ]
+        table = HeaderTable.from_headers(headers)
+        for name in [
+            "project_id",
+            "backend",
+            "observation_output_directorypath",
+            "observation_stempath",
+        ]:
+            assert getattr(table, name).tolist() == [
+                getattr(header, name) for header in headers
+            ]
+
+        table = HeaderTable.from_headers([
+            GuppiRawMeerkatHeader(DATADIR="/mnt", PROJID="p"*30)
+        ]*30)
+        assert table.observation_output_directorypath.tolist() == [
+            "/mnt/" + "p"*23 + "/."
+        ]*30
+
+    def test_meerkat_polarizations(self):
+        table = HeaderTable.from_headers([
+            GuppiRawMeerkatHeader(NPOL=4),
+            GuppiRawMeerkatHeader(NPOL=1),
+        ])
+        assert isinstance(table, GuppiRawMeerkatHeaderTable)
+        assert table.nof_polarizations.tolist() == [2, 1]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_index import GuppiRawBlockIndex
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawBlockIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmpdir.name, "test.0000.raw")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        header = write_raw(self.filepath, 8, directio=True, skip=(5,))
+        index = GuppiRawBlockIndex.open(self.filepath)
+        assert len(index) == 7
+        assert os.path.exists(GuppiRawBlockIndex.sidecar_filepath(self.filepath))
+
+        assert index.block_index_of_packet_index(0) == 0
+        assert index.block_index_of_packet_index(3*16 + 15) == 3
+        assert index.block_index_of_packet_index(6*16) == 5
+        for packet_index in [-1, 5*16, 8*16]:
+            with self.assertRaises(KeyError):
+                index.block_index_of_packet_index(packet_index)
+
+        header.packet_index = 7*16
+        assert index.block_index_of_time(header.time_unix_epoch_seconds + 1e-6) == 6
+
+        with GuppiRawReader(self.filepath) as reader:
+            block_header, _, _ = reader.read_block(index.header_offset_of_packet_index(4*16 + 1))
+            assert block_header.packet_index == 4*16
+
+    def test_staleness(self):
+        write_raw(self.filepath, 4)
+        assert GuppiRawBlockIndex.load(self.filepath) is None
+        GuppiRawBlockIndex.open(self.filepath)
+        assert len(GuppiRawBlockIndex.load(self.filepath)) == 4
+
+        write_raw(self.filepath, 5)
+        assert GuppiRawBlockIndex.load(self.filepath) is None
+        assert len(GuppiRawBlockIndex.open(self.filepath)) == 5
+
+
+if __name__ == '__main__':
+    unittest.main()
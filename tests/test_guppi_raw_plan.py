@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_plan import GuppiRawReadPlan
+from rao_keyvalue_property_mixin_classes.guppi_raw_sequence import GuppiRawSequenceReader
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawReadPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stempath = os.path.join(self.tmpdir.name, "test")
+        # two files of 4 blocks (16 packet-indices and spectra each), the
+        # second continuing the first
+        write_raw(f"{self.stempath}.0000.raw", 4)
+        header = write_raw(f"{self.stempath}.0001.raw", 8, skip=(0, 1, 2, 3))
+        self.filepaths = GuppiRawSequenceReader.sequence_filepaths(self.stempath)
+        with GuppiRawSequenceReader(self.stempath) as reader:
+            self.spectra = numpy.concatenate([block for _, block in reader], axis=2)
+        assert self.spectra.shape[2] == 8*header.nof_spectra_per_block
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_window(self):
+        plan = GuppiRawReadPlan.from_window(self.filepaths[::-1], 20, 100, use_sidecar=False)
+        assert [operation.filepath for operation in plan.operations] == self.filepaths
+        assert [operation.spectra_slice for operation in plan.operations] == [
+            slice(0, 44), slice(44, 80)
+        ]
+        # the first block of the window is block 1, the last block 6
+        first_blocks = plan.operations[0].block_reads
+        assert [block_spectra for _, block_spectra in first_blocks] == [
+            slice(4, 16), slice(0, 16), slice(0, 16)
+        ]
+        assert plan.operations[1].block_reads[-1][1] == slice(0, 4)
+        assert plan.nof_bytes < sum(os.path.getsize(filepath) for filepath in self.filepaths)
+
+        spectra = plan.read()
+        assert spectra.shape == plan.shape
+        assert numpy.array_equal(spectra, self.spectra[:, :, 20:100])
+
+    def test_max_read_length(self):
+        plan = GuppiRawReadPlan.from_window(self.filepaths, 0, 128, max_read_length=1)
+        assert len(plan.operations) == 8
+        assert numpy.array_equal(plan.read(), self.spectra)
+
+    def test_invalid_window(self):
+        for start, stop in [(20, 20), (100, 20)]:
+            with self.assertRaises(ValueError):
+                GuppiRawReadPlan.from_window(self.filepaths, start, stop, use_sidecar=False)
+
+        filepath = os.path.join(self.tmpdir.name, "unspanned.0000.raw")
+        write_raw(filepath, 2, PIPERBLK=0)
+        with self.assertRaises(ValueError):
+            GuppiRawReadPlan.from_window([filepath], 0, 16, use_sidecar=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawHeader
+from rao_keyvalue_property_mixin_classes.guppi_raw_fits import directio_padded_length
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+
+
+def write_raw(filepath, nof_blocks, directio=False, nbits=8, truncate=0, skip=(), **keyvalues):
+    header = GuppiRawHeader(
+        NANTS=2,
+        OBSNCHAN=2*4,
+        NPOL=2,
+        NBITS=nbits,
+        BLOCSIZE=2*4*16*2*2*nbits//8,
+        DIRECTIO=directio,
+        PKTIDX=0,
+        TBIN=1e-6,
+        SYNCTIME=1700000000,
+        **keyvalues
+    )
+    with open(filepath, "wb") as fio:
+        for i in range(nof_blocks):
+            if i in skip:
+                continue
+            header.packet_index = i*16
+            fits = header.to_fits().encode()
+            fio.write(fits.ljust(directio_padded_length(len(fits), directio), b"\0"))
+            fio.write(bytes([i])*header.blocksize)
+        fio.truncate(fio.tell() - truncate)
+    return header
+
+
+class TestGuppiRawReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmpdir.name, "test.0000.raw")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_blocks(self):
+        for directio in [False, True]:
+            header = write_raw(self.filepath, 3, directio=directio)
+            with GuppiRawReader(self.filepath) as reader:
+                blocks = list(reader)
+            assert len(blocks) == 3
+            for i, (block_header, block) in enumerate(blocks):
+                assert block_header.packet_index == i*16
+                assert block.shape == header.blockshape
+                assert block.dtype.names == ("re", "im")
+                assert numpy.all(block["re"] == i)
+
+    def test_4bit_and_truncation(self):
+        header = write_raw(self.filepath, 3, nbits=4, truncate=1)
+        with GuppiRawReader(self.filepath) as reader:
+            blocks = list(reader)
+        assert len(blocks) == 2
+        assert blocks[-1][1].shape == header.blockshape
+        assert blocks[-1][1].dtype == numpy.uint8
+
+    def test_partial_trailing_header(self):
+        header = write_raw(self.filepath, 3)
+        with open(self.filepath, "ab") as fio:
+            fio.write(header.to_fits().encode()[0:200])
+        with GuppiRawReader(self.filepath) as reader:
+            assert len(list(reader)) == 3
+            assert len(list(reader.lazy_headers())) == 3
+
+    def test_corrupt_header(self):
+        header = write_raw(self.filepath, 3)
+        block_length = len(header.to_fits()) + header.blocksize
+        with open(self.filepath, "r+b") as fio:
+            # lose the END card of the last header, followed by its block-data
+            fio.seek(3*block_length - header.blocksize - 80)
+            fio.write(b"XND".ljust(80))
+        with GuppiRawReader(self.filepath) as reader:
+            with self.assertRaises(ValueError):
+                list(reader)
+            with self.assertRaises(ValueError):
+                list(reader.lazy_headers())
+
+    def test_block_selection(self):
+        write_raw(self.filepath, 2)
+        with GuppiRawReader(self.filepath) as reader:
+            header, block, next_offset = reader.read_block(0)
+            block = block.copy()
+            block["re"] = numpy.arange(block.size).reshape(block.shape)
+            block["im"] = -block["re"]
+            with open(self.filepath, "r+b") as fio:
+                fio.seek(next_offset - header.blocksize)
+                fio.write(block.tobytes())
+
+        with GuppiRawReader(self.filepath) as reader:
+            expected = block[[1], 1:3, 4:9]
+            for use_mmap in [True, False]:
+                _, selection, selection_next_offset = reader.read_block_selection(
+                    0,
+                    antennas=[1],
+                    channels=(1, 3),
+                    spectra=range(4, 9),
+                    use_mmap=use_mmap
+                )
+                assert selection_next_offset == next_offset
+                assert numpy.array_equal(selection, expected)
+
+            out = numpy.empty((2, 2, 16, 2), dtype=block.dtype)
+            _, selection, _ = reader.read_block_selection(
+                0, antennas=[1, 0], channels=slice(0, 4, 2), out=out, use_mmap=False
+            )
+            assert selection is out
+            assert numpy.array_equal(out, block[[1, 0], 0:4:2])
+
+            with self.assertRaises(ValueError):
+                reader.read_block_selection(0, out=out)
+            for use_mmap in [True, False]:
+                with self.assertRaises(IndexError):
+                    reader.read_block_selection(0, antennas=[-1], use_mmap=use_mmap)
+
+
+if __name__ == '__main__':
+    unittest.main()
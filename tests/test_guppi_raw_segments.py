@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawHeader
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+from rao_keyvalue_property_mixin_classes.guppi_raw_segments import GuppiRawSegmenter
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawSegmenter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmpdir.name, "test.0000.raw")
+        write_raw(self.filepath, 8, skip=(2, 3, 6))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_segments(self):
+        with GuppiRawReader(self.filepath) as reader:
+            segmenter = GuppiRawSegmenter(reader)
+            segments = [
+                [segmented.header.packet_index//16 for segmented in blocks]
+                for _, blocks in segmenter.segments()
+            ]
+        assert segments == [[0, 1], [4, 5], [7]]
+        assert [
+            (discontinuity.kind, discontinuity.block_enum, discontinuity.nof_packet_indices)
+            for discontinuity in segmenter.discontinuities
+        ] == [("gap", 2, 32), ("gap", 4, 16)]
+
+    def test_fill_gaps(self):
+        with GuppiRawReader(self.filepath) as reader:
+            segmenter = GuppiRawSegmenter(reader, fill_gaps=True, max_fill_blocks=1)
+            items = list(segmenter)
+            assert [item.header.packet_index//16 for item in items] == [0, 1, 4, 5, 6, 7]
+            assert [item.segment_index for item in items] == [0, 0, 1, 1, 1, 1]
+            placeholder = items[4]
+            assert placeholder.is_placeholder
+            assert not numpy.any(placeholder.block["re"])
+            assert not placeholder.block.flags.writeable
+            assert segmenter.nof_placeholder_blocks == 1
+            assert segmenter.discontinuities[1].nof_placeholder_blocks == 1
+            del items, placeholder
+
+            # lazy headers are read-only views of the mapping
+            segmenter = GuppiRawSegmenter(
+                (
+                    (header, reader.read_block(offset)[1])
+                    for header, offset in reader.lazy_headers()
+                ),
+                fill_gaps=True,
+                max_fill_blocks=2,
+                max_discontinuities=1
+            )
+            items = list(segmenter)
+            assert [item.header.packet_index//16 for item in items] == list(range(8))
+            assert type(items[2].header) is GuppiRawHeader
+            assert (segmenter.nof_gaps, segmenter.nof_overlaps) == (2, 0)
+            assert [discontinuity.block_enum for discontinuity in segmenter.discontinuities] == [4]
+            del items
+
+    def test_overlaps(self):
+        with GuppiRawReader(self.filepath) as reader:
+            blocks = list(reader)
+            stream = blocks[0:2] + blocks[1:3]
+            segmenter = GuppiRawSegmenter(stream, skip_overlaps=True)
+            assert [item.header.packet_index//16 for item in segmenter] == [0, 1, 4]
+            assert segmenter.discontinuities[0].kind == "overlap"
+            del blocks, stream
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawAtaHeader
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import GuppiRawReader
+from rao_keyvalue_property_mixin_classes.guppi_raw_sequence import GuppiRawSequenceReader
+
+from test_guppi_raw_reader import write_raw
+
+
+class TestGuppiRawSequenceReader(unittest.TestCase):
+    def test_stream(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            header = GuppiRawAtaHeader(
+                DATADIR=tmpdir,
+                PROJID="proj",
+                BACKEND="GUPPI",
+                OBSSTEM="guppi_obs",
+            )
+            os.makedirs(header.observation_output_directorypath)
+            for file_enum in range(3):
+                write_raw(f"{header.observation_stempath}.{file_enum:04d}.raw", 3)
+
+            with GuppiRawSequenceReader.from_header(header, nof_prefetch_blocks=2) as reader:
+                blocks = [
+                    (block_header.packet_index, int(block["re"].flat[0]))
+                    for block_header, block in reader
+                ]
+            assert blocks == [(i*16, i) for i in range(3)]*3
+
+    def test_prefetch_before_close(self):
+        prefetch, close = GuppiRawReader.prefetch, GuppiRawReader.close
+        closed_readers = []
+        late_prefetches = []
+
+        def slow_prefetch(reader, offset, length):
+            time.sleep(0.01)
+            if any(closed_reader is reader for closed_reader in closed_readers):
+                late_prefetches.append(reader.filepath)
+            prefetch(reader, offset, length)
+
+        def recorded_close(reader):
+            closed_readers.append(reader)
+            close(reader)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stempath = os.path.join(tmpdir, "guppi_obs")
+            for file_enum in range(2):
+                write_raw(f"{stempath}.{file_enum:04d}.raw", 3)
+            with mock.patch.multiple(GuppiRawReader, prefetch=slow_prefetch, close=recorded_close):
+                with GuppiRawSequenceReader(stempath, nof_prefetch_blocks=1) as reader:
+                    assert len(list(reader)) == 6
+                    # abandoning the stream closes the reader too
+                    for _ in reader:
+                        break
+        assert late_prefetches == []
+
+    def test_missing(self):
+        with self.assertRaises(FileNotFoundError):
+            GuppiRawSequenceReader("/nonexistent/stem")
+
+
+if __name__ == '__main__':
+    unittest.main()
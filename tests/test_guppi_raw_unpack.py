@@ -0,0 +1,73 @@
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawAtaHeader
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import guppi_raw_block_dtype
+from rao_keyvalue_property_mixin_classes import guppi_raw_unpack
+from rao_keyvalue_property_mixin_classes.guppi_raw_unpack import unpack_block
+
+
+def header_of(nbits, datatype="INTEGER", nof_spectra=16):
+    return GuppiRawAtaHeader(
+        NANTS=2,
+        OBSNCHAN=2*4,
+        NPOL=2,
+        NBITS=nbits,
+        DATATYPE=datatype,
+        BLOCSIZE=2*4*nof_spectra*2*2*nbits//8,
+    )
+
+
+class TestGuppiRawUnpack(unittest.TestCase):
+    def test_4bit(self):
+        header = header_of(4)
+        block = numpy.arange(header.blocksize, dtype=numpy.uint8)
+        unpacked = unpack_block(header, block.tobytes())
+        assert unpacked.shape == header.blockshape
+        assert unpacked.dtype == numpy.complex64
+
+        expected_real = ((block >> 4) ^ 8).astype(numpy.int8) - 8
+        expected_imag = ((block & 0xf) ^ 8).astype(numpy.int8) - 8
+        assert numpy.array_equal(unpacked.reshape(-1).real, expected_real)
+        assert numpy.array_equal(unpacked.reshape(-1).imag, expected_imag)
+
+    def test_integer_and_float(self):
+        for nbits, datatype in [(8, "INTEGER"), (16, "INTEGER"), (16, "FLOAT"), (32, "FLOAT")]:
+            header = header_of(nbits, datatype)
+            dtype = guppi_raw_block_dtype(header)
+            rng = numpy.random.default_rng(nbits)
+            block = numpy.empty(header.blockshape, dtype=dtype)
+            values = rng.integers(-100, 100, size=header.blockshape + (2,))
+            if dtype.names is None:
+                block.real, block.imag = values[..., 0], values[..., 1]
+            else:
+                block["re"], block["im"] = values[..., 0], values[..., 1]
+
+            out = numpy.empty(header.blockshape, dtype=numpy.complex128)
+            assert unpack_block(header, block, out=out) is out
+            assert numpy.array_equal(out.real, values[..., 0])
+            assert numpy.array_equal(out.imag, values[..., 1])
+
+    def test_threaded(self):
+        header = header_of(4, nof_spectra=1024)
+        block = numpy.random.default_rng(4).integers(0, 256, header.blocksize, dtype=numpy.uint8)
+        original_minimum = guppi_raw_unpack.MIN_SAMPLES_PER_THREAD
+        guppi_raw_unpack.MIN_SAMPLES_PER_THREAD = 1024
+        try:
+            threaded = unpack_block(header, block, nof_threads=4)
+        finally:
+            guppi_raw_unpack.MIN_SAMPLES_PER_THREAD = original_minimum
+        assert numpy.array_equal(threaded, unpack_block(header, block))
+
+    def test_invalid_output(self):
+        header = header_of(8)
+        block = bytes(header.blocksize)
+        with self.assertRaises(ValueError):
+            unpack_block(header, block, out=numpy.empty(header.blockshape, dtype=numpy.float32))
+        with self.assertRaises(ValueError):
+            unpack_block(header, block, out=numpy.empty((1,), dtype=numpy.complex64))
+
+
+if __name__ == '__main__':
+    unittest.main()
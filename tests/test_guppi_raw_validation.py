@@ -0,0 +1,68 @@
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawAtaHeader,
+    GuppiRawMeerkatHeader,
+)
+from rao_keyvalue_property_mixin_classes.guppi_raw_header_table import HeaderTable
+from rao_keyvalue_property_mixin_classes.guppi_raw_validation import (
+    GuppiRawValidationPlan,
+    validate_headers,
+    validate_table,
+)
+
+
+def headers():
+    valid = dict(NANTS=2, OBSNCHAN=2*4, NPOL=2, NBITS=8, BLOCSIZE=2*4*16*2*2, PKTIDX=0)
+    yield GuppiRawAtaHeader(valid)
+    yield GuppiRawAtaHeader({key: value for key, value in valid.items() if key != "OBSNCHAN"})
+    yield GuppiRawAtaHeader(valid, NBITS=12)
+    yield GuppiRawAtaHeader(valid, NANTS=3)
+    yield GuppiRawAtaHeader(valid, BLOCSIZE=2*4*16*2*2 + 4)
+    yield GuppiRawAtaHeader(valid, PKTIDX="0")
+    yield GuppiRawAtaHeader(valid, NANTS=0)
+
+
+EXPECTED = [
+    (1, "required", "OBSNCHAN"),
+    (2, "value", "NBITS"),
+    (3, "divisibility", None),
+    (4, "divisibility", None),
+    (5, "type", "PKTIDX"),
+    (6, "divisibility", None),
+]
+
+
+class TestGuppiRawValidation(unittest.TestCase):
+    def test_plan_per_class(self):
+        plan = GuppiRawValidationPlan.plan_for_class(GuppiRawAtaHeader)
+        assert plan is GuppiRawValidationPlan.plan_for_class(GuppiRawAtaHeader)
+        assert "OBSNCHAN" in plan.required_keys
+        assert "CHAN_BW" not in plan.required_keys
+        assert "CHAN_BW" in GuppiRawValidationPlan.plan_for_class(GuppiRawMeerkatHeader).required_keys
+
+    def test_stream(self):
+        report = validate_headers(headers(), chunk_length=3)
+        assert report.header_class is GuppiRawAtaHeader
+        assert report.nof_headers == 7
+        assert [(issue.index, issue.rule, issue.key) for issue in report.issues] == EXPECTED
+        assert report.counts()["divisibility"] == 3
+        assert report.to_dict()["issues"][0]["key"] == "OBSNCHAN"
+
+        report = validate_headers(headers(), max_issues=1, chunk_length=2)
+        assert report.truncated
+        assert report.nof_headers == 2
+        assert report.invalid_indices() == [1]
+
+    def test_table(self):
+        report = validate_table(HeaderTable.from_headers(headers()))
+        assert [(issue.index, issue.rule, issue.key) for issue in report.issues] == EXPECTED
+
+    def test_meerkat_polarizations(self):
+        header = GuppiRawMeerkatHeader(OBSNCHAN=4, NPOL=4, NBITS=8, BLOCSIZE=4*16*2*2, CHAN_BW=1.0)
+        assert validate_headers([header]).is_valid
+        assert validate_table(HeaderTable.from_headers([header, header])).is_valid
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawAtaHeader
+from rao_keyvalue_property_mixin_classes.guppi_raw_reader import guppi_raw_block_dtype
+from rao_keyvalue_property_mixin_classes.guppi_raw_sequence import GuppiRawSequenceReader
+from rao_keyvalue_property_mixin_classes.guppi_raw_writer import GuppiRawWriter
+
+
+class TestGuppiRawWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.header = GuppiRawAtaHeader(
+            DATADIR=self.tmpdir.name,
+            PROJID="proj",
+            BACKEND="GUPPI",
+            OBSSTEM="guppi_obs",
+            NANTS=2,
+            OBSNCHAN=2*4,
+            NPOL=2,
+            NBITS=8,
+            BLOCSIZE=2*4*32*2*2,
+            DIRECTIO=1,
+            PKTIDX=0,
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rollover_and_read_back(self):
+        dtype = guppi_raw_block_dtype(self.header)
+        max_file_size = 2*(self.header.fits_length() + self.header.blocksize)
+        with GuppiRawWriter.from_header(self.header, max_file_size=max_file_size) as writer:
+            for i in range(5):
+                self.header.packet_index = i*32
+                block = numpy.zeros(self.header.blockshape, dtype=dtype)
+                block["re"] = i
+                block["im"] = -i
+                writer.write(self.header, block)
+
+        assert len(writer.filepaths) == 3
+        assert all(os.path.getsize(filepath) <= max_file_size for filepath in writer.filepaths)
+
+        with GuppiRawSequenceReader.from_header(self.header) as reader:
+            blocks = [
+                (header.packet_index, int(block["re"].max()), int(block["im"].min()))
+                for header, block in reader
+            ]
+        assert blocks == [(i*32, i, -i) for i in range(5)]
+
+    def test_validation(self):
+        with GuppiRawWriter.from_header(self.header) as writer:
+            with self.assertRaises(ValueError):
+                writer.write(self.header, numpy.zeros(self.header.blocksize//2, dtype=numpy.int8))
+            with self.assertRaises(ValueError):
+                writer.write(self.header, numpy.zeros(self.header.blocksize//4, dtype=numpy.int32))
+        assert writer.closed
+        with self.assertRaises(ValueError):
+            writer.write(self.header, numpy.zeros(self.header.blocksize, dtype=numpy.int8))
+
+
+if __name__ == '__main__':
+    unittest.main()
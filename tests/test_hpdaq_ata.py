@@ -0,0 +1,39 @@
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawAtaCachedHeader,
+    GuppiRawCosmicCachedHeader,
+)
+
+
+class TestHpdaqAta(unittest.TestCase):
+    def test_antenna_metadata(self):
+        names = [f"ea{i:02d}" for i in range(1, 29)]
+        for header_class in [GuppiRawAtaCachedHeader, GuppiRawCosmicCachedHeader]:
+            grh = header_class(NANTS=len(names))
+            grh.antenna_names = names
+            grh.antenna_flags = [i % 3 == 0 for i in range(len(names))]
+            assert "ANTNMS01" in grh
+
+            assert grh.antenna_names == tuple(names)
+            assert grh.antenna_flags[0:4] == (True, False, False, True)
+            assert grh.antenna_index_map["ea05"] == 4
+            # the cached metadata is shared, so it is handed out read-only
+            with self.assertRaises(TypeError):
+                grh.antenna_index_map["ea05"] = 0
+            with self.assertRaises(AttributeError):
+                grh.antenna_names.append("ea99")
+            assert grh.antenna_flag_mask.sum() == 10
+            assert list(grh.unflagged_antenna_indices[0:3]) == [1, 2, 4]
+            assert "antenna_index_map" in grh._property_cache
+
+            # changing the cards invalidates the parsed metadata
+            grh["ANTFLG00"] = ",".join(["0"]*len(names))
+            assert "antenna_index_map" in grh._property_cache
+            assert len(grh.unflagged_antenna_indices) == len(names)
+            grh["ANTNMS00"] = grh["ANTNMS00"].replace("ea01", "ea99")
+            assert grh.antenna_index_map["ea99"] == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
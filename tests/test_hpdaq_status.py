@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import GuppiRawHeader
+from rao_keyvalue_property_mixin_classes.hpdaq_status import (
+    HASHPIPE_STATUS_TOTAL_SIZE,
+    HpdaqLivenessMonitor,
+    HpdaqStatus,
+)
+
+
+def write_status(filepath, **keyvalues):
+    fits = GuppiRawHeader(**keyvalues).to_fits().encode()
+    with open(filepath, "r+b" if os.path.exists(filepath) else "wb") as fio:
+        fio.write(fits.ljust(HASHPIPE_STATUS_TOTAL_SIZE, b"\0"))
+
+
+class TestHpdaqStatus(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tmpdir.name, "status")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_change_detection(self):
+        write_status(self.filepath, DAQSTATE="armed", PKTSTART=0, PKTIDX=0)
+        with HpdaqStatus.from_file(self.filepath) as status:
+            assert status.start_packet_index == 0
+            assert status.refresh() == set()
+
+            write_status(self.filepath, DAQSTATE="armed", PKTSTART=0, PKTIDX=1024)
+            assert status.refresh() == {"PKTIDX"}
+            assert status["PKTIDX"] == 1024
+
+            write_status(self.filepath, DAQSTATE="armed", PKTSTART=0, PKTIDX=1024, NETSTAT="receiving")
+            assert status.refresh() == {"NETSTAT"}
+
+            write_status(self.filepath, DAQSTATE="record", PKTIDX=2048)
+            assert status.refresh() == {"DAQSTATE", "PKTSTART", "PKTIDX", "NETSTAT"}
+            assert status.get("PKTSTART") is None
+
+    def test_liveness_monitor(self):
+        write_status(self.filepath, DAQPULSE=datetime.now().strftime("%a %b %d %H:%M:%S %Y"))
+        stale_filepath = os.path.join(self.tmpdir.name, "stale_status")
+        write_status(stale_filepath, DAQPULSE="Thu Jan 01 00:00:00 1970")
+
+        monitor = HpdaqLivenessMonitor({
+            "live": HpdaqStatus.from_file(self.filepath),
+            "stale": HpdaqStatus.from_file(stale_filepath),
+        }, interval=0.01)
+
+        async def first_transitions():
+            transitions = {}
+            async for name, is_alive in monitor.watch():
+                transitions[name] = is_alive
+                if len(transitions) == 2:
+                    return transitions
+
+        assert asyncio.run(first_transitions()) == {"live": True, "stale": False}
+        assert monitor.poll() == {}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import copy
+import pickle
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawHeader,
+    GuppiRawAtaHeader,
+    GuppiRawCachedHeader,
+    GuppiRawAtaCachedHeader,
+    GuppiRawMeerkatCachedHeader,
+    GuppiRawMeerkatHeader,
+    cached_header_class,
+)
+
+
+class TestPropertyCache(unittest.TestCase):
+    def test_dependency_invalidation(self):
+        grh = GuppiRawCachedHeader(
+            NANTS=16,
+            OBSNCHAN=16*32,
+            NPOL=2,
+            BLOCSIZE=16*32*1024*2*2*8//8,
+            OBSBW=32,
+        )
+        assert grh.blockshape == (16, 32, 1024, 2)
+        assert grh.channel_bandwidth == 1
+
+        grh["SRC_NAME"] = "unrelated"
+        assert "blockshape" in grh._property_cache
+        assert "channel_bandwidth" in grh._property_cache
+
+        grh["BLOCSIZE"] //= 2
+        assert "blockshape" not in grh._property_cache
+        assert "channel_bandwidth" in grh._property_cache
+        assert grh.blockshape == (16, 32, 512, 2)
+
+        # a defaulted key is a dependency too
+        grh.update(NBITS=4)
+        assert grh.blockshape == (16, 32, 1024, 2)
+
+        grh.channel_bandwidth *= 2
+        assert grh.observed_bandwidth == 64
+        assert grh.channel_bandwidth == 2
+
+        del grh["NANTS"]
+        assert grh.blockshape == (1, 16*32, 1024, 2)
+
+    def test_subclass_properties(self):
+        grh = GuppiRawAtaCachedHeader(OBSNCHAN=32, TBIN=0.5)
+        assert grh.channel_bandwidth == 2.0
+        grh["CHAN_BW"] = 0.25
+        assert grh.channel_bandwidth == 0.25
+
+    def test_copies(self):
+        grh = GuppiRawAtaCachedHeader(OBSNCHAN=32, TBIN=0.5)
+        assert grh.channel_bandwidth == 2.0
+        for duplicate in [copy.copy(grh), pickle.loads(pickle.dumps(grh))]:
+            assert type(duplicate) is GuppiRawAtaCachedHeader
+            assert duplicate == grh
+            duplicate["TBIN"] = 0.25
+            assert duplicate.channel_bandwidth == 4.0
+            assert grh.channel_bandwidth == 2.0
+
+    def test_opt_in(self):
+        assert not hasattr(GuppiRawHeader(), "_property_cache")
+        assert cached_header_class(GuppiRawAtaHeader) is GuppiRawAtaCachedHeader
+        assert cached_header_class(GuppiRawAtaCachedHeader) is GuppiRawAtaCachedHeader
+
+        class GuppiRawGbtHeader(GuppiRawHeader):
+            pass
+        assert cached_header_class(GuppiRawGbtHeader) is GuppiRawCachedHeader
+
+        # the cached classes are the uncached ones, to dispatch and export
+        grh = GuppiRawMeerkatCachedHeader(OBSNCHAN=32, CHAN_BW=0.5)
+        assert isinstance(grh, GuppiRawMeerkatHeader)
+        assert grh.channel_bandwidth == GuppiRawMeerkatHeader(grh).channel_bandwidth
+
+
+if __name__ == '__main__':
+    unittest.main()
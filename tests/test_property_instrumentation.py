@@ -0,0 +1,52 @@
+import json
+import unittest
+
+from rao_keyvalue_property_mixin_classes.guppi_raw import GuppiRawProperties
+from rao_keyvalue_property_mixin_classes.guppi_raw_header import (
+    GuppiRawHeader,
+    GuppiRawAtaCachedHeader,
+)
+from rao_keyvalue_property_mixin_classes.property_instrumentation import PropertyInstrumentation
+
+
+class TestPropertyInstrumentation(unittest.TestCase):
+    def test_counts(self):
+        header = GuppiRawAtaCachedHeader(OBSNCHAN=16, BLOCSIZE=16*8*2*2, NPOL=2)
+        with PropertyInstrumentation() as instrumentation:
+            for _ in range(3):
+                header.blockshape
+            header.nof_channels
+            snapshot = json.loads(instrumentation.to_json())
+
+        statistics = snapshot["GuppiRawAtaCachedHeader"]
+        blockshape = statistics["properties"]["blockshape"]
+        assert blockshape["reads"] == 3
+        assert blockshape["seconds"] > 0
+        # key accesses are attributed to the property making them, and
+        # cached properties only access keys when first computed
+        assert blockshape["get_calls"] == 0
+        assert statistics["properties"]["nof_spectra_per_block"]["reads"] == 1
+        assert statistics["properties"]["nof_bits"]["default_fallbacks"] == 1
+        assert statistics["properties"]["nof_antennas"]["get_calls"] == 3
+        assert statistics["default_fallback_keys"] == {"NANTS": 3, "NBITS": 1, "NCHAN": 1}
+        assert statistics["properties"]["observed_nof_channels"]["getitem_calls"] == 3
+
+    def test_disabled_restores(self):
+        original = GuppiRawProperties.__dict__["blocksize"]
+        original_get = GuppiRawHeader.__dict__.get("get")
+        instrumentation = PropertyInstrumentation()
+        instrumentation.enable()
+        assert GuppiRawProperties.__dict__["blocksize"] is not original
+        with self.assertRaises(RuntimeError):
+            PropertyInstrumentation().enable()
+        instrumentation.disable()
+        assert GuppiRawProperties.__dict__["blocksize"] is original
+        assert GuppiRawHeader.__dict__.get("get") is original_get
+
+        header = GuppiRawHeader(BLOCSIZE=1024)
+        assert header.blocksize == 1024
+        assert instrumentation.snapshot() == {}
+
+
+if __name__ == '__main__':
+    unittest.main()